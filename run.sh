@@ -8,7 +8,7 @@ mkdir -p docs
 
 # 进入src目录并运行脚本
 cd src
-python3 scrape_news.py
+python3 scrape_news.py "$@"
 
 echo "运行完成！"
 echo "检查输出文件:"
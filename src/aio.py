@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+"""
+Asyncio fetch backend
+Fetches a batch of pages (per-article detail pages) concurrently in one thread with aiohttp:
+connections are pooled, politeness delays are asyncio sleeps that overlap, and a per-host
+semaphore caps how many requests hit the same site at once
+"""
+
+import asyncio
+import logging
+import random
+import time
+from importlib.util import find_spec
+from urllib.parse import urlparse
+
+import decoding
+import metrics
+import resilience
+
+logger = logging.getLogger(__name__)
+
+# Requests in flight per host
+DEFAULT_PER_HOST = 4
+# Open connections across all hosts of a batch
+DEFAULT_CONNECTIONS = 32
+
+
+def available():
+    """Whether aiohttp is installed"""
+    return find_spec('aiohttp') is not None
+
+
+class Page:
+    """A fetched page; quacks like a requests.Response for decoding.text() and RetryPolicy.delay()"""
+
+    def __init__(self, url, status_code, headers, content):
+        self.url = url
+        self.status_code = status_code
+        self.headers = headers
+        self.content = content
+        self.encoding = None
+
+    @property
+    def ok(self):
+        return self.status_code < 400
+
+
+class _Host:
+    """Per-host concurrency limit and request spacing of one batch"""
+
+    def __init__(self, per_host, spacing):
+        self.semaphore = asyncio.Semaphore(per_host)
+        self.spacing = spacing
+        self.next_slot = 0.0
+
+    async def wait_turn(self, deadline):
+        """Keep at least spacing seconds between two request starts to this host"""
+        if not self.spacing:
+            return
+        now = time.monotonic()
+        # Reserve the next slot first so concurrent tasks queue up behind it
+        slot = max(now, self.next_slot + self.spacing)
+        self.next_slot = slot
+        await _sleep(slot - now, deadline)
+
+
+async def _sleep(seconds, deadline=None):
+    if deadline is not None:
+        seconds = min(seconds, deadline.remaining())
+    if seconds <= 0:
+        return
+    metrics.record_sleep(seconds)
+    await asyncio.sleep(seconds)
+
+
+class _Batch:
+    def __init__(self, client, headers, timeout, policy, delay, per_host, spacing, deadline, pool):
+        self.client = client
+        self.headers = headers
+        self.timeout = timeout
+        self.policy = policy
+        self.delay = delay
+        self.per_host = per_host
+        self.spacing = spacing or {}
+        self.deadline = deadline
+        self.pool = pool
+        self.hosts = {}
+        # The batch runs on the calling thread, so its requests count for the calling source
+        self.source_metrics = metrics.current()
+
+    def host(self, url):
+        name = urlparse(url).hostname
+        if name not in self.hosts:
+            self.hosts[name] = _Host(self.per_host, self.spacing.get(name, 0))
+        return self.hosts[name]
+
+    def routes(self, url):
+        """(route, proxy URL) pairs to try; aiohttp only speaks to http(s) proxies"""
+        if self.pool is None:
+            return [(None, None)]
+        routes = []
+        for route in self.pool.routes(url):
+            proxy = (self.pool.requests_proxies(route) or {}).get('https')
+            if proxy is not None and not proxy.startswith(('http://', 'https://')):
+                logger.debug(f"Skipping route {self.pool.describe(route)} for {url} on the asyncio backend")
+                continue
+            routes.append((route, proxy))
+        return routes or [(None, None)]
+
+    async def request(self, url, proxy, timeout):
+        import aiohttp
+        start = time.perf_counter()
+        try:
+            async with self.client.get(url, headers=self.headers, proxy=proxy,
+                                       timeout=aiohttp.ClientTimeout(total=timeout)) as response:
+                raw = await response.read()
+                status, headers, final_url = response.status, response.headers, str(response.url)
+        except Exception:
+            metrics.record_error(self.source_metrics, time.perf_counter() - start)
+            raise
+        elapsed = time.perf_counter() - start
+        content = raw
+        encodings = decoding.content_encodings(headers.get('Content-Encoding'))
+        if encodings:
+            try:
+                content = decoding.decompress(raw, encodings)
+            except Exception as e:
+                logger.warning(f"Could not decode {', '.join(encodings)} body from {url}: {str(e)}")
+        metrics.record_response(self.source_metrics, status, len(raw), len(content), elapsed)
+        return Page(final_url, status, headers, content), elapsed
+
+    async def attempts(self, url, proxy, policy, timeout):
+        """Mirror of resilience.fetch: retry transient errors and retryable statuses with backoff"""
+        import aiohttp
+        transient = (aiohttp.ClientError, asyncio.TimeoutError)
+        for attempt in range(1, policy.attempts + 1):
+            request_timeout = self.deadline.cap(timeout) if self.deadline is not None else timeout
+            try:
+                page, elapsed = await self.request(url, proxy, request_timeout)
+            except transient as e:
+                if attempt == policy.attempts:
+                    raise
+                delay = policy.backoff(attempt)
+                logger.info(f"GET {url} failed ({type(e).__name__}), retrying in {delay:.1f}s")
+            else:
+                if page.status_code not in policy.statuses or attempt == policy.attempts:
+                    return page, elapsed
+                delay = policy.delay(attempt, page)
+                if delay > policy.max_delay:
+                    logger.info(f"GET {url} returned {page.status_code} with Retry-After {delay:.0f}s, not retrying")
+                    return page, elapsed
+                if self.deadline is not None and delay >= self.deadline.remaining():
+                    logger.info(f"GET {url} returned {page.status_code}, no time left to retry")
+                    return page, elapsed
+                logger.info(f"GET {url} returned {page.status_code}, retrying in {delay:.1f}s")
+            await _sleep(delay, self.deadline)
+
+    async def fetch(self, url):
+        """The page at url, or None when every route failed or the time budget ran out"""
+        host = self.host(url)
+        async with host.semaphore:
+            try:
+                # 随机延时，与其他请求的等待时间重叠
+                await _sleep(random.uniform(*self.delay), self.deadline)
+                await host.wait_turn(self.deadline)
+                return await self.fetch_routed(url)
+            except resilience.DeadlineExceeded:
+                return None
+            except Exception as e:
+                logger.debug(f"Could not fetch {url}: {str(e)}")
+                return None
+
+    async def fetch_routed(self, url):
+        routes = self.routes(url)
+        page = None
+        last_error = None
+        for index, (route, proxy) in enumerate(routes):
+            has_fallback = index < len(routes) - 1
+            try:
+                page, elapsed = await self.attempts(url, proxy, resilience.NO_RETRY if has_fallback else self.policy,
+                                                    self.timeout)
+            except resilience.DeadlineExceeded:
+                raise
+            except Exception as e:
+                if self.pool is not None:
+                    self.pool.record(url, route, False)
+                    logger.info(f"Route {self.pool.describe(route)} to {url} failed: {str(e)}")
+                last_error = e
+                continue
+            if self.pool is not None:
+                self.pool.record(url, route, page.ok, elapsed)
+            if page.ok:
+                return page
+        if page is not None:
+            return page
+        raise last_error
+
+
+async def _fetch_all(urls, headers, timeout, policy, delay, per_host, spacing, deadline, pool):
+    import aiohttp
+    connector = aiohttp.TCPConnector(limit=DEFAULT_CONNECTIONS, limit_per_host=per_host)
+    # Bodies go through decoding.decompress(), so br/zstd work whatever aiohttp supports
+    async with aiohttp.ClientSession(connector=connector, auto_decompress=False) as client:
+        batch = _Batch(client, headers, timeout, policy, delay, per_host, spacing, deadline, pool)
+        pages = await asyncio.gather(*(batch.fetch(url) for url in urls))
+    return dict(zip(urls, pages))
+
+
+def fetch_all(urls, headers=None, timeout=15, policy=resilience.DETAIL_POLICY, delay=(0, 0),
+              per_host=DEFAULT_PER_HOST, spacing=None, deadline=None, pool=None):
+    """
+    GET every url concurrently and return {url: Page or None}.
+    delay is the (min, max) politeness pause before each request, spacing maps a host to
+    the minimum seconds between two requests to it, and pool is an optional
+    proxies.ProxyPool whose routes are tried like fetch_routed() does.
+    """
+    urls = list(dict.fromkeys(urls))
+    if not urls:
+        return {}
+    return asyncio.run(_fetch_all(urls, dict(headers or {}), timeout, policy, delay, per_host, spacing, deadline, pool))
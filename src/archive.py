@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+Month-partitioned article archive
+Every article that passes through the store is also kept in data/YYYY-MM.jsonl (one
+article per line), so history survives the store's rolling window. A run only reads
+and rewrites the partitions of the months its articles fall in, plus those of the store's
+window where an article left when its date moved to another month; older partitions are
+never touched again.
+"""
+
+import json
+import logging
+import os
+import re
+from datetime import datetime, timedelta
+
+import records
+
+logger = logging.getLogger(__name__)
+
+INDEX_FILE = 'index.json'
+
+# The store's window: an article whose date changes is still in the store, so its old date
+# (and partition) is at most this many days back
+DEFAULT_WINDOW_DAYS = 30
+
+_PARTITION_PATTERN = re.compile(r'^(\d{4}-\d{2})\.jsonl$')
+
+
+def month_of(article):
+    """'YYYY-MM' partition of an article, or None when its date is unknown"""
+    if article.date == records.UNKNOWN_DATE:
+        return None
+    return f"{article.date // 10000:04d}-{article.date // 100 % 100:02d}"
+
+
+def by_category(articles):
+    """A partition's articles as the {'tech': [...], 'news': [...]} mapping the renderer takes"""
+    grouped = {category: [] for category in records.CATEGORIES}
+    for article in articles:
+        grouped.setdefault(article.category, []).append(article)
+    return grouped
+
+
+class Archive:
+    """The partition files below one directory, plus an index of article counts per month"""
+
+    def __init__(self, directory, window_days=DEFAULT_WINDOW_DAYS):
+        self.directory = directory
+        self.window_days = window_days
+        self._counts = None
+
+    def path(self, month):
+        return os.path.join(self.directory, f"{month}.jsonl")
+
+    def months(self):
+        """Archived months, newest first"""
+        try:
+            names = os.listdir(self.directory)
+        except FileNotFoundError:
+            return []
+        return sorted((match.group(1) for match in map(_PARTITION_PATTERN.match, names) if match), reverse=True)
+
+    def counts(self):
+        """Articles per month, read from the index instead of the partitions"""
+        if self._counts is None:
+            try:
+                with open(os.path.join(self.directory, INDEX_FILE), 'r', encoding='utf-8') as f:
+                    self._counts = json.load(f)
+            except FileNotFoundError:
+                self._counts = {}
+            except (OSError, ValueError) as e:
+                logger.warning(f"Could not read archive index: {str(e)}, counting partitions")
+                self._counts = {month: len(self.load(month)) for month in self.months()}
+        return self._counts
+
+    def load(self, month):
+        """Articles of one month, newest first"""
+        articles = []
+        try:
+            with open(self.path(month), 'r', encoding='utf-8') as f:
+                for line in f:
+                    if line.strip():
+                        articles.append(records.Article.from_dict(json.loads(line)))
+        except FileNotFoundError:
+            pass
+        return articles
+
+    def _write(self, month, articles):
+        temp_path = f"{self.path(month)}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            for article in articles:
+                f.write(json.dumps(article.to_dict(), ensure_ascii=False))
+                f.write('\n')
+        os.replace(temp_path, self.path(month))
+
+    def _write_index(self):
+        temp_path = os.path.join(self.directory, f"{INDEX_FILE}.tmp")
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(dict(sorted(self._counts.items(), reverse=True)), f, indent=2)
+        os.replace(temp_path, os.path.join(self.directory, INDEX_FILE))
+
+    def window_months(self, today=None):
+        """Archived months from the start of the store's window on, newest first"""
+        first = (today or datetime.now()) - timedelta(days=self.window_days)
+        return [month for month in self.months() if month >= f"{first.year:04d}-{first.month:02d}"]
+
+    def update(self, articles):
+        """
+        Merge articles ({'tech': [...], 'news': [...]}) into their month partitions by URL.
+        An article whose date moved to another month is removed from its old partition, which
+        is looked for among the months of this run and of the store's window only.
+        Only partitions that gain, change or lose an article are rewritten; returns their months.
+        """
+        latest = {}
+        for category in records.CATEGORIES:
+            for article in articles.get(category, []):
+                article = records.Article.coerce(article)
+                month = month_of(article)
+                if month is not None:
+                    latest[article.url] = (month, article)
+
+        os.makedirs(self.directory, exist_ok=True)
+        counts = self.counts()
+        incoming = {}
+        for url, (month, article) in latest.items():
+            incoming.setdefault(month, {})[url] = article
+        months = sorted(set(incoming) | set(self.window_months()))
+        existing = {month: self.load(month) for month in months}
+
+        changed = []
+        for month in months:
+            merged = {article.url: article for article in existing[month]}
+            modified = False
+            for url in list(merged):
+                # Filed under another month now
+                if url in latest and latest[url][0] != month:
+                    del merged[url]
+                    modified = True
+            for url, article in incoming.get(month, {}).items():
+                if merged.get(url) != article:
+                    merged[url] = article
+                    modified = True
+            if not modified:
+                continue
+            if merged:
+                partition = sorted(merged.values(), key=lambda article: article.date, reverse=True)
+                self._write(month, partition)
+                counts[month] = len(partition)
+            else:
+                os.remove(self.path(month))
+                counts.pop(month, None)
+            changed.append(month)
+            logger.info(f"Archive {month}: {len(merged) - len(existing[month]):+d} articles, {len(merged)} in total")
+
+        if changed:
+            self._write_index()
+        return changed
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Generated artifacts
+Files under docs/ are replaced only when their content changed and get .gz and .br
+siblings at maximum compression, so static servers (nginx gzip_static/brotli_static)
+serve them without compressing on the fly
+"""
+
+import contextlib
+import filecmp
+import gzip
+import logging
+import os
+
+logger = logging.getLogger(__name__)
+
+GZIP_LEVEL = 9
+BROTLI_QUALITY = 11
+
+# Cleared by uncompressed(), e.g. to time page generation without the compression
+_precompress = True
+
+
+def _brotli():
+    try:
+        import brotli
+    except ImportError:
+        try:
+            import brotlicffi as brotli
+        except ImportError:
+            return None
+    return brotli
+
+
+def _gzip(data):
+    # mtime=0 keeps the .gz identical for identical content
+    return gzip.compress(data, compresslevel=GZIP_LEVEL, mtime=0)
+
+
+def _br(data):
+    return _brotli().compress(data, quality=BROTLI_QUALITY)
+
+
+def compressors():
+    """Sibling suffix and compressor of every available encoding"""
+    available = {'.gz': _gzip}
+    if _brotli() is not None:
+        available['.br'] = _br
+    return available
+
+
+@contextlib.contextmanager
+def uncompressed():
+    """Publish artifacts without writing their .gz/.br siblings inside the block"""
+    global _precompress
+    previous, _precompress = _precompress, False
+    try:
+        yield
+    finally:
+        _precompress = previous
+
+
+def precompress(path):
+    """
+    Write path.gz and path.br next to path. A sibling that would not be smaller than the
+    file is removed instead, so the server falls back to the plain file.
+    """
+    if not _precompress:
+        return
+    with open(path, 'rb') as f:
+        data = f.read()
+    for suffix, compress in compressors().items():
+        sibling = path + suffix
+        compressed = compress(data)
+        if len(compressed) < len(data):
+            with open(sibling, 'wb') as f:
+                f.write(compressed)
+        elif os.path.exists(sibling):
+            os.remove(sibling)
+
+
+def _siblings_current(path):
+    """Whether every precompressed sibling exists and is not older than the file"""
+    mtime = os.path.getmtime(path)
+    return all(os.path.exists(path + suffix) and os.path.getmtime(path + suffix) >= mtime
+               for suffix in compressors())
+
+
+def publish(temp_path, path):
+    """Move a freshly written file into place and precompress it, unless the content is unchanged"""
+    if os.path.exists(path) and filecmp.cmp(temp_path, path, shallow=False):
+        os.remove(temp_path)
+        if not _siblings_current(path):
+            precompress(path)
+        return False
+    os.replace(temp_path, path)
+    precompress(path)
+    return True
+
+
+@contextlib.contextmanager
+def open_text(path):
+    """
+    Text file for a generated artifact. It is written next to the target and only
+    replaces it (and its .gz/.br siblings) when the content differs.
+    """
+    temp_path = f"{path}.tmp"
+    try:
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            yield f
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+    if publish(temp_path, path):
+        logger.debug(f"Updated {path}")
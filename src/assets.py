@@ -0,0 +1,412 @@
+#!/usr/bin/env python3
+"""
+Page assets
+The page's stylesheet and filter script, written minified under content-hashed names
+(style.<hash>.css, app.<hash>.js) so browsers and CDNs can cache them indefinitely and a
+daily page update only re-downloads the HTML
+"""
+
+import hashlib
+import json
+import logging
+import os
+import re
+from datetime import datetime, timedelta
+
+import artifacts
+
+logger = logging.getLogger(__name__)
+
+# Hex digits of the content hash in asset file names
+HASH_LENGTH = 10
+# Superseded assets are kept this long for pages still cached with the old names
+RETENTION_DAYS = 7
+# Records when each old version was superseded, kept (and committed) next to the assets
+MANIFEST_NAME = 'manifest.json'
+
+PAGE_CSS = """\
+* {
+    margin: 0;
+    padding: 0;
+    box-sizing: border-box;
+}
+
+body {
+    font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif;
+    line-height: 1.6;
+    color: #333;
+    background-color: #f8f9fa;
+}
+
+.container {
+    max-width: 1400px;
+    margin: 0 auto;
+    padding: 20px;
+    display: grid;
+    grid-template-columns: 1fr 300px;
+    gap: 20px;
+}
+
+.main-content {
+    grid-column: 1;
+}
+
+.sidebar {
+    grid-column: 2;
+    background: white;
+    padding: 1.5rem;
+    border-radius: 8px;
+    box-shadow: 0 2px 8px rgba(0,0,0,0.1);
+    align-self: start;
+    position: sticky;
+    top: 20px;
+}
+
+header {
+    background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
+    color: white;
+    text-align: center;
+    padding: 2rem 0;
+    margin-bottom: 2rem;
+    border-radius: 8px;
+    box-shadow: 0 4px 6px rgba(0,0,0,0.1);
+}
+
+h1 {
+    font-size: 2.5rem;
+    margin-bottom: 0.5rem;
+}
+
+.subtitle {
+    font-size: 1.1rem;
+    opacity: 0.9;
+}
+
+.filters {
+    background: white;
+    padding: 1.5rem;
+    border-radius: 8px;
+    margin-bottom: 1.5rem;
+    box-shadow: 0 2px 4px rgba(0,0,0,0.1);
+}
+
+.filter-group {
+    margin-bottom: 1rem;
+}
+
+.filter-group label {
+    display: block;
+    margin-bottom: 0.5rem;
+    font-weight: bold;
+    color: #495057;
+}
+
+.filter-group select, .filter-group input {
+    width: 100%;
+    padding: 0.5rem;
+    border: 1px solid #ddd;
+    border-radius: 4px;
+    font-size: 0.9rem;
+}
+
+.stats {
+    background: white;
+    padding: 1rem;
+    border-radius: 8px;
+    text-align: center;
+    margin-bottom: 2rem;
+    box-shadow: 0 2px 4px rgba(0,0,0,0.1);
+}
+
+.category-section {
+    margin-bottom: 3rem;
+}
+
+.section-title {
+    font-size: 1.8rem;
+    color: #495057;
+    margin-bottom: 1.5rem;
+    padding-bottom: 0.5rem;
+    border-bottom: 2px solid #dee2e6;
+}
+
+.articles-grid {
+    display: grid;
+    grid-template-columns: repeat(auto-fill, minmax(350px, 1fr));
+    gap: 1.5rem;
+}
+
+.article-card {
+    background: white;
+    border-radius: 8px;
+    padding: 1.5rem;
+    box-shadow: 0 2px 8px rgba(0,0,0,0.1);
+    transition: transform 0.2s, box-shadow 0.2s;
+    height: 100%;
+    display: flex;
+    flex-direction: column;
+}
+
+.article-card[data-date] {
+    /* Add data attribute for filtering */
+}
+
+.article-card:hover {
+    transform: translateY(-5px);
+    box-shadow: 0 4px 12px rgba(0,0,0,0.15);
+}
+
+.article-source {
+    font-size: 0.85rem;
+    color: #6c757d;
+    margin-bottom: 0.5rem;
+}
+
+.article-title {
+    font-size: 1.1rem;
+    margin-bottom: 0.75rem;
+    color: #212529;
+}
+
+.article-title a {
+    color: #007bff;
+    text-decoration: none;
+}
+
+.article-title a:hover {
+    color: #0056b3;
+    text-decoration: underline;
+}
+
+.article-description {
+    color: #495057;
+    font-size: 0.95rem;
+    margin-bottom: 1rem;
+    flex-grow: 1;
+}
+
+.article-date {
+    font-size: 0.85rem;
+    color: #6c757d;
+}
+
+.article-tags {
+    margin-bottom: 0.5rem;
+}
+
+.article-tag {
+    display: inline-block;
+    font-size: 0.75rem;
+    color: #0056b3;
+    background: #e7f1ff;
+    border-radius: 3px;
+    padding: 0.1rem 0.4rem;
+    margin-right: 0.3rem;
+}
+
+.footer {
+    grid-column: 1 / -1;
+    text-align: center;
+    padding: 2rem 0;
+    color: #6c757d;
+    font-size: 0.9rem;
+    margin-top: 3rem;
+    border-top: 1px solid #dee2e6;
+}
+
+@media (max-width: 1100px) {
+    .container {
+        grid-template-columns: 1fr;
+    }
+
+    .sidebar {
+        grid-column: 1;
+        position: static;
+    }
+}
+
+@media (max-width: 768px) {
+    .container {
+        padding: 10px;
+    }
+
+    h1 {
+        font-size: 2rem;
+    }
+
+    .articles-grid {
+        grid-template-columns: 1fr;
+    }
+}
+"""
+
+PAGE_JS = """\
+// Cards per topic tag, built once so the tag filter does not scan every card
+const tagIndex = new Map();
+
+// Initialize sources filter
+window.onload = function() {
+    const sources = new Set();
+    document.querySelectorAll('.article-card').forEach(card => {
+        const source = card.querySelector('.article-source').textContent.replace('来源: ', '');
+        sources.add(source);
+        (card.getAttribute('data-tags') || '').split(' ').filter(tag => tag).forEach(tag => {
+            if (!tagIndex.has(tag)) {
+                tagIndex.set(tag, new Set());
+            }
+            tagIndex.get(tag).add(card);
+        });
+    });
+
+    const sourceFilter = document.getElementById('source-filter');
+    Array.from(sources).sort().forEach(source => {
+        const option = document.createElement('option');
+        option.value = source;
+        option.textContent = source;
+        sourceFilter.appendChild(option);
+    });
+
+    // Initialize with all articles shown
+    updateArticleCounts();
+};
+
+// Search, source, tag and date narrow the cards together; every control re-applies all four
+function applyFilters() {
+    const dateFilter = document.getElementById('date-filter').value;
+    const sourceFilter = document.getElementById('source-filter').value;
+    const tagFilter = document.getElementById('tag-filter').value;
+    const searchTerm = document.getElementById('search-input').value.toLowerCase();
+    const tagged = tagIndex.get(tagFilter) || new Set();
+
+    document.querySelectorAll('.article-card').forEach(card => {
+        const source = card.querySelector('.article-source').textContent.replace('来源: ', '');
+        let visible = (dateFilter === '' || card.getAttribute('data-date') === dateFilter) &&
+                      (sourceFilter === '' || source === sourceFilter) &&
+                      (tagFilter === '' || tagged.has(card));
+        if (visible && searchTerm !== '') {
+            const title = card.querySelector('.article-title').textContent.toLowerCase();
+            const description = card.querySelector('.article-description') ?
+                card.querySelector('.article-description').textContent.toLowerCase() : '';
+            visible = title.includes(searchTerm) ||
+                      description.includes(searchTerm) ||
+                      source.toLowerCase().includes(searchTerm);
+        }
+        card.style.display = visible ? 'flex' : 'none';
+    });
+
+    updateArticleCounts();
+}
+
+function clearAllFilters() {
+    document.getElementById('date-filter').value = '';
+    document.getElementById('source-filter').value = '';
+    document.getElementById('tag-filter').value = '';
+    document.getElementById('search-input').value = '';
+    applyFilters();
+}
+
+function updateArticleCounts() {
+    const visibleCards = document.querySelectorAll('.article-card[style*="display: flex"]').length;
+    const totalCount = document.querySelectorAll('.article-card').length;
+
+    // Update stats or provide some visual feedback about filtered results
+    console.log(`Showing ${visibleCards} of ${totalCount} articles`);
+}
+"""
+
+
+_CSS_TOKEN_PATTERN = re.compile(r'("(?:\\.|[^"\\])*"|\'(?:\\.|[^\'\\])*\')|/\*.*?\*/|\s+', re.DOTALL)
+_CSS_PUNCTUATION_PATTERN = re.compile(r'("(?:\\.|[^"\\])*"|\'(?:\\.|[^\'\\])*\')|\s*([{};,>])\s*|(:)\s+')
+
+
+def minify_css(text):
+    """Drop comments and redundant whitespace; quoted strings are left alone"""
+    text = _CSS_TOKEN_PATTERN.sub(lambda match: match.group(1) or ('' if match.group(0).startswith('/*') else ' '), text)
+    # A space before ':' separates a descendant pseudo-class selector, so only the one after it goes
+    text = _CSS_PUNCTUATION_PATTERN.sub(lambda match: match.group(1) or match.group(2) or match.group(3), text)
+    return text.replace(';}', '}').strip()
+
+
+def minify_js(text):
+    """
+    Drop indentation, blank lines and whole-line comments. Line breaks are kept, so
+    automatic semicolon insertion still sees the same statements.
+    """
+    lines = (line.strip() for line in text.splitlines())
+    return '\n'.join(line for line in lines if line and not line.startswith('//')) + '\n'
+
+
+def hashed_name(stem, suffix, content):
+    digest = hashlib.sha256(content.encode('utf-8')).hexdigest()[:HASH_LENGTH]
+    return f"{stem}.{digest}{suffix}"
+
+
+def _load_manifest(asset_dir):
+    try:
+        with open(os.path.join(asset_dir, MANIFEST_NAME), encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {'superseded': {}}
+
+
+def _save_manifest(asset_dir, manifest):
+    path = os.path.join(asset_dir, MANIFEST_NAME)
+    temp_path = f"{path}.tmp"
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(temp_path, path)
+
+
+def _prune(asset_dir, stem, suffix, current, superseded, now):
+    """
+    Note when older versions of an asset were superseded and remove them once that is longer
+    ago than the retention period. superseded maps file names to ISO timestamps; file
+    mtimes are no use here, since a fresh checkout gives every file the checkout time.
+    Returns whether superseded changed.
+    """
+    pattern = re.compile(rf'{re.escape(stem)}\.[0-9a-f]{{{HASH_LENGTH}}}{re.escape(suffix)}$')
+    changed = superseded.pop(current, None) is not None
+    cutoff = (now - timedelta(days=RETENTION_DAYS)).isoformat(timespec='seconds')
+    for name in os.listdir(asset_dir):
+        if not pattern.match(name) or name == current:
+            continue
+        if name not in superseded:
+            superseded[name] = now.isoformat(timespec='seconds')
+            changed = True
+        elif superseded[name] < cutoff:
+            for path in (os.path.join(asset_dir, name + sibling) for sibling in ('', '.gz', '.br')):
+                try:
+                    if os.path.exists(path):
+                        os.remove(path)
+                except OSError as e:
+                    logger.warning(f"Could not remove old asset {path}: {str(e)}")
+            del superseded[name]
+            changed = True
+    return changed
+
+
+def write_assets(output_dir, subdir='assets'):
+    """
+    Write the minified stylesheet and script below output_dir/subdir unless a file with
+    the same hash already exists. Returns their paths relative to output_dir.
+    """
+    asset_dir = os.path.join(output_dir, subdir)
+    os.makedirs(asset_dir, exist_ok=True)
+    manifest = _load_manifest(asset_dir)
+    manifest_changed = False
+    now = datetime.now()
+    paths = {}
+    for kind, stem, suffix, content in (('css', 'style', '.css', minify_css(PAGE_CSS)),
+                                        ('js', 'app', '.js', minify_js(PAGE_JS))):
+        name = hashed_name(stem, suffix, content)
+        path = os.path.join(asset_dir, name)
+        if not os.path.exists(path):
+            with artifacts.open_text(path) as f:
+                f.write(content)
+            logger.info(f"Asset written: {path}")
+        if _prune(asset_dir, stem, suffix, name, manifest['superseded'], now):
+            manifest_changed = True
+        paths[kind] = f"{subdir}/{name}"
+    if manifest_changed:
+        _save_manifest(asset_dir, manifest)
+    return paths
@@ -0,0 +1,263 @@
+#!/usr/bin/env python3
+"""
+Benchmark harness for the security news aggregator
+Measures import-time startup cost, per-source parse time against recorded fixtures,
+the dedup/filter stage at synthetic scales and HTML rendering (page generation and
+precompression apart), and reports the results as JSON
+"""
+
+import argparse
+import json
+import logging
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+import artifacts
+import records
+import registry
+import scrape_news
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SCALES = (1000, 10000, 100000)
+
+SYNTHETIC_SOURCES = (
+    ('XZ Aliyun', 'tech'), ('Project Zero', 'tech'), ('SeeBug Paper', 'tech'), ('KanXue', 'tech'),
+    ('Anquanke', 'news'), ('FreeBuf', 'news'), ('Secrss', 'news'), ('The Hacker News', 'news'),
+    ('SecurityWeek', 'news'),
+)
+
+
+def summarize(samples):
+    """Median, p95 (nearest rank), min and max of a list of timings in seconds"""
+    ordered = sorted(samples)
+    p95_index = max(0, -(-95 * len(ordered) // 100) - 1)
+    return {
+        'runs': len(ordered),
+        'median_s': statistics.median(ordered),
+        'p95_s': ordered[p95_index],
+        'min_s': ordered[0],
+        'max_s': ordered[-1],
+    }
+
+
+def measure(func, setup=None, repeat=5):
+    """
+    Time func over repeat runs and measure its peak traced memory in one extra run.
+    setup() builds a fresh argument for each run so its cost is not timed.
+    """
+    samples = []
+    result = None
+    for _ in range(repeat):
+        arg = setup() if setup else None
+        start = time.perf_counter()
+        result = func(arg)
+        samples.append(time.perf_counter() - start)
+
+    # tracemalloc slows everything down, so memory gets its own untimed run
+    arg = setup() if setup else None
+    tracemalloc.start()
+    try:
+        func(arg)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    stats = summarize(samples)
+    stats['peak_memory_bytes'] = peak
+    return stats, result
+
+
+def synthetic_articles(count, seed=0, duplicate_ratio=0.1, days=60):
+    """Generate Article lists shaped like articles.json with some duplicate URLs"""
+    rng = random.Random(seed)
+    today = datetime.now()
+    articles = {'tech': [], 'news': []}
+    unique = max(1, int(count * (1 - duplicate_ratio)))
+    for i in range(count):
+        source, category = rng.choice(SYNTHETIC_SOURCES)
+        url_id = i if i < unique else rng.randrange(unique)
+        date = (today - timedelta(days=rng.randrange(days))).strftime('%Y-%m-%d')
+        articles[category].append(records.Article(
+            title=f"CVE-2026-{url_id:05d} 漏洞分析 Security advisory #{url_id}",
+            url=f"https://example.com/{source.replace(' ', '-').lower()}/{url_id}",
+            source=source,
+            description=("漏洞描述 vulnerability description text " * 6)[:rng.randrange(40, 240)],
+            date=date,
+            category=category,
+        ))
+    return articles
+
+
+def bench_sources(fixtures_path, repeat):
+    """
+    Run every scraper against the recorded fixtures and time it. A source with requests
+    missing from the archive, or without a single item, is reported as skipped: its
+    timing would measure an error path rather than parsing.
+    """
+    scrape_news.configure_http('replay', fixtures_path)
+    fixtures = scrape_news._http_adapter.archive
+    results = {}
+    try:
+        for spec in registry.all_sources():
+            def run(aggregator, spec=spec):
+                spec.run(aggregator)
+                return aggregator
+            fixtures.misses = []
+            probe = run(scrape_news.SecurityNewsAggregator())
+            if fixtures.misses or not probe.article_count():
+                results[spec.key] = {'skipped': 'missing fixtures' if fixtures.misses else 'no items',
+                                     'missing': sorted(set(fixtures.misses))}
+                logger.warning(f"Not timing {spec.key}: {results[spec.key]['skipped']}")
+                continue
+            stats, aggregator = measure(run, setup=scrape_news.SecurityNewsAggregator, repeat=repeat)
+            stats['items'] = len(aggregator.articles['tech']) + len(aggregator.articles['news'])
+            results[spec.key] = stats
+    finally:
+        scrape_news.configure_http(None)
+    return results
+
+
+def bench_stages(scales, repeat):
+    """Time remove_duplicates and filter_recent_articles on synthetic archives"""
+    results = {}
+    for scale in scales:
+        base = synthetic_articles(scale)
+
+        def fresh_aggregator():
+            aggregator = scrape_news.SecurityNewsAggregator()
+            aggregator.articles = {category: list(items) for category, items in base.items()}
+            return aggregator
+
+        def dedup(aggregator):
+            aggregator.remove_duplicates()
+            return aggregator
+
+        def recent(aggregator):
+            aggregator.filter_recent_articles(days=30)
+            return aggregator
+
+        dedup_stats, deduped = measure(dedup, setup=fresh_aggregator, repeat=repeat)
+        filter_stats, filtered = measure(recent, setup=fresh_aggregator, repeat=repeat)
+        dedup_stats['items_out'] = len(deduped.articles['tech']) + len(deduped.articles['news'])
+        filter_stats['items_out'] = len(filtered.articles['tech']) + len(filtered.articles['news'])
+        results[str(scale)] = {'remove_duplicates': dedup_stats, 'filter_recent_articles': filter_stats}
+    return results
+
+
+def _published_files(directory):
+    """Generated files below directory, without their precompressed siblings"""
+    suffixes = tuple(artifacts.compressors())
+    return [os.path.join(root, name) for root, _, names in os.walk(directory)
+            for name in names if not name.endswith(suffixes)]
+
+
+def bench_render(scales, repeat):
+    """
+    Time generate_html on synthetic archives without precompression, then the .gz/.br
+    compression of the page and feeds it wrote, and report the output size
+    """
+    results = {}
+    for scale in scales:
+        articles = synthetic_articles(scale)
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            output_file = os.path.join(tmp_dir, 'index.html')
+            with artifacts.uncompressed():
+                generate, _ = measure(lambda _: scrape_news.generate_html(articles, output_file), repeat=repeat)
+            files = _published_files(tmp_dir)
+            compress, _ = measure(lambda _: [artifacts.precompress(path) for path in files], repeat=repeat)
+            results[str(scale)] = {
+                'generate': generate,
+                'precompress': compress,
+                'output_bytes': os.path.getsize(output_file),
+            }
+    return results
+
+
+# Modules that a render-only invocation should never load
+HEAVY_MODULES = ('requests', 'urllib3', 'bs4', 'cloudscraper', 'brotli')
+
+STARTUP_PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import scrape_news
+elapsed = time.perf_counter() - start
+print(json.dumps({'import_s': elapsed, 'loaded': [name for name in %r if name in sys.modules]}))
+"""
+
+
+def bench_startup(repeat):
+    """Time a cold import of scrape_news in fresh interpreters and list the heavy modules it loaded"""
+    import subprocess
+    src_dir = os.path.dirname(os.path.abspath(__file__))
+    samples = []
+    loaded = []
+    for _ in range(repeat):
+        output = subprocess.run([sys.executable, '-c', STARTUP_PROBE % (HEAVY_MODULES,)], cwd=src_dir,
+                                capture_output=True, text=True, check=True).stdout
+        probe = json.loads(output.strip().splitlines()[-1])
+        samples.append(probe['import_s'])
+        loaded = probe['loaded']
+    stats = summarize(samples)
+    stats['heavy_modules_loaded'] = loaded
+    return stats
+
+
+def run_benchmarks(fixtures_path=None, scales=DEFAULT_SCALES, repeat=5, stages=('startup', 'sources', 'stages', 'render')):
+    """Run the selected benchmark groups and return a JSON-serializable report"""
+    report = {
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'python': sys.version.split()[0],
+        'repeat': repeat,
+        'scales': list(scales),
+    }
+    if 'startup' in stages:
+        report['startup'] = bench_startup(repeat)
+    if 'sources' in stages:
+        fixtures_path = fixtures_path or scrape_news.DEFAULT_FIXTURES_PATH
+        if os.path.exists(fixtures_path):
+            report['sources'] = bench_sources(fixtures_path, repeat)
+        else:
+            logger.warning(f"Fixture archive {fixtures_path} not found, skipping source benchmarks")
+    if 'stages' in stages:
+        report['stages'] = bench_stages(scales, repeat)
+    if 'render' in stages:
+        report['render'] = bench_render(scales, repeat)
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark scraping, parsing and rendering')
+    parser.add_argument('--fixtures', help='recorded fixture archive used for source benchmarks')
+    parser.add_argument('--scales', default=','.join(str(scale) for scale in DEFAULT_SCALES),
+                        help='comma-separated synthetic archive sizes')
+    parser.add_argument('--repeat', type=int, default=5, help='timed runs per benchmark')
+    parser.add_argument('--only', default='startup,sources,stages,render', help='comma-separated benchmark groups to run')
+    parser.add_argument('--output', help='write the JSON report to this file instead of stdout')
+    args = parser.parse_args(argv)
+
+    # Per-article log lines would dominate the timings
+    logging.getLogger().setLevel(logging.WARNING)
+
+    report = run_benchmarks(
+        fixtures_path=args.fixtures,
+        scales=[int(scale) for scale in args.scales.split(',') if scale],
+        repeat=args.repeat,
+        stages=tuple(stage.strip() for stage in args.only.split(',')),
+    )
+    output = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(output + '\n')
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Topic tags and category classification
+Keyword rules assign each article its topic tags (ransomware, APT, web, binary, cloud, AI)
+and decide between 'tech' and 'news' from its text, with the source's category as the
+prior. All keywords are matched in one pass with a single precompiled alternation.
+"""
+
+import re
+import unicodedata
+
+import records
+import registry
+
+# Tag -> label shown on the page
+TAGS = {
+    'ransomware': '勒索软件',
+    'apt': 'APT',
+    'web': 'Web 安全',
+    'binary': '二进制',
+    'cloud': '云安全',
+    'ai': 'AI 安全',
+}
+
+TAG_KEYWORDS = {
+    'ransomware': ('ransomware', 'ransom', 'extortion', 'lockbit', 'blackcat', 'alphv', 'akira', 'clop', 'black basta',
+                   'qilin', 'play ransomware', '勒索', '赎金', '加密勒索', '双重勒索'),
+    'apt': ('apt', 'apt28', 'apt29', 'apt41', 'lazarus', 'kimsuky', 'turla', 'sandworm', 'volt typhoon', 'salt typhoon',
+            'nation-state', 'state-sponsored', 'threat actor', 'espionage', 'cyber espionage', '国家级', '间谍', '高级持续性威胁',
+            '海莲花', '蔓灵花', '响尾蛇', '毒云藤'),
+    'web': ('xss', 'csrf', 'ssrf', 'sql injection', 'sqli', 'rce', 'deserialization', 'web shell', 'webshell', 'xxe',
+            'path traversal', 'directory traversal', 'file upload', 'php', 'wordpress', 'cms', 'api security', 'rest api',
+            'graphql', 'oauth', 'jwt', 'web', 'command injection', 'code injection', 'template injection', 'ssti',
+            'sql注入', 'nosql注入', '命令注入', '代码注入', '模板注入', 'ldap注入', 'xpath注入', '表达式注入', '跨站', '反序列化',
+            '文件上传', '目录遍历', '路径穿越', '命令执行', '代码执行', '内存马'),
+    'binary': ('buffer overflow', 'heap overflow', 'stack overflow', 'use-after-free', 'uaf', 'fuzzing', 'fuzz', 'kernel',
+               'reverse engineering', 'rop', 'shellcode', 'exploit development', 'firmware', 'memory corruption', 'driver',
+               'sandbox escape', 'type confusion', 'pwn', 'ida', 'ghidra', 'process injection', 'dll injection', '二进制', '逆向',
+               '溢出', '内核', '固件', '漏洞挖掘', '模糊测试', '提权', '沙箱逃逸', '内存破坏', '驱动程序', '内核驱动', '进程注入',
+               'dll注入'),
+    'cloud': ('cloud', 'aws', 'azure', 'gcp', 'google cloud', 'kubernetes', 'k8s', 'docker', 'container', 'serverless',
+              's3 bucket', 'iam', 'saas', '云安全', '云原生', '容器', '云平台', '云服务', '对象存储'),
+    'ai': ('ai', 'llm', 'llms', 'large language model', 'chatgpt', 'openai', 'gpt', 'prompt injection', 'jailbreak',
+           'machine learning', 'deep learning', 'ai agent', 'agentic', 'mcp', 'copilot', 'gemini', 'deepseek', '人工智能',
+           '大模型', '大语言模型', '智能体', '提示词注入', '机器学习', '深度学习'),
+}
+
+# Words that mark a technical write-up or a news item; the source's category wins unless one side clearly leads
+CATEGORY_KEYWORDS = {
+    'tech': ('analysis', 'deep dive', 'write-up', 'writeup', 'walkthrough', 'poc', 'proof of concept', 'technical details',
+             'reverse engineering', 'exploitation', 'root cause', 'how we', 'step-by-step', 'ctf', '漏洞分析', '深度分析', '技术分析',
+             '样本分析', '逆向分析', '源码分析', '原理分析', '复现', '详解', '解析',
+             '利用链', '原理', '源码', '调试', '研究', '实战', '技巧', '审计', '绕过', '漏洞挖掘'),
+    'news': ('announces', 'announced', 'arrested', 'charged', 'sentenced', 'acquires', 'acquisition', 'funding', 'raises',
+             'fined', 'lawsuit', 'breach', 'data breach', 'report', 'warns', 'released', 'patches', 'patch tuesday',
+             'cisa', 'kev', 'agency', 'government', '正式发布', '宣布', '逮捕', '起诉', '判处', '收购', '融资', '罚款', '泄露',
+             '警告', '通报', '发展报告', '年度报告', '调查报告', '白皮书', '监管', '政策', '法规', '会议', '大会', '周报', '月报'),
+}
+
+# Title words count this many times as much as description words
+TITLE_WEIGHT = 2
+# Lead the other category needs before it overrides the source's category
+CATEGORY_MARGIN = 3
+
+# Lower-cased keyword -> rule labels ('tag:web', 'category:tech')
+_KEYWORDS = {}
+for _tag, _words in TAG_KEYWORDS.items():
+    for _word in _words:
+        _KEYWORDS.setdefault(_word, []).append(f"tag:{_tag}")
+for _category, _words in CATEGORY_KEYWORDS.items():
+    for _word in _words:
+        _KEYWORDS.setdefault(_word, []).append(f"category:{_category}")
+
+
+def _alternation(words):
+    return '|'.join(map(re.escape, sorted(words, key=len, reverse=True)))
+
+
+# Latin keywords only match whole words, CJK keywords anywhere
+_PATTERN = re.compile(
+    r'(?<![0-9a-z])(?:' + _alternation(word for word in _KEYWORDS if word.isascii()) + r')(?![0-9a-z])'
+    r'|' + _alternation(word for word in _KEYWORDS if not word.isascii()))
+
+
+def _labels(text, weight, counts):
+    for keyword in _PATTERN.findall(unicodedata.normalize('NFKC', text or '').lower()):
+        for label in _KEYWORDS[keyword]:
+            counts[label] = counts.get(label, 0) + weight
+
+
+def classify(article, default_category=None):
+    """(category, tags) of an article; default_category is the prior when the text is not decisive"""
+    counts = {}
+    _labels(article.title, TITLE_WEIGHT, counts)
+    _labels(article.description, 1, counts)
+    category = default_category or article.category
+    other = 'news' if category == 'tech' else 'tech'
+    if counts.get(f"category:{other}", 0) - counts.get(f"category:{category}", 0) >= CATEGORY_MARGIN:
+        category = other
+    tags = tuple(tag for tag in TAGS if f"tag:{tag}" in counts)
+    return category, tags
+
+
+def classify_articles(articles):
+    """
+    Classify a batch ({'tech': [...], 'news': [...]}) in place: every article gets its tags
+    and is moved to the category the rules pick. Returns how many changed category.
+    """
+    defaults = {}
+    moved = {category: [] for category in records.CATEGORIES}
+    changed = 0
+    for category in records.CATEGORIES:
+        kept = []
+        for article in articles.get(category, []):
+            if article.source not in defaults:
+                spec = registry.by_name(article.source)
+                defaults[article.source] = spec.category if spec is not None else None
+            article['category'], article['tags'] = classify(article, defaults[article.source])
+            if article.category == category:
+                kept.append(article)
+            else:
+                moved[article.category].append(article)
+                changed += 1
+        articles[category] = kept
+    for category, items in moved.items():
+        articles[category].extend(items)
+    return changed
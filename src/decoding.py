@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+"""
+Response decoding
+Decompresses br/zstd/gzip bodies that urllib3 left encoded, and turns each body into text
+exactly once, trusting the declared charset before guessing from a prefix of the body
+"""
+
+import codecs
+import logging
+import re
+import zlib
+from importlib.util import find_spec
+
+logger = logging.getLogger(__name__)
+
+# Bytes searched for a <meta charset> declaration
+SNIFF_BYTES = 4096
+# Bytes handed to the charset detector when nothing is declared
+DETECT_BYTES = 64 * 1024
+
+_META_CHARSET_PATTERN = re.compile(rb'<meta[^>]+charset\s*=\s*["\']?\s*([\w.:-]+)', re.IGNORECASE)
+
+# Labels that browsers decode with a superset encoding (WHATWG Encoding Standard)
+_ENCODING_ALIASES = {
+    'gb2312': 'gb18030',
+    'gbk': 'gb18030',
+    'x-gbk': 'gb18030',
+    'iso-8859-1': 'cp1252',
+    'latin-1': 'cp1252',
+    'ascii': 'cp1252',
+    'us-ascii': 'cp1252',
+}
+
+_BOMS = (
+    (codecs.BOM_UTF8, 'utf-8-sig'),
+    (codecs.BOM_UTF16_LE, 'utf-16'),
+    (codecs.BOM_UTF16_BE, 'utf-16'),
+)
+
+
+def _has_module(*names):
+    """Whether any of the modules is installed, without importing it"""
+    for name in names:
+        try:
+            if find_spec(name) is not None:
+                return True
+        except ModuleNotFoundError:
+            # Parent package of a dotted name is missing
+            continue
+    return False
+
+
+def _gunzip(data):
+    import gzip
+    return gzip.decompress(data)
+
+
+def _inflate(data):
+    # Servers send both zlib-wrapped and raw deflate streams for 'deflate'
+    try:
+        return zlib.decompress(data)
+    except zlib.error:
+        return zlib.decompress(data, -zlib.MAX_WBITS)
+
+
+def _unbrotli(data):
+    try:
+        import brotli
+    except ImportError:
+        import brotlicffi as brotli
+    return brotli.decompress(data)
+
+
+def _unzstd(data):
+    try:
+        from compression import zstd
+        return zstd.decompress(data)
+    except ImportError:
+        import zstandard
+        # decompressobj also handles frames that do not record their content size
+        return zstandard.ZstdDecompressor().decompressobj().decompress(data)
+
+
+def _decoders():
+    decoders = {'gzip': _gunzip, 'x-gzip': _gunzip, 'deflate': _inflate}
+    if _has_module('brotli', 'brotlicffi'):
+        decoders['br'] = _unbrotli
+    if _has_module('compression.zstd', 'zstandard'):
+        decoders['zstd'] = _unzstd
+    return decoders
+
+
+DECODERS = _decoders()
+
+# Only advertise encodings we can decode, so a missing brotli never yields an unreadable body
+ACCEPT_ENCODING = ', '.join(name for name in ('gzip', 'deflate', 'br', 'zstd') if name in DECODERS)
+
+
+def _urllib3_encodings():
+    from urllib3.util.request import ACCEPT_ENCODING as urllib3_accept_encoding
+    return frozenset(name.strip() for name in urllib3_accept_encoding.split(','))
+
+
+def content_encodings(header):
+    """Content-Encoding header value as a list of codings, in the order they were applied"""
+    return [name.strip().lower() for name in (header or '').split(',') if name.strip() and name.strip().lower() != 'identity']
+
+
+def decompress(content, encodings):
+    """Undo the given content codings; raises KeyError for a coding without a decoder"""
+    for name in reversed(encodings):
+        content = DECODERS[name](content)
+    return content
+
+
+def decompress_response(response):
+    """Decode a body whose Content-Encoding urllib3 has no decoder for (e.g. zstd on older urllib3)"""
+    encodings = content_encodings(response.headers.get('Content-Encoding'))
+    if not encodings or all(name in _urllib3_encodings() for name in encodings):
+        return response
+    if not all(name in DECODERS for name in encodings):
+        logger.warning(f"Cannot decode Content-Encoding {', '.join(encodings)} from {response.url}")
+        return response
+    try:
+        content = decompress(response.content, encodings)
+    except Exception as e:
+        logger.warning(f"Could not decode {', '.join(encodings)} body from {response.url}: {str(e)}")
+        return response
+    response._content = content
+    del response.headers['Content-Encoding']
+    return response
+
+
+def response_hook(response, *args, **kwargs):
+    """requests response hook; streamed bodies are left to the caller"""
+    if not kwargs.get('stream'):
+        decompress_response(response)
+    return response
+
+
+def _normalize(label):
+    """Python codec name for a charset label, or None if it is unknown"""
+    if not label:
+        return None
+    label = label.strip().strip('"\'').lower()
+    label = _ENCODING_ALIASES.get(label, label)
+    try:
+        return codecs.lookup(label).name
+    except LookupError:
+        return None
+
+
+def header_charset(content_type):
+    """The charset parameter of a Content-Type header, if one was sent"""
+    for parameter in (content_type or '').split(';')[1:]:
+        name, _, value = parameter.partition('=')
+        if name.strip().lower() == 'charset':
+            return value.strip() or None
+    return None
+
+
+def meta_charset(content):
+    """The charset declared by a <meta> tag near the start of an HTML document"""
+    match = _META_CHARSET_PATTERN.search(content[:SNIFF_BYTES])
+    return match.group(1).decode('ascii', 'ignore') if match else None
+
+
+def detect_encoding(content):
+    """Guess the encoding from a prefix of the body only"""
+    try:
+        from charset_normalizer import from_bytes
+    except ImportError:
+        return None
+    best = from_bytes(content[:DETECT_BYTES]).best()
+    return best.encoding if best is not None else None
+
+
+def decode(content, declared=None):
+    """
+    Bytes to (text, encoding). A byte order mark wins, then the declared charset (HTTP
+    header), then <meta charset>, then UTF-8, and only then detection on a prefix.
+    """
+    for bom, encoding in _BOMS:
+        if content.startswith(bom):
+            return content.decode(encoding, errors='replace'), encoding
+
+    fallback = None
+    for label in (declared, meta_charset(content), 'utf-8'):
+        encoding = _normalize(label)
+        if encoding is None:
+            continue
+        try:
+            return content.decode(encoding), encoding
+        except UnicodeDecodeError:
+            fallback = fallback or encoding
+
+    encoding = _normalize(detect_encoding(content)) or fallback or 'utf-8'
+    try:
+        return content.decode(encoding), encoding
+    except UnicodeDecodeError:
+        logger.warning("Some characters could not be decoded, and were replaced with REPLACEMENT CHARACTER")
+        return content.decode(encoding, errors='replace'), encoding
+
+
+def text(response):
+    """The response body as text, decoded once and cached on the response"""
+    cached = getattr(response, '_decoded_text', None)
+    if cached is not None:
+        return cached
+    decoded, encoding = decode(response.content or b'', header_charset(response.headers.get('Content-Type')))
+    # response.text then agrees with us instead of running detection over the whole body
+    response.encoding = encoding
+    response._decoded_text = decoded
+    return decoded
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Entity extraction
+Pulls CVE and GHSA identifiers, vendor and product names from a local dictionary, and
+CVSS scores out of article text with one precompiled alternation, so each article is
+scanned once. Entities are keyed as '<kind>:<name>', e.g. 'cve:CVE-2026-1470',
+'vendor:Ivanti' or 'cvss:critical'.
+"""
+
+import re
+import unicodedata
+
+# Vendor, other names of the vendor, products
+DICTIONARY = (
+    ('Microsoft', ('微软',), ('Windows', 'Exchange', 'SharePoint', 'Outlook', 'Defender', 'Azure', 'Hyper-V')),
+    ('Ivanti', (), ('Connect Secure', 'Policy Secure', 'EPMM', 'Endpoint Manager')),
+    ('Fortinet', ('飞塔',), ('FortiGate', 'FortiOS', 'FortiManager', 'FortiWeb', 'FortiClient', 'FortiProxy')),
+    ('Cisco', ('思科',), ('IOS XE', 'Webex', 'Firepower')),
+    ('Palo Alto Networks', ('Palo Alto',), ('PAN-OS', 'GlobalProtect', 'Cortex XDR')),
+    ('Citrix', (), ('NetScaler',)),
+    ('VMware', (), ('vCenter', 'ESXi', 'vSphere')),
+    ('Apple', ('苹果',), ('iOS', 'iPadOS', 'macOS', 'Safari', 'WebKit')),
+    ('Google', ('谷歌',), ('Chrome', 'Chromium', 'Android')),
+    ('Mozilla', (), ('Firefox', 'Thunderbird')),
+    ('Oracle', ('甲骨文',), ('WebLogic', 'MySQL', 'E-Business Suite')),
+    ('Apache', (), ('Struts', 'Tomcat', 'ActiveMQ', 'Log4j', 'Kafka', 'Solr', 'Airflow', 'OFBiz')),
+    ('Atlassian', (), ('Confluence', 'Jira', 'Bitbucket')),
+    ('SAP', (), ('NetWeaver',)),
+    ('Adobe', (), ('Acrobat', 'ColdFusion', 'Magento')),
+    ('GitHub', (), ('GitHub Actions',)),
+    ('GitLab', (), ()),
+    ('Jenkins', (), ()),
+    ('SonicWall', (), ()),
+    ('Juniper', ('瞻博',), ('Junos',)),
+    ('Check Point Software', ('Check Point Research',), ()),
+    ('F5', (), ('BIG-IP',)),
+    ('Zyxel', ('合勤',), ()),
+    ('D-Link', (), ()),
+    ('TP-Link', (), ()),
+    ('Huawei', ('华为',), ()),
+    ('Samsung', ('三星',), ()),
+    ('Qualcomm', ('高通',), ()),
+    ('NVIDIA', ('英伟达',), ()),
+    ('OpenAI', (), ('ChatGPT',)),
+    ('Progress Software', (), ('MOVEit', 'Telerik', 'WS_FTP')),
+    ('Veeam', (), ()),
+    ('Synology', ('群晖',), ()),
+    ('QNAP', ('威联通',), ()),
+    ('n8n', (), ()),
+    ('WordPress', (), ()),
+    ('Kubernetes', (), ()),
+    ('Docker', (), ()),
+)
+
+# Names that are also common words, with the continuations in which they are not the product
+_GUARDS = {'Windows': r'\s+of\b'}
+
+# Severity buckets of the CVSS v3/v4 qualitative scale, highest first
+SEVERITIES = ((9.0, 'critical'), (7.0, 'high'), (4.0, 'medium'), (0.1, 'low'))
+
+KINDS = ('cve', 'ghsa', 'vendor', 'product', 'cvss')
+
+# Dictionary name -> entities it stands for (a product also names its vendor)
+_NAMES = {}
+for _vendor, _aliases, _products in DICTIONARY:
+    for _name in (_vendor, *_aliases):
+        _NAMES[_name] = (f"vendor:{_vendor}",)
+    for _product in _products:
+        _NAMES[_product] = (f"product:{_product}", f"vendor:{_vendor}")
+
+# Lower-cased names for user-supplied keys
+_LOWER_NAMES = {name.lower(): found for name, found in _NAMES.items()}
+
+
+def _name_pattern(name):
+    return re.escape(name) + (f"(?!{_GUARDS[name]})" if name in _GUARDS else '')
+
+
+# One pass over the text: identifiers, CVSS scores and every dictionary name (longest first).
+# Names match case-sensitively, so 'Cisco IOS' is not Apple's iOS and 'progress' no vendor.
+_PATTERN = re.compile(
+    r'(?P<cve>\bCVE-\d{4}-\d{4,7}\b)'
+    r'|(?P<ghsa>\bGHSA(?:-[23456789cfghjmpqrvwx]{4}){3}\b)'
+    r'|\bCVSS\s*(?:v?[234](?:\.\d)?)?[\s:：]*(?:base\s+)?(?:score|评分|分数|得分)?[\s:：]*(?:of|is|为)?[\s:：]*'
+    r'(?P<cvss>10(?:\.0)?|\d\.\d)(?![\d.])'
+    r'|(?<![0-9a-z])(?P<name>(?-i:' + '|'.join(map(_name_pattern, sorted(_NAMES, key=len, reverse=True))) + r'))(?![0-9a-z])',
+    re.IGNORECASE)
+
+
+def severity(score):
+    """CVSS qualitative rating of a score, or None for 0"""
+    for threshold, name in SEVERITIES:
+        if score >= threshold:
+            return name
+    return None
+
+
+def extract(text):
+    """Entity keys mentioned in a text, plus the highest CVSS score (None without one)"""
+    found = set()
+    cvss = None
+    for match in _PATTERN.finditer(unicodedata.normalize('NFKC', text or '')):
+        kind = match.lastgroup
+        value = match.group(kind)
+        if kind == 'cve':
+            found.add(f"cve:{value.upper()}")
+        elif kind == 'ghsa':
+            found.add(f"ghsa:GHSA-{value[5:].lower()}")
+        elif kind == 'cvss':
+            score = float(value)
+            cvss = score if cvss is None else max(cvss, score)
+        else:
+            found.update(_NAMES[value])
+    if cvss is not None and severity(cvss):
+        found.add(f"cvss:{severity(cvss)}")
+    return found, cvss
+
+
+def extract_article(article):
+    """Entities of an article's title and description"""
+    return extract(f"{article.title}\n{article.description or ''}")
+
+
+def canonical(key):
+    """Normalise a user-supplied key ('cve:cve-2026-1470', 'vendor:ivanti') to the indexed form"""
+    kind, _, name = key.partition(':')
+    kind = kind.lower()
+    if kind == 'cve':
+        return f"cve:{name.upper()}"
+    if kind == 'ghsa':
+        return f"ghsa:GHSA-{name[5:].lower()}" if name.upper().startswith('GHSA-') else f"ghsa:{name}"
+    if kind in ('vendor', 'product'):
+        for entity in _LOWER_NAMES.get(name.lower(), ()):
+            if entity.startswith(f"{kind}:"):
+                return entity
+    if kind in ('cvss', 'tag'):
+        return f"{kind}:{name.lower()}"
+    return f"{kind}:{name}"
@@ -0,0 +1,483 @@
+#!/usr/bin/env python3
+"""
+Extract functions and the parse stage
+Pure functions that turn a decoded page into plain article data. They only take and return
+picklable values, so the parse stage can run them in a process pool while the scraper
+threads keep fetching.
+"""
+
+import calendar
+import html
+import logging
+import re
+from datetime import datetime
+from urllib.parse import urljoin
+
+import metrics
+
+logger = logging.getLogger(__name__)
+
+# Patterns used while extracting XZ Aliyun cards, compiled once per process
+DATE_TOKEN_PATTERN = re.compile(r'\d{4}[-/\.]\d{1,2}[-/\.]\d{1,2}')
+XZ_CARD_DATE_PATTERN = re.compile(r'(?:\d{4}[-/\.]\d{1,2}[-/\.]\d{1,2}|发表于\D*(\d{4}-\d{2}-\d{2})|发表于\D*(\d{4}/\d{2}/\d{2}))')
+XZ_DATE_LABEL_PATTERN = re.compile(r'发表于|发布于|发布时间|时间|日期')
+XZ_NON_DESCRIPTIVE_TEXTS = frozenset(['read more', 'more', 'details', 'view', 'click', '继续阅读'])
+
+# Free-form dates on article pages: ISO 8601, "Jan 29, 2026" and "29 January 2026"
+ISO_DATE_PATTERN = re.compile(r'(\d{4})[-/.](\d{1,2})[-/.](\d{1,2})')
+MONTH_FIRST_DATE_PATTERN = re.compile(r'([A-Za-z]{3,9})\.?\s+(\d{1,2}),?\s+(\d{4})')
+DAY_FIRST_DATE_PATTERN = re.compile(r'(\d{1,2})\s+([A-Za-z]{3,9})\.?,?\s+(\d{4})')
+MONTHS = {name[:3].lower(): number for number, name in enumerate(calendar.month_name) if name}
+
+THN_CONTENT_SELECTORS = ('.post-content', '.article-content', '.entry-content', '.post-body', 'article',
+                         '.content', 'main', '.post-text', '.story-body', 'p')
+THN_DATE_SELECTORS = ('time[datetime]', 'time', '[pubdate]', '.publishdate', '.date', '.post-meta',
+                      '.entry-meta', '.published', '.updated', '.post-date')
+SECURITYWEEK_CONTENT_SELECTORS = ('div.entry-content', 'div.post-content', 'article div.content', 'div[itemprop="articleBody"]')
+SECURITYWEEK_FALLBACK_SELECTORS = ('article', '.post', '.entry', '.article', '.news-item', '.trending', '.latest', '.headline')
+SECURITYWEEK_PLACEHOLDER_TEXT = 'Hi, what are you looking for?'
+
+
+def _soup(markup):
+    from bs4 import BeautifulSoup
+    return BeautifulSoup(markup, 'html.parser')
+
+
+def _unescape(text):
+    return html.unescape(text) if text else text
+
+
+def _today():
+    return datetime.now().strftime('%Y-%m-%d')
+
+
+def parse_date_string(text):
+    """'YYYY-MM-DD' of the first date found in text, or None"""
+    if not text:
+        return None
+    candidates = []
+    match = ISO_DATE_PATTERN.search(text)
+    if match:
+        candidates.append((match.start(), int(match.group(1)), int(match.group(2)), int(match.group(3))))
+    match = MONTH_FIRST_DATE_PATTERN.search(text)
+    if match and match.group(1)[:3].lower() in MONTHS:
+        candidates.append((match.start(), int(match.group(3)), MONTHS[match.group(1)[:3].lower()], int(match.group(2))))
+    match = DAY_FIRST_DATE_PATTERN.search(text)
+    if match and match.group(2)[:3].lower() in MONTHS:
+        candidates.append((match.start(), int(match.group(3)), MONTHS[match.group(2)[:3].lower()], int(match.group(1))))
+    # The date that appears first wins
+    for _, year, month, day in sorted(candidates):
+        try:
+            return datetime(year, month, day).strftime('%Y-%m-%d')
+        except ValueError:
+            continue
+    return None
+
+
+def xz_cards(fragment):
+    """Article dicts from the HTML fragment returned by XZ Aliyun's news AJAX endpoint"""
+    articles = []
+    for card in _soup(fragment).select('div.news_item, .news_item'):
+        try:
+            # Find the main link in the card
+            link_tag = card.find('a')
+            if not link_tag:
+                continue
+
+            # Try to get title from image alt attribute first, then the link text
+            img_tag = card.find('img')
+            if img_tag and img_tag.get('alt'):
+                title = _unescape(img_tag.get('alt', '').strip())
+            else:
+                title = _unescape(link_tag.get_text(strip=True))
+            if not title:
+                continue
+
+            url = link_tag.get('href')
+            if url and not url.startswith('http'):
+                url = urljoin("https://xz.aliyun.com", url)
+
+            # Card text is needed by both the description fallback and the date lookup,
+            # so compute it once per card
+            card_text = card.get_text(separator=' ', strip=True)
+            if img_tag and img_tag.get('alt'):
+                title_to_remove = img_tag.get('alt', '').strip()
+            else:
+                title_to_remove = link_tag.get_text(strip=True)
+
+            articles.append({
+                'title': title,
+                'url': url,
+                'source': 'XZ Aliyun',
+                'description': _xz_description(card, link_tag, title_to_remove, card_text),
+                'date': _xz_date(card, card_text),
+                'category': 'tech'
+            })
+        except Exception as e:
+            logger.warning(f"Error processing XZ Aliyun item: {str(e)}")
+    return articles
+
+
+def _xz_description(card, link_tag, title_to_remove, card_text):
+    """Description of an XZ Aliyun card, found in a single pass over its elements"""
+    # Elements inside the main link hold the title, not the description. Tags compare
+    # structurally, so an element equal to one inside the link is skipped as well; indexing
+    # the link's tags by name and text keeps that check linear instead of rescanning the link
+    link_descendants = set()
+    link_tags = {}
+    for node in link_tag.find_all():
+        link_descendants.add(id(node))
+        link_tags.setdefault((node.name, node.get_text(strip=True)), []).append(node)
+
+    desc_text = ''
+    # find_all walks the card once in document order and only the first
+    # substantial element is used, so stop as soon as one is found
+    for elem in card.find_all(['p', 'div', 'span']):
+        if id(elem) in link_descendants:
+            continue
+        elem_text = elem.get_text(strip=True)
+        if any(elem == node for node in link_tags.get((elem.name, elem_text), ())):
+            continue
+        # Only keep substantial text (more than 5 characters and not just numbers)
+        if elem_text and len(elem_text) > 5 and not elem_text.isdigit():
+            # Exclude common non-descriptive text
+            if elem_text.lower() not in XZ_NON_DESCRIPTIVE_TEXTS:
+                desc_text = _unescape(elem_text)
+                break
+
+    # Alternative: take the card text with the title removed
+    if not desc_text and title_to_remove and title_to_remove in card_text:
+        remaining_text = card_text.replace(title_to_remove, '', 1).strip()
+        # Look for meaningful text (excluding author names, dates, etc.)
+        for part in remaining_text.split('\n'):
+            part = part.strip()
+            if len(part) > 20 and '发表于' not in part and '作者' not in part and '浏览' not in part:
+                desc_text = _unescape(part)
+                break
+
+    description = ''
+    if desc_text:
+        description = desc_text[:200] + "..." if len(desc_text) > 200 else desc_text
+    else:
+        # Last resort: try to find any descriptive text near the link
+        parent = link_tag.parent
+        if parent:
+            for sibling in parent.children:
+                if sibling is not link_tag and hasattr(sibling, 'get_text'):
+                    sibling_text = sibling.get_text(strip=True)
+                    if sibling_text and len(sibling_text) > 20:
+                        description = _unescape(sibling_text)[:200] + "..." if len(sibling_text) > 200 else _unescape(sibling_text)
+                        break
+
+    # Clean up description - remove excessive whitespace
+    if description:
+        description = ' '.join(description.split())
+    return description
+
+
+def _xz_date(card, card_text):
+    """Publication date of an XZ Aliyun card, defaulting to today"""
+    date = _today()
+
+    # Match dates like 2026-01-29, 2026/01/29, 2026.01.29 or "发表于 YYYY-MM-DD"
+    date_match = XZ_CARD_DATE_PATTERN.search(card_text)
+    if date_match:
+        actual_date = DATE_TOKEN_PATTERN.search(date_match.group(0))
+        if actual_date:
+            try:
+                parsed_date = datetime.strptime(actual_date.group(0).replace('/', '-'), '%Y-%m-%d')
+                date = parsed_date.strftime('%Y-%m-%d')
+            except ValueError:
+                pass
+
+    # Labelled dates ("发表于", "发布时间", ...) take precedence over the first match
+    for element in card.find_all(string=XZ_DATE_LABEL_PATTERN):
+        parent = element.parent
+        if parent:
+            date_match2 = DATE_TOKEN_PATTERN.search(parent.get_text(strip=True))
+            if date_match2:
+                try:
+                    parsed_date = datetime.strptime(date_match2.group(0).replace('/', '-'), '%Y-%m-%d')
+                    date = parsed_date.strftime('%Y-%m-%d')
+                    break
+                except ValueError:
+                    continue
+    return date
+
+
+def thn_details(page):
+    """(description, date) of a The Hacker News article page; either is None when not found"""
+    soup = _soup(page)
+    return _thn_description(soup), _thn_date(soup)
+
+
+def _thn_description(soup):
+    # Look for meta description, then the Open Graph description
+    meta_desc = soup.find('meta', attrs={'name': 'description'})
+    if meta_desc and meta_desc.get('content'):
+        return _unescape(meta_desc.get('content').strip())
+    og_desc = soup.find('meta', property='og:description')
+    if og_desc and og_desc.get('content'):
+        return _unescape(og_desc.get('content').strip())
+
+    # Try to find description in article content
+    description = ""
+    for selector in THN_CONTENT_SELECTORS:
+        for elem in soup.select(selector):
+            text = elem.get_text(strip=True)
+            if text and len(text) > 50:  # Get meaningful text
+                # Remove common non-content text
+                if not text.startswith('FacebookTwitterLinkedIn') and len(text) < 1000:
+                    description = text[:500]  # Limit length
+                    break
+        if description:
+            break
+
+    # If still no description found, use first paragraph
+    if not description:
+        first_p = soup.find('p')
+        if first_p:
+            text = first_p.get_text(strip=True)
+            if len(text) > 20:
+                description = text[:500]
+
+    return _unescape(description) if description else None
+
+
+def _thn_date(soup):
+    # Look for publication date in various formats
+    for selector in THN_DATE_SELECTORS:
+        date_elem = soup.select_one(selector)
+        if date_elem:
+            date_str = date_elem.get('datetime') or date_elem.get_text(strip=True)
+            parsed_date = parse_date_string(date_str)
+            if parsed_date:
+                return parsed_date
+
+    # Look for date in meta tags
+    date_meta = soup.find('meta', attrs={'name': 'publishdate'}) or \
+        soup.find('meta', attrs={'property': 'article:published_time'}) or \
+        soup.find('meta', attrs={'name': 'article:published_time'})
+    if date_meta:
+        return parse_date_string(date_meta.get('content') or date_meta.get('value'))
+    return None
+
+
+def securityweek_description(page):
+    """Description of a SecurityWeek article page, or None"""
+    soup = _soup(page)
+
+    # 1. Meta description, 2. og:description
+    meta_desc = soup.find('meta', attrs={'name': 'description'})
+    if meta_desc and meta_desc.get('content'):
+        description = _unescape(meta_desc.get('content').strip())
+        if description:
+            return description
+    og_desc = soup.find('meta', property='og:description')
+    if og_desc and og_desc.get('content'):
+        description = _unescape(og_desc.get('content').strip())
+        if description:
+            return description
+
+    # 3. First paragraph, skipping the search box placeholder
+    first_p = soup.find('p')
+    if first_p:
+        text = first_p.get_text(strip=True)
+        if text and not text.startswith(SECURITYWEEK_PLACEHOLDER_TEXT) and len(text) > 20:
+            return text[:500]
+
+    # 4. Content divs
+    for selector in SECURITYWEEK_CONTENT_SELECTORS:
+        content_elem = soup.select_one(selector)
+        if content_elem:
+            for p in content_elem.find_all('p'):
+                text = p.get_text(strip=True)
+                if text and not text.startswith(SECURITYWEEK_PLACEHOLDER_TEXT) and len(text) > 20:
+                    return text[:500]
+    return None
+
+
+def securityweek_listing(page):
+    """(title, url, date) entries of the SecurityWeek front page, from the trending widget or generic article markup"""
+    soup = _soup(page)
+    trend_wrap_div = soup.find('div', class_='zox-widget-side-trend-wrap left zoxrel zox100')
+    if trend_wrap_div:
+        return _securityweek_trending(trend_wrap_div)
+    logger.info("Could not find 'zox-widget-side-trend-wrap left zoxrel zox100' div in SecurityWeek")
+    # As fallback, look for other common article patterns
+    return _securityweek_fallback(soup)
+
+
+def _securityweek_url(url):
+    if url and not url.startswith('http'):
+        url = urljoin("https://www.securityweek.com/", url)
+    return url
+
+
+def _securityweek_date(element):
+    """Date shown next to a SecurityWeek teaser, defaulting to today"""
+    date = _today()
+    date_elem = element.find('time') or element.find('span', class_='date') or element.find('span', class_='time') or element.find('div', class_='date')
+    if not date_elem:
+        return date
+    date_text = date_elem.get_text(strip=True)
+    # Try to extract date in various formats
+    date_match = re.search(r'(\d{4}[-/年]\d{1,2}[/-月]\d{1,2}日?)', date_text)
+    if not date_match:
+        # Try MM/DD/YYYY or similar patterns
+        date_match = re.search(r'(\d{1,2}/\d{1,2}/\d{4})', date_text)
+    if not date_match:
+        # Try Month DD, YYYY pattern
+        date_match = re.search(r'([A-Za-z]+\s+\d{1,2},?\s+\d{4})', date_text)
+
+    if date_match:
+        extracted_date = date_match.group(1)
+        try:
+            if ',' in extracted_date:
+                # Month DD, YYYY format
+                date = datetime.strptime(extracted_date, '%B %d, %Y').strftime('%Y-%m-%d')
+            elif '/' in extracted_date:
+                # MM/DD/YYYY format
+                parts = extracted_date.split('/')
+                if len(parts) == 3:
+                    month, day, year = parts
+                    date = datetime.strptime(f'{year}-{month.zfill(2)}-{day.zfill(2)}', '%Y-%m-%d').strftime('%Y-%m-%d')
+        except ValueError:
+            try:
+                # Try other date formats
+                date = datetime.strptime(extracted_date, '%m/%d/%Y').strftime('%Y-%m-%d')
+            except ValueError:
+                pass
+    return date
+
+
+def _securityweek_trending(trend_wrap_div):
+    entries = []
+    try:
+        # First try to find articles with specific patterns within the trend div
+        articles = trend_wrap_div.find_all(['div', 'article'], class_=lambda x: x and ('post' in x or 'item' in x or 'entry' in x or 'article' in x))
+
+        # If no articles found with the above pattern, try to find all links in the div
+        if not articles:
+            all_links = trend_wrap_div.find_all('a', href=True, class_=lambda x: x and 'post' in x if x else True)
+            if not all_links:
+                all_links = trend_wrap_div.find_all('a', href=True)
+
+            for link in all_links:
+                try:
+                    title = _unescape(link.text.strip())
+                    if len(title) > 10:  # Only consider significant titles
+                        entries.append((title, _securityweek_url(link.get('href')), _today()))
+                except Exception as e:
+                    logger.warning(f"Error processing SecurityWeek link: {str(e)}")
+            return entries
+
+        # Process articles found with common patterns
+        for article_elem in articles:
+            try:
+                # Find title and link within the article element
+                title_elem = article_elem.find(['a', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6'])
+                if not title_elem:
+                    continue
+                # Get title from the element itself or from a child link
+                link_elem = title_elem.find('a') if title_elem.name != 'a' else title_elem
+
+                if title_elem.name != 'a':
+                    title = _unescape(title_elem.get_text(strip=True))
+                else:
+                    title = _unescape(title_elem.text.strip())
+
+                if not title and link_elem:
+                    title = _unescape(link_elem.text.strip())
+
+                url = _securityweek_url(link_elem.get('href') if link_elem else None)
+
+                if title and url and len(title) > 5:  # Only add if title is significant
+                    entries.append((title, url, _securityweek_date(article_elem)))
+            except Exception as e:
+                logger.warning(f"Error processing SecurityWeek article: {str(e)}")
+    except Exception as e:
+        logger.error(f"Error in SecurityWeek trending extraction: {str(e)}")
+    return entries
+
+
+def _securityweek_fallback(soup):
+    entries = []
+    try:
+        for selector in SECURITYWEEK_FALLBACK_SELECTORS:
+            elements = soup.select(selector)
+            if not elements:
+                continue
+            logger.info(f"Found {len(elements)} elements with selector '{selector}' on SecurityWeek")
+
+            for element in elements[:10]:  # Limit to first 10 to prevent too many
+                try:
+                    link_elem = element.find('a', href=True)
+                    if link_elem:
+                        title = _unescape(link_elem.text.strip()) or 'No Title'
+                        url = _securityweek_url(link_elem.get('href'))
+                        if title and len(title) > 5:  # Only add if title is significant
+                            entries.append((title, url, _securityweek_date(element)))
+                except Exception as e:
+                    logger.warning(f"Error processing SecurityWeek fallback element: {str(e)}")
+
+            if entries:
+                break  # Stop after finding articles with one valid selector
+    except Exception as e:
+        logger.error(f"Error in SecurityWeek fallback extraction: {str(e)}")
+    return entries
+
+
+# Optional process pool for the extract functions, see configure()
+_executor = None
+_workers = 0
+
+
+def _init_worker():
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+
+def configure(workers=0):
+    """Run extract functions in this many worker processes; 0 or 1 parses in the calling thread"""
+    global _workers
+    shutdown()
+    _workers = workers if workers and workers > 1 else 0
+
+
+def _pool():
+    global _executor
+    if _executor is None:
+        # The pool is opt-in, so its modules are only loaded once it is used
+        import multiprocessing
+        from concurrent.futures import ProcessPoolExecutor
+        # Forking a process that already runs scraper threads is unsafe, so start workers fresh
+        methods = multiprocessing.get_all_start_methods()
+        context = multiprocessing.get_context('forkserver' if 'forkserver' in methods else 'spawn')
+        _executor = ProcessPoolExecutor(max_workers=_workers, mp_context=context, initializer=_init_worker)
+        logger.info(f"Parse stage: {_workers} worker processes")
+    return _executor
+
+
+def run(func, *args):
+    """
+    Run an extract function on the parse stage and wait for its result. The waiting
+    scraper thread releases the GIL, so other sources keep fetching meanwhile.
+    """
+    global _workers
+    with metrics.timed_parse():
+        if _workers:
+            from concurrent.futures.process import BrokenProcessPool
+            try:
+                return _pool().submit(func, *args).result()
+            except BrokenProcessPool as e:
+                logger.warning(f"Parse stage failed ({str(e)}), parsing in-process from now on")
+                shutdown()
+                _workers = 0
+        return func(*args)
+
+
+def shutdown():
+    global _executor
+    if _executor is not None:
+        executor, _executor = _executor, None
+        executor.shutdown()
@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+"""
+Syndication feeds
+Writes Atom, RSS 2.0 and JSON Feed files of the most recent articles, overall, per
+category and per source, so consumers can poll a small feed instead of the page or the
+full articles.json. Each feed is written item by item without building the document
+in memory.
+"""
+
+import heapq
+import json
+import logging
+import os
+import re
+from datetime import datetime, timezone
+
+import artifacts
+import records
+import registry
+
+logger = logging.getLogger(__name__)
+
+# Items per feed
+DEFAULT_ITEMS = 50
+
+# Public address of docs/ (GitHub Pages). RSS 2.0 requires absolute links, so feeds always
+# use one; without --site-url it is derived from the repository the workflow runs in
+PAGES_URL = 'https://{owner}.github.io/{repo}/'
+DEFAULT_REPOSITORY = 'secnotes/secnews'
+
+FEED_TITLE = '网络安全资讯聚合'
+CATEGORY_TITLES = {'tech': '技术文章', 'news': '安全新闻'}
+
+# File name of each format inside a feed directory
+FORMATS = {
+    'atom': 'atom.xml',
+    'rss': 'rss.xml',
+    'json': 'feed.json',
+}
+
+_SLUG_PATTERN = re.compile(r'[^a-z0-9]+')
+# Control characters that are not allowed anywhere in an XML 1.0 document
+_XML_INVALID_PATTERN = re.compile('[\x00-\x08\x0b\x0c\x0e-\x1f]')
+
+
+def _slug(text):
+    return _SLUG_PATTERN.sub('-', text.lower()).strip('-') or 'source'
+
+
+def source_slug(name):
+    """Feed directory name of a source: its registry key, or a slug of its name"""
+    spec = registry.by_name(name)
+    return spec.key if spec is not None else _slug(name)
+
+
+def _published(article):
+    """Publication time of an article (midnight UTC of its day), or None if unknown"""
+    if article.date == records.UNKNOWN_DATE:
+        return None
+    return datetime(article.date // 10000, article.date // 100 % 100, article.date % 100, tzinfo=timezone.utc)
+
+
+def _updated(items):
+    """Newest publication time of a feed, so an unchanged feed renders to the same bytes"""
+    times = [published for published in map(_published, items) if published is not None]
+    return max(times) if times else datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+def default_site_url():
+    """GitHub Pages URL of the repository in GITHUB_REPOSITORY, or of the upstream repository"""
+    owner, _, repo = (os.environ.get('GITHUB_REPOSITORY') or DEFAULT_REPOSITORY).partition('/')
+    return PAGES_URL.format(owner=owner.lower(), repo=repo)
+
+
+def _escape(text):
+    return text.replace('&', '&amp;').replace('<', '&lt;').replace('>', '&gt;')
+
+
+def _xml(text):
+    return _escape(_XML_INVALID_PATTERN.sub('', text))
+
+
+def _attr(text):
+    """Quoted attribute value"""
+    value = _xml(text).replace('"', '&quot;').replace('\n', '&#10;').replace('\r', '&#13;').replace('\t', '&#9;')
+    return f'"{value}"'
+
+
+def _rfc3339(moment):
+    return moment.strftime('%Y-%m-%dT%H:%M:%SZ')
+
+
+def _link(site_url, path):
+    """Absolute URL of a site path"""
+    return f"{site_url.rstrip('/')}/{path}"
+
+
+def write_atom(f, title, items, feed_path, site_url):
+    updated = _updated(items)
+    f.write('<?xml version="1.0" encoding="utf-8"?>\n')
+    f.write('<feed xmlns="http://www.w3.org/2005/Atom">\n')
+    f.write(f"  <title>{_xml(title)}</title>\n")
+    f.write(f"  <id>{_xml(_link(site_url, feed_path))}</id>\n")
+    f.write(f"  <link rel=\"self\" href={_attr(_link(site_url, feed_path))}/>\n")
+    f.write(f"  <link rel=\"alternate\" href={_attr(_link(site_url, 'index.html'))}/>\n")
+    f.write(f"  <updated>{_rfc3339(updated)}</updated>\n")
+    for article in items:
+        published = _published(article) or updated
+        f.write('  <entry>\n')
+        f.write(f"    <title>{_xml(article.title)}</title>\n")
+        f.write(f"    <id>{_xml(article.url)}</id>\n")
+        f.write(f"    <link href={_attr(article.url)}/>\n")
+        f.write(f"    <updated>{_rfc3339(published)}</updated>\n")
+        f.write(f"    <published>{_rfc3339(published)}</published>\n")
+        f.write(f"    <author><name>{_xml(article.source)}</name></author>\n")
+        f.write(f"    <category term={_attr(article.category)}/>\n")
+        if article.description:
+            f.write(f"    <summary>{_xml(article.description)}</summary>\n")
+        f.write('  </entry>\n')
+    f.write('</feed>\n')
+
+
+def write_rss(f, title, items, feed_path, site_url):
+    from email.utils import format_datetime
+    f.write('<?xml version="1.0" encoding="utf-8"?>\n')
+    f.write('<rss version="2.0" xmlns:atom="http://www.w3.org/2005/Atom">\n')
+    f.write('  <channel>\n')
+    f.write(f"    <title>{_xml(title)}</title>\n")
+    f.write(f"    <link>{_xml(_link(site_url, 'index.html'))}</link>\n")
+    f.write(f"    <description>{_xml(title)}</description>\n")
+    f.write(f"    <atom:link rel=\"self\" type=\"application/rss+xml\" href={_attr(_link(site_url, feed_path))}/>\n")
+    f.write(f"    <lastBuildDate>{format_datetime(_updated(items))}</lastBuildDate>\n")
+    for article in items:
+        published = _published(article)
+        f.write('    <item>\n')
+        f.write(f"      <title>{_xml(article.title)}</title>\n")
+        f.write(f"      <link>{_xml(article.url)}</link>\n")
+        f.write(f"      <guid isPermaLink=\"true\">{_xml(article.url)}</guid>\n")
+        f.write(f"      <category>{_xml(article.category)}</category>\n")
+        f.write(f"      <source url={_attr(_link(site_url, feed_path))}>{_xml(article.source)}</source>\n")
+        if published is not None:
+            f.write(f"      <pubDate>{format_datetime(published)}</pubDate>\n")
+        if article.description:
+            f.write(f"      <description>{_xml(article.description)}</description>\n")
+        f.write('    </item>\n')
+    f.write('  </channel>\n')
+    f.write('</rss>\n')
+
+
+def write_json_feed(f, title, items, feed_path, site_url):
+    header = {'version': 'https://jsonfeed.org/version/1.1', 'title': title, 'language': 'zh-CN',
+              'home_page_url': _link(site_url, 'index.html'), 'feed_url': _link(site_url, feed_path)}
+    # Header first, then one item at a time
+    f.write(json.dumps(header, ensure_ascii=False)[:-1] + ', "items": [')
+    for index, article in enumerate(items):
+        item = {
+            'id': article.url,
+            'url': article.url,
+            'title': article.title,
+            'authors': [{'name': article.source}],
+            'tags': [article.category],
+        }
+        if article.description:
+            item['summary'] = article.description
+            item['content_text'] = article.description
+        published = _published(article)
+        if published is not None:
+            item['date_published'] = _rfc3339(published)
+        f.write((',\n' if index else '\n') + json.dumps(item, ensure_ascii=False))
+    f.write('\n]}\n')
+
+
+WRITERS = {
+    'atom': write_atom,
+    'rss': write_rss,
+    'json': write_json_feed,
+}
+
+
+def _feeds(articles, limit, groups=True):
+    """(directory, title, most recent items) of the overall and, with groups, the per-category and per-source feeds"""
+    by_category = {}
+    by_source = {}
+    everything = []
+    for category in records.CATEGORIES:
+        for article in articles.get(category, []):
+            article = records.Article.coerce(article)
+            everything.append(article)
+            by_category.setdefault(article.category, []).append(article)
+            by_source.setdefault(article.source, []).append(article)
+
+    def recent(items):
+        # Same order as sorted(..., reverse=True)[:limit] without sorting the whole list
+        return heapq.nlargest(limit, items, key=lambda article: article.date)
+
+    yield 'all', FEED_TITLE, recent(everything)
+    if not groups:
+        return
+    for category, items in by_category.items():
+        yield f"category/{category}", f"{FEED_TITLE} - {CATEGORY_TITLES.get(category, category)}", recent(items)
+    for source, items in by_source.items():
+        yield f"source/{source_slug(source)}", f"{FEED_TITLE} - {source}", recent(items)
+
+
+def write_feeds(articles, output_dir, limit=DEFAULT_ITEMS, site_url=None, groups=True, title=FEED_TITLE):
+    """
+    Write every feed below output_dir ('<dir>/atom.xml', 'rss.xml', 'feed.json' for 'all',
+    'category/<name>' and 'source/<key>'; groups=False writes only 'all', titled title).
+    Links are absolute below site_url, default_site_url() when not given. Returns the number
+    of feed directories written.
+    """
+    site_url = site_url or default_site_url()
+    written = 0
+    # Links are relative to the site root, which holds the page and the feeds directory
+    prefix = os.path.basename(os.path.normpath(output_dir))
+    for directory, feed_title, items in _feeds(articles, limit, groups):
+        if directory == 'all':
+            feed_title = title
+        feed_dir = os.path.join(output_dir, *directory.split('/'))
+        os.makedirs(feed_dir, exist_ok=True)
+        for name, file_name in FORMATS.items():
+            feed_path = f"{prefix}/{directory}/{file_name}"
+            with artifacts.open_text(os.path.join(feed_dir, file_name)) as f:
+                WRITERS[name](f, feed_title, items, feed_path, site_url)
+        written += 1
+    logger.info(f"Feeds generated: {written} feeds with up to {limit} items in {output_dir}")
+    return written
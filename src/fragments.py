@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Incremental page rendering
+Each article card is rendered once and cached under a hash of the article's content;
+later renders reuse the cached fragments and only format new or changed articles, so
+render time follows the delta instead of the size of the store
+"""
+
+import hashlib
+import html
+import json
+import logging
+import os
+
+import classify
+
+logger = logging.getLogger(__name__)
+
+# Descriptions longer than this are cut off on the page
+DESCRIPTION_LIMIT = 500
+
+CARD_TEMPLATE = '''
+                    <div class="article-card" data-date="{date}" data-tags="{tags}">
+                        <div class="article-source">来源: {source}</div>
+                        <h3 class="article-title"><a href="{url}" target="_blank">{title}</a></h3>
+                        {description}{tag_labels}
+                        <div class="article-date">发布日期: {date}</div>
+                    </div>'''
+
+DESCRIPTION_TEMPLATE = '<p class="article-description">{description}</p>'
+TAG_TEMPLATE = '<span class="article-tag">{label}</span>'
+
+# Cached fragments are dropped whenever the card markup changes
+RENDER_VERSION = hashlib.sha1(f"{CARD_TEMPLATE}{DESCRIPTION_TEMPLATE}{TAG_TEMPLATE}{DESCRIPTION_LIMIT}{classify.TAGS}".encode('utf-8')).hexdigest()[:12]
+
+
+def truncate_description(desc, max_length=DESCRIPTION_LIMIT):
+    if not desc:
+        return desc
+    if len(desc) > max_length:
+        return desc[:max_length] + "..."
+    return desc
+
+
+def render_card(article):
+    """The HTML card of one article"""
+    description = ''
+    if article.description:
+        description = DESCRIPTION_TEMPLATE.format(description=html.escape(truncate_description(article.description)))
+    tag_labels = ''
+    if article.tags:
+        tag_labels = f"""
+                        <div class="article-tags">{''.join(TAG_TEMPLATE.format(label=classify.TAGS.get(tag, tag)) for tag in article.tags)}</div>"""
+    return CARD_TEMPLATE.format(date=article.date_text, source=article.source, url=article.url,
+                                title=html.escape(article.title), description=description,
+                                tags=' '.join(article.tags), tag_labels=tag_labels)
+
+
+def _content(article):
+    """Everything that appears on an article's card"""
+    return article.title, article.url, article.source, article.description or '', article.date_text, article.tags
+
+
+def article_key(article):
+    """Hash of an article's card content, the key of its fragment in the manifest"""
+    content = '\x1f'.join((*_content(article)[:-1], ' '.join(article.tags)))
+    return hashlib.blake2b(content.encode('utf-8'), digest_size=16).hexdigest()
+
+
+class FragmentCache:
+    """
+    Rendered cards by article hash. With a path the cache is persisted as a manifest
+    between runs; without one it only lives in the process (e.g. the scheduler).
+    """
+
+    def __init__(self, path=None):
+        self.path = path
+        self.fragments = {}
+        # Card content -> (key, fragment) of this process; spares hashing articles seen before
+        self._by_content = {}
+        self.used = set()
+        self.rendered = 0
+        self.reused = 0
+        self.dirty = False
+
+    @classmethod
+    def open(cls, path):
+        cache = cls(path)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return cache
+        except (OSError, ValueError) as e:
+            logger.warning(f"Could not read render cache {path}: {str(e)}, rendering every card")
+            return cache
+        if data.get('version') == RENDER_VERSION:
+            cache.fragments = data.get('fragments', {})
+        else:
+            logger.info("Card markup changed, rendering every card")
+        return cache
+
+    def begin(self):
+        """Start a render: reset the counters and the set of fragments in use"""
+        self.used = set()
+        self.rendered = 0
+        self.reused = 0
+
+    def card(self, article):
+        content = _content(article)
+        hit = self._by_content.get(content)
+        if hit is not None:
+            key, fragment = hit
+            self.used.add(key)
+            self.reused += 1
+            return fragment
+        key = article_key(article)
+        self.used.add(key)
+        fragment = self.fragments.get(key)
+        if fragment is None:
+            fragment = render_card(article)
+            self.fragments[key] = fragment
+            self.rendered += 1
+            self.dirty = True
+        else:
+            self.reused += 1
+        self._by_content[content] = (key, fragment)
+        return fragment
+
+    def finish(self):
+        """End a render: drop fragments of articles no longer on the page and persist changes"""
+        stale = set(self.fragments) - self.used
+        if stale:
+            for key in stale:
+                del self.fragments[key]
+            self._by_content = {content: hit for content, hit in self._by_content.items() if hit[0] in self.used}
+            self.dirty = True
+        if self.path and self.dirty:
+            self.save()
+        logger.info(f"Rendered {self.rendered} new or changed cards, reused {self.reused}")
+
+    def save(self):
+        temp_path = f"{self.path}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump({'version': RENDER_VERSION, 'fragments': self.fragments}, f, ensure_ascii=False, separators=(',', ':'))
+        os.replace(temp_path, self.path)
+        self.dirty = False
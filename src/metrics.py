@@ -0,0 +1,277 @@
+#!/usr/bin/env python3
+"""
+Per-source run metrics
+Tracks wall time split into network, sleep, parse and extract, request counts, bytes,
+HTTP status histograms and item counts, and exports them as JSON or Prometheus text
+"""
+
+import json
+import logging
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime
+
+logger = logging.getLogger(__name__)
+
+# Metrics of the source being scraped on the current thread
+_current = threading.local()
+
+
+class SourceMetrics:
+    """Counters collected while scraping a single source"""
+
+    def __init__(self, key, name):
+        self.key = key
+        self.name = name
+        self.wall_s = 0.0
+        self.network_s = 0.0
+        self.sleep_s = 0.0
+        self.parse_s = 0.0
+        self.requests = 0
+        self.errors = 0
+        self.bytes_compressed = 0
+        self.bytes_decompressed = 0
+        self.status = Counter()
+        self.items_found = 0
+        self.items_kept = 0
+        # Circuit breaker state after the run, None when breakers are disabled
+        self.circuit = None
+        self._lock = threading.Lock()
+
+    @property
+    def extract_s(self):
+        """Time not spent on the network, sleeping or parsing HTML"""
+        return max(0.0, self.wall_s - self.network_s - self.sleep_s - self.parse_s)
+
+    def to_dict(self):
+        return {
+            'name': self.name,
+            'wall_s': round(self.wall_s, 6),
+            'network_s': round(self.network_s, 6),
+            'sleep_s': round(self.sleep_s, 6),
+            'parse_s': round(self.parse_s, 6),
+            'extract_s': round(self.extract_s, 6),
+            'requests': self.requests,
+            'errors': self.errors,
+            'bytes_compressed': self.bytes_compressed,
+            'bytes_decompressed': self.bytes_decompressed,
+            'status': {str(code): count for code, count in sorted(self.status.items(), key=lambda item: str(item[0]))},
+            'items_found': self.items_found,
+            'items_kept': self.items_kept,
+            'circuit': self.circuit,
+        }
+
+
+class RunMetrics:
+    """Metrics of one aggregator run, keyed by source"""
+
+    def __init__(self):
+        self.started_at = datetime.now()
+        self.sources = {}
+        self.stages = {}
+        # Sources skipped or cut short by the run's time budget
+        self.deadline_hit = []
+
+    @contextmanager
+    def source(self, key, name):
+        """Attribute everything recorded on this thread to the given source"""
+        metrics = self.sources.setdefault(key, SourceMetrics(key, name))
+        previous = getattr(_current, 'metrics', None)
+        _current.metrics = metrics
+        start = time.perf_counter()
+        try:
+            yield metrics
+        finally:
+            metrics.wall_s += time.perf_counter() - start
+            _current.metrics = previous
+
+    @contextmanager
+    def stage(self, name):
+        """Time a run-level stage such as dedup/filter or rendering"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stages[name] = self.stages.get(name, 0.0) + time.perf_counter() - start
+
+    def to_dict(self):
+        return {
+            'started_at': self.started_at.isoformat(timespec='seconds'),
+            'finished_at': datetime.now().isoformat(timespec='seconds'),
+            'stages': {name: round(seconds, 6) for name, seconds in self.stages.items()},
+            'deadline_hit': list(self.deadline_hit),
+            'sources': {key: metrics.to_dict() for key, metrics in self.sources.items()},
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        """Rebuild run metrics from a saved run report"""
+        run = cls()
+        run.started_at = datetime.fromisoformat(data['started_at'])
+        run.stages = dict(data.get('stages', {}))
+        run.deadline_hit = list(data.get('deadline_hit', []))
+        for key, values in data.get('sources', {}).items():
+            source = SourceMetrics(key, values['name'])
+            for field in ('wall_s', 'network_s', 'sleep_s', 'parse_s', 'requests', 'errors',
+                          'bytes_compressed', 'bytes_decompressed', 'items_found', 'items_kept'):
+                setattr(source, field, values.get(field, 0))
+            source.circuit = values.get('circuit')
+            source.status = Counter({int(code) if code.isdigit() else code: count
+                                     for code, count in values.get('status', {}).items()})
+            run.sources[key] = source
+        return run
+
+    def write_json(self, path):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f, ensure_ascii=False, indent=2)
+        logger.info(f"Run report saved to {path}")
+
+    def to_prometheus(self):
+        """Render the metrics in the Prometheus text exposition format"""
+        lines = []
+
+        def metric(name, kind, help_text, samples):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            for labels, value in samples:
+                label_text = ','.join(f'{label}="{_escape_label(str(label_value))}"' for label, label_value in labels)
+                lines.append(f"{name}{{{label_text}}} {value}")
+
+        sources = list(self.sources.values())
+        metric('secnews_source_seconds', 'gauge', 'Wall time spent per source and phase',
+               [((('source', m.key), ('phase', phase)), round(getattr(m, f'{phase}_s'), 6))
+                for m in sources for phase in ('wall', 'network', 'sleep', 'parse', 'extract')])
+        metric('secnews_source_requests_total', 'counter', 'HTTP requests issued per source',
+               [((('source', m.key),), m.requests) for m in sources])
+        metric('secnews_source_request_errors_total', 'counter', 'HTTP requests that failed without a response',
+               [((('source', m.key),), m.errors) for m in sources])
+        metric('secnews_source_bytes_total', 'counter', 'Bytes downloaded per source',
+               [((('source', m.key), ('encoding', encoding)), getattr(m, f'bytes_{encoding}'))
+                for m in sources for encoding in ('compressed', 'decompressed')])
+        metric('secnews_source_http_responses_total', 'counter', 'HTTP responses per source and status code',
+               [((('source', m.key), ('status', code)), count) for m in sources for code, count in sorted(m.status.items(), key=lambda item: str(item[0]))])
+        metric('secnews_source_items', 'gauge', 'Articles found and kept per source',
+               [((('source', m.key), ('stage', stage)), getattr(m, f'items_{stage}'))
+                for m in sources for stage in ('found', 'kept')])
+        metric('secnews_source_circuit_open', 'gauge', 'Whether the source circuit breaker is open (1) or half-open/closed (0)',
+               [((('source', m.key),), int(m.circuit == 'open')) for m in sources if m.circuit is not None])
+        metric('secnews_source_deadline_hit', 'gauge', 'Whether the source was skipped or cut short by the time budget',
+               [((('source', m.key),), int(m.key in self.deadline_hit)) for m in sources])
+        metric('secnews_stage_seconds', 'gauge', 'Wall time spent in run-level stages',
+               [((('stage', name),), round(seconds, 6)) for name, seconds in self.stages.items()])
+        return '\n'.join(lines) + '\n'
+
+    def write_prometheus(self, path):
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(self.to_prometheus())
+        logger.info(f"Prometheus metrics saved to {path}")
+
+
+def format_report(report):
+    """Render a saved run report as a plain-text table"""
+    header = f"{'source':<15}{'wall':>8}{'net':>8}{'sleep':>8}{'parse':>8}{'extract':>8}{'req':>5}{'KiB':>9}{'found':>7}{'kept':>6}  status"
+    lines = [f"Run {report['started_at']} -> {report['finished_at']}", header, '-' * len(header)]
+    for key, source in report['sources'].items():
+        status = ' '.join(f"{code}x{count}" for code, count in source['status'].items())
+        if source.get('circuit') not in (None, 'closed'):
+            status = f"[{source['circuit']}] {status}"
+        lines.append(
+            f"{key:<15}{source['wall_s']:>8.2f}{source['network_s']:>8.2f}{source['sleep_s']:>8.2f}"
+            f"{source['parse_s']:>8.2f}{source['extract_s']:>8.2f}{source['requests']:>5}"
+            f"{source['bytes_compressed'] / 1024:>9.1f}{source['items_found']:>7}{source['items_kept']:>6}  {status}")
+    for name, seconds in report.get('stages', {}).items():
+        lines.append(f"stage {name}: {seconds:.3f}s")
+    if report.get('deadline_hit'):
+        lines.append(f"time budget hit: {', '.join(report['deadline_hit'])}")
+    return '\n'.join(lines)
+
+
+def _escape_label(value):
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def current():
+    """Metrics of the source being scraped on this thread, or None"""
+    return getattr(_current, 'metrics', None)
+
+
+def record_sleep(seconds):
+    metrics = current()
+    if metrics is not None:
+        with metrics._lock:
+            metrics.sleep_s += seconds
+
+
+def record_response(metrics, status, compressed, decompressed, elapsed):
+    """Count one answered request for a source (metrics may be None)"""
+    if metrics is None:
+        return
+    with metrics._lock:
+        metrics.requests += 1
+        metrics.network_s += elapsed
+        metrics.bytes_compressed += compressed
+        metrics.bytes_decompressed += decompressed
+        metrics.status[status] += 1
+
+
+def record_error(metrics, elapsed):
+    """Count one request that failed without a response"""
+    if metrics is None:
+        return
+    with metrics._lock:
+        metrics.requests += 1
+        metrics.errors += 1
+        metrics.network_s += elapsed
+        metrics.status['error'] += 1
+
+
+@contextmanager
+def timed_parse():
+    """Attribute the enclosed HTML parsing time to the current source"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        metrics = current()
+        if metrics is not None:
+            with metrics._lock:
+                metrics.parse_s += time.perf_counter() - start
+
+
+class MeteredAdapter:
+    """
+    Transport adapter wrapper that counts requests, bytes, status codes and network
+    time for the current source. Bodies are read inside the timed region so the
+    download is attributed to the network rather than to the caller.
+    """
+
+    def __init__(self, inner):
+        self.inner = inner
+
+    def send(self, request, **kwargs):
+        metrics = current()
+        start = time.perf_counter()
+        try:
+            response = self.inner.send(request, **kwargs)
+            if not kwargs.get('stream'):
+                response.content
+        except Exception:
+            record_error(metrics, time.perf_counter() - start)
+            raise
+
+        if metrics is not None:
+            decompressed = len(response.content) if not kwargs.get('stream') else 0
+            compressed = decompressed
+            raw_tell = getattr(response.raw, 'tell', None)
+            if raw_tell is not None:
+                try:
+                    compressed = raw_tell()
+                except Exception:
+                    pass
+            record_response(metrics, response.status_code, compressed, decompressed, time.perf_counter() - start)
+        return response
+
+    def close(self):
+        self.inner.close()
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Opt-in stage profiler
+Wraps scrapers, the dedup/filter stage and rendering in cProfile and aggregates the
+per-stage profiles into a hot function table. Only one profiler can be active at a time
+(Python 3.12+ refuses a second one), so profiled runs scrape the sources one after another.
+"""
+
+import cProfile
+import io
+import json
+import logging
+import os
+import pstats
+import re
+import threading
+import time
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+
+class StageProfiler:
+    """Writes one .prof file per stage plus an aggregated top-N summary"""
+
+    def __init__(self, output_dir, top=30):
+        self.output_dir = output_dir
+        self.top = top
+        self.profiles = []
+        self.stage_times = {}
+        # Guards profiles and stage_times, which also number the .prof files
+        self._lock = threading.Lock()
+        os.makedirs(output_dir, exist_ok=True)
+
+    @contextmanager
+    def stage(self, name):
+        """Profile the enclosed block as the given stage"""
+        profile = cProfile.Profile()
+        start = time.perf_counter()
+        profile.enable()
+        try:
+            yield
+        finally:
+            profile.disable()
+            elapsed = time.perf_counter() - start
+            with self._lock:
+                self.stage_times[name] = self.stage_times.get(name, 0.0) + elapsed
+                path = os.path.join(self.output_dir, f"{len(self.profiles):02d}-{_safe_name(name)}.prof")
+                self.profiles.append((name, path))
+            profile.dump_stats(path)
+
+    def hot_functions(self):
+        """Top functions by own time across all stages"""
+        if not self.profiles:
+            return []
+        stats = pstats.Stats(*[path for _, path in self.profiles])
+        rows = []
+        for (filename, line, function), (primitive_calls, calls, own_time, cumulative_time, _) in stats.stats.items():
+            rows.append({
+                'function': f"{filename}:{line}({function})",
+                'calls': calls,
+                'primitive_calls': primitive_calls,
+                'tottime_s': round(own_time, 6),
+                'cumtime_s': round(cumulative_time, 6),
+            })
+        rows.sort(key=lambda row: row['tottime_s'], reverse=True)
+        return rows[:self.top]
+
+    def write_summary(self):
+        """Write summary.txt (pstats tables) and summary.json (stage times and hot functions)"""
+        if not self.profiles:
+            logger.info("No stages were profiled")
+            return
+
+        stream = io.StringIO()
+        stream.write("Stage wall times:\n")
+        for name, seconds in self.stage_times.items():
+            stream.write(f"  {name:<30} {seconds:10.3f}s\n")
+        stream.write("\n")
+        stats = pstats.Stats(*[path for _, path in self.profiles], stream=stream)
+        stats.sort_stats('tottime').print_stats(self.top)
+        stats.sort_stats('cumulative').print_stats(self.top)
+        with open(os.path.join(self.output_dir, 'summary.txt'), 'w', encoding='utf-8') as f:
+            f.write(stream.getvalue())
+
+        summary = {
+            'stages': {name: round(seconds, 6) for name, seconds in self.stage_times.items()},
+            'profiles': {name: os.path.basename(path) for name, path in self.profiles},
+            'hot_functions': self.hot_functions(),
+        }
+        with open(os.path.join(self.output_dir, 'summary.json'), 'w', encoding='utf-8') as f:
+            json.dump(summary, f, ensure_ascii=False, indent=2)
+        logger.info(f"Profiles for {len(self.profiles)} stages written to {self.output_dir}")
+
+
+def _safe_name(name):
+    return re.sub(r'[^A-Za-z0-9_.-]+', '_', name)
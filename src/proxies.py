@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""
+Proxy pool
+Keeps a configurable pool of HTTP proxies with health scores and latency tracking, and
+remembers per host whether direct or proxied routing worked last time
+"""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from urllib.parse import urlparse
+
+logger = logging.getLogger(__name__)
+
+DIRECT = 'direct'
+
+# Weight of the newest observation in the health score and latency averages
+EWMA_ALPHA = 0.3
+# Proxies scoring below this are only used when no healthy proxy is left
+MIN_HEALTHY_SCORE = 0.3
+# Actively re-check the pool when the last check is older than this
+CHECK_INTERVAL_S = 6 * 3600
+DEFAULT_CHECK_URL = 'https://www.gstatic.com/generate_204'
+
+
+class Proxy:
+    """One proxy with an exponentially weighted health score and latency"""
+
+    def __init__(self, url):
+        self.url = url
+        self.score = 1.0
+        self.latency_s = None
+        self.successes = 0
+        self.failures = 0
+
+    @property
+    def id(self):
+        # Proxy URLs may carry credentials, so persisted state only refers to a digest
+        return hashlib.sha1(self.url.encode('utf-8')).hexdigest()[:12]
+
+    @property
+    def label(self):
+        parsed = urlparse(self.url)
+        return f"{parsed.scheme}://{parsed.hostname}:{parsed.port}" if parsed.port else f"{parsed.scheme}://{parsed.hostname}"
+
+    @property
+    def healthy(self):
+        return self.score >= MIN_HEALTHY_SCORE
+
+    def record(self, ok, elapsed=None):
+        self.score = (1 - EWMA_ALPHA) * self.score + EWMA_ALPHA * (1.0 if ok else 0.0)
+        if ok:
+            self.successes += 1
+            if elapsed is not None:
+                self.latency_s = elapsed if self.latency_s is None else (1 - EWMA_ALPHA) * self.latency_s + EWMA_ALPHA * elapsed
+        else:
+            self.failures += 1
+
+    def to_dict(self):
+        return {
+            'score': round(self.score, 4),
+            'latency_s': round(self.latency_s, 4) if self.latency_s is not None else None,
+            'successes': self.successes,
+            'failures': self.failures,
+        }
+
+
+class ProxyPool:
+    """Configured proxies plus the route (direct or a proxy) that last worked for each host"""
+
+    def __init__(self, urls=(), state_path=None):
+        self.proxies = [Proxy(url) for url in dict.fromkeys(urls)]
+        self.state_path = state_path
+        self.host_routes = {}
+        self.checked_at = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, config_path=None, state_path=None):
+        """
+        Build the pool from a file with one proxy URL per line ('#' starts a comment) or,
+        without a file, from the comma-separated SECNEWS_PROXIES environment variable
+        """
+        config_path = config_path or os.environ.get('SECNEWS_PROXY_FILE')
+        if config_path:
+            with open(config_path, 'r', encoding='utf-8') as f:
+                urls = [line.split('#', 1)[0].strip() for line in f]
+        else:
+            urls = os.environ.get('SECNEWS_PROXIES', '').split(',')
+        pool = cls([url.strip() for url in urls if url.strip()], state_path)
+        if state_path:
+            pool.load()
+        return pool
+
+    def __bool__(self):
+        return bool(self.proxies)
+
+    def load(self):
+        try:
+            with open(self.state_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return self
+        except (OSError, ValueError) as e:
+            logger.warning(f"Could not read proxy state {self.state_path}: {str(e)}, starting fresh")
+            return self
+        saved = data.get('proxies', {})
+        for proxy in self.proxies:
+            values = saved.get(proxy.id)
+            if values:
+                proxy.score = values.get('score', 1.0)
+                proxy.latency_s = values.get('latency_s')
+                proxy.successes = values.get('successes', 0)
+                proxy.failures = values.get('failures', 0)
+        known = {proxy.id for proxy in self.proxies} | {DIRECT}
+        # Drop remembered routes through proxies that are no longer configured
+        self.host_routes = {host: route for host, route in data.get('hosts', {}).items() if route in known}
+        self.checked_at = data.get('checked_at')
+        return self
+
+    def save(self):
+        if not self.state_path:
+            return
+        with self._lock:
+            data = {
+                'checked_at': self.checked_at,
+                'proxies': {proxy.id: proxy.to_dict() for proxy in self.proxies},
+                'hosts': dict(sorted(self.host_routes.items())),
+            }
+        with open(self.state_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+        logger.info(f"Proxy state saved to {self.state_path}")
+
+    def _proxy(self, route):
+        return next((proxy for proxy in self.proxies if proxy.id == route), None)
+
+    def ranked(self):
+        """Healthy proxies first, then by score and latency"""
+        return sorted(self.proxies, key=lambda proxy: (not proxy.healthy, -proxy.score,
+                                                       proxy.latency_s if proxy.latency_s is not None else float('inf')))
+
+    def routes(self, url):
+        """Routes to try for url: the one that worked last for its host first, then direct, then proxies by health"""
+        routes = [DIRECT] + [proxy.id for proxy in self.ranked()]
+        last = self.host_routes.get(urlparse(url).hostname)
+        if last in routes:
+            routes.remove(last)
+            routes.insert(0, last)
+        return routes
+
+    def requests_proxies(self, route):
+        """The proxies mapping to pass to requests for a route (None for direct)"""
+        proxy = self._proxy(route)
+        if proxy is None:
+            return None
+        return {'http': proxy.url, 'https': proxy.url}
+
+    def describe(self, route):
+        proxy = self._proxy(route)
+        return proxy.label if proxy is not None else DIRECT
+
+    def record(self, url, route, ok, elapsed=None):
+        """Update the proxy's health and remember a working route for the host"""
+        with self._lock:
+            proxy = self._proxy(route)
+            if proxy is not None:
+                proxy.record(ok, elapsed)
+            if ok:
+                self.host_routes[urlparse(url).hostname] = route
+
+    def check_due(self):
+        if not self.proxies:
+            return False
+        if self.checked_at is None:
+            return True
+        return (datetime.now() - datetime.fromisoformat(self.checked_at)).total_seconds() > CHECK_INTERVAL_S
+
+    def check(self, http_session, url=DEFAULT_CHECK_URL, timeout=5):
+        """Actively probe every proxy in parallel and fold the results into their health"""
+        def probe(proxy):
+            start = time.perf_counter()
+            try:
+                response = http_session.get(url, proxies={'http': proxy.url, 'https': proxy.url}, timeout=timeout, stream=True)
+                response.close()
+                ok = response.status_code < 400
+            except Exception:
+                ok = False
+            with self._lock:
+                proxy.record(ok, time.perf_counter() - start)
+            return ok
+
+        with ThreadPoolExecutor(max_workers=min(8, len(self.proxies))) as executor:
+            results = list(executor.map(probe, self.proxies))
+        self.checked_at = datetime.now().isoformat(timespec='seconds')
+        logger.info(f"Proxy health check: {sum(results)}/{len(results)} proxies reachable")
@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""
+Compact article records
+Articles are kept as slotted objects with interned source and category names and an
+integer YYYYMMDD date, and round-trip to the articles.json schema unchanged: a stored
+date that is not in YYYY-MM-DD form keeps its original text
+"""
+
+import json
+import sys
+from datetime import date as _date
+from functools import lru_cache
+
+CATEGORIES = ('tech', 'news')
+
+# Field order of the articles.json schema
+FIELDS = ('title', 'url', 'source', 'description', 'date', 'category', 'tags')
+
+UNKNOWN_DATE = 0
+
+
+@lru_cache(maxsize=4096)
+def parse_date(text):
+    """
+    'YYYY-MM-DD' to an integer YYYYMMDD, or UNKNOWN_DATE if it does not parse.
+    Cached, so every article of the same day shares one int object.
+    """
+    try:
+        year, month, day = text.split('-')
+        return date_value(_date(int(year), int(month), int(day)))
+    except (AttributeError, ValueError):
+        return UNKNOWN_DATE
+
+
+@lru_cache(maxsize=4096)
+def format_date(value):
+    """Integer YYYYMMDD back to 'YYYY-MM-DD' ('' for an unknown date)"""
+    if value == UNKNOWN_DATE:
+        return ''
+    return f"{value // 10000:04d}-{value // 100 % 100:02d}-{value % 100:02d}"
+
+
+def date_fields(value):
+    """(integer date, original text or None) of a date given as an int or as stored text"""
+    if isinstance(value, int):
+        return value, None
+    parsed = parse_date(value)
+    # Text that would not be written back unchanged ('2小时前', '2026-1-5') is kept as it was
+    if not value or format_date(parsed) == value:
+        return parsed, None
+    return parsed, value
+
+
+def intern_tags(tags):
+    """Topic tags as a tuple shared by every article with the same tags"""
+    return _intern_tags(tuple(tags))
+
+
+@lru_cache(maxsize=256)
+def _intern_tags(tags):
+    return tuple(map(sys.intern, tags))
+
+
+def date_value(day):
+    """Integer YYYYMMDD of a date or datetime"""
+    return day.year * 10000 + day.month * 100 + day.day
+
+
+class Article:
+    """
+    One scraped article. Item access (article['date']) mirrors the articles.json dict
+    schema, so code written against plain dicts keeps working.
+    """
+
+    # date_raw holds the stored text of a date that does not format back from the integer
+    __slots__ = FIELDS + ('date_raw',)
+
+    def __init__(self, title, url, source, description='', date=UNKNOWN_DATE, category='news', tags=()):
+        self.title = title
+        self.url = url
+        self.source = sys.intern(source)
+        self.description = description
+        self.date, self.date_raw = date_fields(date)
+        self.category = sys.intern(category)
+        self.tags = intern_tags(tags)
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data.get('title', ''), data.get('url', ''), data.get('source', ''),
+                   data.get('description', ''), data.get('date', ''), data.get('category', 'news'), data.get('tags', ()))
+
+    @classmethod
+    def coerce(cls, article):
+        """Accept either an Article or an articles.json style dict"""
+        return article if isinstance(article, cls) else cls.from_dict(article)
+
+    @property
+    def date_text(self):
+        return format_date(self.date) if self.date_raw is None else self.date_raw
+
+    def to_dict(self):
+        return {
+            'title': self.title,
+            'url': self.url,
+            'source': self.source,
+            'description': self.description,
+            'date': self.date_text,
+            'category': self.category,
+            'tags': list(self.tags),
+        }
+
+    def __getitem__(self, key):
+        if key == 'date':
+            return self.date_text
+        if key not in FIELDS:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __setitem__(self, key, value):
+        if key not in FIELDS:
+            raise KeyError(key)
+        if key == 'date':
+            self.date, self.date_raw = date_fields(value)
+            return
+        if key in ('source', 'category'):
+            value = sys.intern(value)
+        elif key == 'tags':
+            value = intern_tags(value)
+        setattr(self, key, value)
+
+    def get(self, key, default=None):
+        return self[key] if key in FIELDS else default
+
+    def __eq__(self, other):
+        if not isinstance(other, Article):
+            return NotImplemented
+        return self.date_raw == other.date_raw and all(getattr(self, field) == getattr(other, field) for field in FIELDS)
+
+    __hash__ = None
+
+    def __repr__(self):
+        return f"Article({self.source!r}, {self.date_text!r}, {self.title!r})"
+
+
+def from_json_dict(data):
+    """{'tech': [dict, ...], 'news': [...]} as loaded from articles.json to Article lists"""
+    return {category: [Article.from_dict(item) for item in data.get(category, [])] for category in CATEGORIES}
+
+
+def from_scraped(articles):
+    """Convert the dicts a scraper appended into Article records"""
+    return {category: [Article.coerce(item) for item in articles.get(category, [])] for category in CATEGORIES}
+
+
+def _default(value):
+    if isinstance(value, Article):
+        data = value.to_dict()
+        # Stores written before articles had tags round-trip unchanged
+        if not data['tags']:
+            del data['tags']
+        return data
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dump(articles, f):
+    """Write Article lists in the articles.json format, converting records as they are encoded"""
+    json.dump(articles, f, ensure_ascii=False, indent=2, default=_default)
+
+
+def load(f):
+    return from_json_dict(json.load(f))
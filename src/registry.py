@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Source registry
+Every source declares its metadata and scheduling hints here; built-in sources are
+registered by scrape_news and third-party packages can add their own through the
+'secnews.sources' entry point group
+"""
+
+import logging
+import threading
+from datetime import datetime, timedelta
+
+logger = logging.getLogger(__name__)
+
+ENTRY_POINT_GROUP = 'secnews.sources'
+
+# Page sections a source can file its articles under
+CATEGORIES = ('tech', 'news')
+
+
+class SourceSpec:
+    """
+    Metadata of one source.
+    scraper is either the name of a SecurityNewsAggregator method or a callable taking the
+    (per-source) aggregator, which appends article dicts to aggregator.articles[category].
+    """
+
+    def __init__(self, key, name, scraper, category, base_url, refresh_hours=24, politeness_s=1.0,
+                 needs_enrichment=False, needs_cloudscraper=False):
+        self.key = key
+        self.name = name
+        self.scraper = scraper
+        self.category = category
+        self.base_url = base_url
+        # Expected update frequency; with --due-only a source is scraped at most this often
+        self.refresh_hours = refresh_hours
+        # Minimum spacing between two requests to the source's host
+        self.politeness_s = politeness_s
+        # Articles carry placeholder descriptions until their detail pages are fetched
+        self.needs_enrichment = needs_enrichment
+        self.needs_cloudscraper = needs_cloudscraper
+
+    def run(self, aggregator):
+        if callable(self.scraper):
+            return self.scraper(aggregator)
+        return getattr(aggregator, self.scraper)()
+
+    def is_due(self, last_success, now=None):
+        """Whether the refresh interval has passed since the last successful scrape (ISO timestamp or None)"""
+        if not last_success:
+            return True
+        now = now or datetime.now()
+        return now - datetime.fromisoformat(last_success) >= timedelta(hours=self.refresh_hours)
+
+    def __repr__(self):
+        return f"SourceSpec({self.key!r}, {self.name!r})"
+
+
+_sources = {}
+_plugins_loaded = False
+_lock = threading.Lock()
+
+
+def register(spec):
+    """Add a source; registering an existing key replaces it"""
+    if spec.category not in CATEGORIES:
+        raise ValueError(f"Source {spec.key} has unknown category {spec.category!r}, expected one of {', '.join(CATEGORIES)}")
+    with _lock:
+        _sources[spec.key] = spec
+    return spec
+
+
+def get(key):
+    load_plugins()
+    return _sources[key]
+
+
+def all_sources():
+    """Registered sources in registration order (built-ins first, then plugins)"""
+    load_plugins()
+    return list(_sources.values())
+
+
+def keys():
+    return [spec.key for spec in all_sources()]
+
+
+def by_name(name):
+    """Source spec for an article source name, or None"""
+    return next((spec for spec in all_sources() if spec.name == name), None)
+
+
+def _entry_points():
+    from importlib import metadata
+    entry_points = metadata.entry_points()
+    if hasattr(entry_points, 'select'):
+        return entry_points.select(group=ENTRY_POINT_GROUP)
+    # Python < 3.10 returns a dict of groups
+    return entry_points.get(ENTRY_POINT_GROUP, [])
+
+
+def load_plugins():
+    """
+    Register sources from installed 'secnews.sources' entry points. An entry point may
+    refer to a SourceSpec, a list of them, or a callable returning either.
+    """
+    global _plugins_loaded
+    if _plugins_loaded:
+        return
+    _plugins_loaded = True
+    for entry_point in _entry_points():
+        try:
+            loaded = entry_point.load()
+            if callable(loaded) and not isinstance(loaded, SourceSpec):
+                loaded = loaded()
+            specs = loaded if isinstance(loaded, (list, tuple)) else [loaded]
+            for spec in specs:
+                if spec.key in _sources:
+                    logger.warning(f"Source plugin {entry_point.name} replaces built-in source {spec.key}")
+                register(spec)
+            logger.info(f"Loaded source plugin {entry_point.name}: {', '.join(spec.key for spec in specs)}")
+        except Exception as e:
+            logger.error(f"Could not load source plugin {entry_point.name}: {str(e)}")
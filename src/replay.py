@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+HTTP record/replay layer
+Records scraper responses into a compressed fixture archive and serves them back offline
+"""
+
+import hashlib
+import json
+import logging
+import threading
+import zipfile
+from datetime import timedelta
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+
+import decoding
+
+logger = logging.getLogger(__name__)
+
+MODE_RECORD = 'record'
+MODE_REPLAY = 'replay'
+MODES = (MODE_RECORD, MODE_REPLAY)
+
+# Bodies are stored decoded, so transport-level headers no longer describe them
+_DROPPED_HEADERS = ('content-encoding', 'content-length', 'transfer-encoding')
+
+
+class MissingFixture(requests.exceptions.RequestException):
+    """
+    A replayed request that was never recorded. It is not a ConnectionError, so retry
+    loops give up at once instead of waiting for a fixture that cannot appear.
+    """
+
+
+class FixtureArchive:
+    """Zip archive of recorded responses keyed by request method and URL"""
+
+    INDEX_NAME = 'index.json'
+
+    def __init__(self, path):
+        self.path = path
+        self.entries = {}
+        self._bodies = {}
+        # Requests replayed without a recorded response, as 'METHOD URL'
+        self.misses = []
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(method, url):
+        return hashlib.sha1(f"{method.upper()} {url}".encode('utf-8')).hexdigest()
+
+    def load(self):
+        """Load all recorded responses from the archive"""
+        with zipfile.ZipFile(self.path) as archive:
+            self.entries = json.loads(archive.read(self.INDEX_NAME).decode('utf-8'))
+            self._bodies = {key: archive.read(f"bodies/{key}") for key in self.entries}
+        logger.info(f"Loaded {len(self.entries)} recorded responses from {self.path}")
+        return self
+
+    def save(self):
+        """Write all recorded responses to the archive"""
+        with self._lock:
+            entries = dict(self.entries)
+            bodies = dict(self._bodies)
+        with zipfile.ZipFile(self.path, 'w', compression=zipfile.ZIP_DEFLATED, compresslevel=9) as archive:
+            archive.writestr(self.INDEX_NAME, json.dumps(entries, ensure_ascii=False, indent=2, sort_keys=True))
+            for key, body in bodies.items():
+                archive.writestr(f"bodies/{key}", body)
+        logger.info(f"Saved {len(entries)} recorded responses to {self.path}")
+
+    def add(self, method, url, status, reason, headers, body):
+        key = self.key(method, url)
+        entry = {
+            'method': method.upper(),
+            'url': url,
+            'status': status,
+            'reason': reason,
+            'headers': {name: value for name, value in headers.items() if name.lower() not in _DROPPED_HEADERS},
+        }
+        with self._lock:
+            self.entries[key] = entry
+            self._bodies[key] = body or b''
+
+    def get(self, method, url):
+        key = self.key(method, url)
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+        return entry, self._bodies.get(key, b'')
+
+
+class RecordingAdapter(HTTPAdapter):
+    """Transport adapter that performs real requests and records every response"""
+
+    def __init__(self, archive, **kwargs):
+        super().__init__(**kwargs)
+        self.archive = archive
+
+    def send(self, request, **kwargs):
+        response = super().send(request, **kwargs)
+        # Bodies are stored decoded, including encodings urllib3 leaves to the session hook
+        decoding.decompress_response(response)
+        # Reading content here is fine: requests reads it right after send() anyway
+        self.archive.add(request.method, request.url, response.status_code, response.reason,
+                         response.headers, response.content)
+        return response
+
+
+class ReplayAdapter(HTTPAdapter):
+    """Transport adapter that answers requests from a fixture archive without touching the network"""
+
+    def __init__(self, archive, **kwargs):
+        super().__init__(**kwargs)
+        self.archive = archive
+
+    def send(self, request, **kwargs):
+        recorded = self.archive.get(request.method, request.url)
+        if recorded is None:
+            with self.archive._lock:
+                self.archive.misses.append(f"{request.method} {request.url}")
+            raise MissingFixture(f"No recorded fixture for {request.method} {request.url}", request=request)
+
+        entry, body = recorded
+        response = requests.Response()
+        response.status_code = entry['status']
+        response.reason = entry.get('reason')
+        response.headers = CaseInsensitiveDict(entry['headers'])
+        response.encoding = requests.utils.get_encoding_from_headers(response.headers)
+        response.url = request.url
+        response.request = request
+        response.elapsed = timedelta(0)
+        response._content = body
+        response._content_consumed = True
+        return response
+
+
+def create_adapter(mode, path):
+    """Create the transport adapter for the given mode backed by the archive at path"""
+    if mode == MODE_RECORD:
+        return RecordingAdapter(FixtureArchive(path))
+    if mode == MODE_REPLAY:
+        return ReplayAdapter(FixtureArchive(path).load())
+    raise ValueError(f"Unknown HTTP mode: {mode}")
+
+
+def mount(http_session, adapter):
+    """Route all http(s) traffic of a session through the adapter"""
+    http_session.mount('https://', adapter)
+    http_session.mount('http://', adapter)
+    return http_session
@@ -0,0 +1,254 @@
+#!/usr/bin/env python3
+"""
+Shared resilience layer
+Retries transient HTTP failures with exponential backoff, jitter and Retry-After support,
+and keeps a per-source circuit breaker whose state persists across runs
+"""
+
+import json
+import logging
+import os
+import random
+import threading
+import time
+from datetime import date, datetime, timezone
+from email.utils import parsedate_to_datetime
+
+logger = logging.getLogger(__name__)
+
+# Statuses worth retrying: rate limiting, server errors and Cloudflare origin errors
+RETRYABLE_STATUSES = frozenset([429, 500, 502, 503, 504, 521, 522, 524])
+
+
+class RetryPolicy:
+    """How often and how long to wait before retrying a request"""
+
+    def __init__(self, attempts=3, base_delay=1.0, max_delay=30.0, statuses=RETRYABLE_STATUSES):
+        self.attempts = attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.statuses = frozenset(statuses)
+
+    def backoff(self, attempt):
+        """Exponential backoff with full jitter for the given (1-based) failed attempt"""
+        ceiling = min(self.max_delay, self.base_delay * (2 ** (attempt - 1)))
+        return random.uniform(0, ceiling)
+
+    def delay(self, attempt, response=None):
+        """Delay before the next attempt, honouring the server's Retry-After when present"""
+        retry_after = retry_after_seconds(response) if response is not None else None
+        if retry_after is not None:
+            return retry_after
+        return self.backoff(attempt)
+
+
+class DeadlineExceeded(Exception):
+    """Raised instead of starting a request once the run's time budget is used up"""
+
+
+class Deadline:
+    """
+    Run-level time budget. reserve seconds are held back from scraping so the run can
+    still save and render within the budget.
+    """
+
+    def __init__(self, seconds, reserve=0.0):
+        self.seconds = seconds
+        self.started = time.monotonic()
+        self.expires = self.started + max(0.0, seconds - reserve)
+
+    def remaining(self):
+        return max(0.0, self.expires - time.monotonic())
+
+    @property
+    def expired(self):
+        return self.remaining() <= 0
+
+    def fraction_left(self):
+        total = self.expires - self.started
+        return self.remaining() / total if total > 0 else 0.0
+
+    def cap(self, timeout):
+        """Shrink a requests timeout (number or (connect, read) tuple) to the remaining budget"""
+        remaining = self.remaining()
+        if remaining <= 0:
+            raise DeadlineExceeded(f"Time budget of {self.seconds:.0f}s used up")
+        if timeout is None:
+            return remaining
+        if isinstance(timeout, tuple):
+            return tuple(min(part, remaining) if part is not None else remaining for part in timeout)
+        return min(timeout, remaining)
+
+
+# Listing pages get a few attempts, per-article detail pages only one retry
+DEFAULT_POLICY = RetryPolicy()
+DETAIL_POLICY = RetryPolicy(attempts=2)
+# Single attempt, for routes that have a fallback of their own
+NO_RETRY = RetryPolicy(attempts=1)
+
+
+def retry_after_seconds(response):
+    """Seconds requested by a Retry-After header (delta-seconds or HTTP date), or None"""
+    value = response.headers.get('Retry-After')
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+
+def fetch(http_session, url, policy=DEFAULT_POLICY, sleep=time.sleep, before_retry=None, method='GET',
+          deadline=None, **kwargs):
+    """
+    Issue a request, retrying connection errors, timeouts and retryable statuses.
+    The last response is returned even if its status is still retryable, so callers keep
+    their own status handling; the last exception is re-raised once attempts run out.
+    before_retry(attempt) may adjust the session (headers, cookies) before each retry.
+    With a deadline every timeout is capped to the remaining budget and no retry is
+    started that could not finish in time.
+    """
+    import requests
+    transient = (requests.exceptions.ConnectionError, requests.exceptions.Timeout,
+                 requests.exceptions.ChunkedEncodingError)
+
+    timeout = kwargs.pop('timeout', None)
+    for attempt in range(1, policy.attempts + 1):
+        if deadline is not None:
+            kwargs['timeout'] = deadline.cap(timeout)
+        elif timeout is not None:
+            kwargs['timeout'] = timeout
+        try:
+            response = http_session.request(method, url, **kwargs)
+        except transient as e:
+            if attempt == policy.attempts:
+                raise
+            delay = policy.backoff(attempt)
+            logger.info(f"{method} {url} failed ({type(e).__name__}), retrying in {delay:.1f}s")
+        else:
+            if response.status_code not in policy.statuses or attempt == policy.attempts:
+                return response
+            delay = policy.delay(attempt, response)
+            if delay > policy.max_delay:
+                # Waiting that long would stall the whole run, leave it to the next one
+                logger.info(f"{method} {url} returned {response.status_code} with Retry-After {delay:.0f}s, not retrying")
+                return response
+            if deadline is not None and delay >= deadline.remaining():
+                logger.info(f"{method} {url} returned {response.status_code}, no time left to retry")
+                return response
+            logger.info(f"{method} {url} returned {response.status_code}, retrying in {delay:.1f}s")
+        sleep(delay)
+        if before_retry is not None:
+            before_retry(attempt)
+
+
+def probe(http_session, url, timeout=5, proxies=None):
+    """Cheap reachability check: one GET without retries that only reads the headers"""
+    try:
+        response = http_session.get(url, timeout=timeout, stream=True, proxies=proxies)
+        response.close()
+        return response.status_code < 400
+    except Exception as e:
+        logger.debug(f"Probe of {url} failed: {str(e)}")
+        return False
+
+
+class CircuitBreaker:
+    """
+    Failure history of one source. The circuit opens once the source has failed on
+    `threshold` different days in a row; while open, runs probe the site cheaply and only
+    attempt a full scrape after the probe succeeds.
+    """
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half-open'
+
+    def __init__(self, key, threshold=3):
+        self.key = key
+        self.threshold = threshold
+        self.failure_days = 0
+        self.consecutive_failures = 0
+        self.last_success = None
+        self.last_failure = None
+        self.probing = False
+
+    @property
+    def state(self):
+        if self.failure_days < self.threshold:
+            return self.CLOSED
+        return self.HALF_OPEN if self.probing else self.OPEN
+
+    def record_success(self):
+        self.failure_days = 0
+        self.consecutive_failures = 0
+        self.probing = False
+        self.last_success = datetime.now().isoformat(timespec='seconds')
+
+    def record_failure(self):
+        today = date.today().isoformat()
+        if self.last_failure is None or self.last_failure[:10] != today:
+            self.failure_days += 1
+        self.consecutive_failures += 1
+        self.probing = False
+        self.last_failure = datetime.now().isoformat(timespec='seconds')
+
+    def to_dict(self):
+        return {
+            'failure_days': self.failure_days,
+            'consecutive_failures': self.consecutive_failures,
+            'last_success': self.last_success,
+            'last_failure': self.last_failure,
+        }
+
+    @classmethod
+    def from_dict(cls, key, data, threshold=3):
+        breaker = cls(key, threshold)
+        breaker.failure_days = data.get('failure_days', 0)
+        breaker.consecutive_failures = data.get('consecutive_failures', 0)
+        breaker.last_success = data.get('last_success')
+        breaker.last_failure = data.get('last_failure')
+        return breaker
+
+
+class CircuitBreakerStore:
+    """Circuit breakers of all sources, persisted as JSON between runs"""
+
+    def __init__(self, path, threshold=3):
+        self.path = path
+        self.threshold = threshold
+        self.breakers = {}
+        self._lock = threading.Lock()
+
+    def load(self):
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return self
+        except (OSError, ValueError) as e:
+            logger.warning(f"Could not read source state {self.path}: {str(e)}, starting fresh")
+            return self
+        self.breakers = {key: CircuitBreaker.from_dict(key, values, self.threshold)
+                         for key, values in data.get('sources', {}).items()}
+        return self
+
+    def save(self):
+        with self._lock:
+            data = {'sources': {key: breaker.to_dict() for key, breaker in sorted(self.breakers.items())}}
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        with open(self.path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+        logger.info(f"Source state saved to {self.path}")
+
+    def get(self, key):
+        with self._lock:
+            if key not in self.breakers:
+                self.breakers[key] = CircuitBreaker(key, self.threshold)
+            return self.breakers[key]
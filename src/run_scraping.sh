@@ -14,7 +14,7 @@ fi
 mkdir -p ../docs
 
 # 运行爬虫 - 保存到 docs 目录
-python3 scrape_news.py
+python3 scrape_news.py "$@"
 
 # 如果使用了虚拟环境，则退出
 if [ -d "../venv" ]; then
@@ -0,0 +1,347 @@
+#!/usr/bin/env python3
+"""
+Frequency-aware scheduler
+Learns each source's update rate from the new items it delivers, polls busy sources more
+often and quiet ones less, and only re-renders the page when something new arrived
+"""
+
+import json
+import logging
+import os
+import threading
+from datetime import datetime, timedelta
+
+import archive
+import feeds
+import fragments
+import registry
+import resilience
+import search
+
+logger = logging.getLogger(__name__)
+
+# Weight of the newest observation in the learned arrival rate
+RATE_ALPHA = 0.3
+# Poll when this many new items are expected to be waiting
+TARGET_NEW_ITEMS = 1.0
+MIN_INTERVAL_HOURS = 0.5
+MAX_INTERVAL_HOURS = 7 * 24
+
+
+class SourceCadence:
+    """Learned new-item arrival rate and the resulting polling interval of one source"""
+
+    def __init__(self, key, prior_hours):
+        self.key = key
+        self.prior_hours = prior_hours
+        # New items per hour; None until the source has been polled twice
+        self.rate_per_hour = None
+        self.last_poll = None
+        self.polls = 0
+        self.new_items = 0
+
+    @property
+    def interval_hours(self):
+        if self.rate_per_hour is None:
+            return self.prior_hours
+        if self.rate_per_hour <= 0:
+            return MAX_INTERVAL_HOURS
+        return min(MAX_INTERVAL_HOURS, max(MIN_INTERVAL_HOURS, TARGET_NEW_ITEMS / self.rate_per_hour))
+
+    def next_poll(self):
+        if self.last_poll is None:
+            return datetime.min
+        return datetime.fromisoformat(self.last_poll) + timedelta(hours=self.interval_hours)
+
+    def record_poll(self, new_items, now=None):
+        """Fold the new items seen since the previous poll into the arrival rate"""
+        now = now or datetime.now()
+        if self.last_poll is not None:
+            hours = max((now - datetime.fromisoformat(self.last_poll)).total_seconds() / 3600, 1 / 60)
+            observed = new_items / hours
+            if self.rate_per_hour is None:
+                self.rate_per_hour = observed
+            else:
+                self.rate_per_hour = (1 - RATE_ALPHA) * self.rate_per_hour + RATE_ALPHA * observed
+        self.last_poll = now.isoformat(timespec='seconds')
+        self.polls += 1
+        self.new_items += new_items
+
+    def defer(self, now=None):
+        """Wait a regular interval before the next poll without changing the learned rate"""
+        self.last_poll = (now or datetime.now()).isoformat(timespec='seconds')
+
+    def to_dict(self):
+        return {
+            'rate_per_hour': round(self.rate_per_hour, 6) if self.rate_per_hour is not None else None,
+            'interval_hours': round(self.interval_hours, 3),
+            'last_poll': self.last_poll,
+            'polls': self.polls,
+            'new_items': self.new_items,
+        }
+
+    @classmethod
+    def from_dict(cls, key, prior_hours, data):
+        cadence = cls(key, prior_hours)
+        cadence.rate_per_hour = data.get('rate_per_hour')
+        cadence.last_poll = data.get('last_poll')
+        cadence.polls = data.get('polls', 0)
+        cadence.new_items = data.get('new_items', 0)
+        return cadence
+
+
+class Scheduler:
+    """
+    Polls each registered source at its own learned cadence. The store, its URL index and
+    the HTTP sessions stay in memory between cycles, so a long-running scheduler only pays
+    for the fetches and the new items.
+    """
+
+    def __init__(self, store_path, output_path, report_path, state_path, breaker_state_path=None,
+                 breaker_threshold=3, days=30, concurrency=1, budget=None, render=True,
+                 feed_items=None, site_url=None, render_cache_path=None, archive_dir=None,
+                 search_index_path=None, runtime=None):
+        if runtime is None:
+            import scrape_news as runtime
+        # The scrape_news module whose HTTP mode, proxy pool and budget the cycles run with;
+        # the CLI passes itself, so running the script does not import a second copy
+        self.runtime = runtime
+        self.store_path = store_path
+        self.output_path = output_path
+        self.report_path = report_path
+        self.state_path = state_path
+        self.breaker_state_path = breaker_state_path
+        self.breaker_threshold = breaker_threshold
+        self.days = days
+        self.concurrency = concurrency
+        self.budget = budget
+        self.render = render
+        self.feed_items = feeds.DEFAULT_ITEMS if feed_items is None else feed_items
+        self.site_url = site_url
+        # Rendered cards stay in memory, so a cycle with two new articles renders two cards
+        self.fragment_cache = fragments.FragmentCache.open(render_cache_path) if render_cache_path else fragments.FragmentCache()
+        self.archive = archive.Archive(archive_dir, window_days=days) if archive_dir else None
+        self.search_index_path = search_index_path
+        self.cadences = {}
+        self.last_render_day = None
+        self.stop_event = threading.Event()
+        # Set to cut the wait short, e.g. when a run was requested
+        self.wake_event = threading.Event()
+        self.requested = set()
+        self._lock = threading.Lock()
+        # Warm state kept between cycles
+        self.stored = None
+        self.known_urls = set()
+        self._store_mtime = None
+        self.sessions = {}
+        self.breakers = None
+        # Bookkeeping for status reports
+        self.started_at = datetime.now()
+        self.cycles = 0
+        self.running = False
+        self.last_cycle = None
+        self.last_metrics = None
+        self.load_state()
+
+    def load_state(self):
+        data = {}
+        try:
+            with open(self.state_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError) as e:
+            logger.warning(f"Could not read schedule state {self.state_path}: {str(e)}, starting fresh")
+        saved = data.get('sources', {})
+        self.cadences = {spec.key: SourceCadence.from_dict(spec.key, spec.refresh_hours, saved.get(spec.key, {}))
+                         for spec in registry.all_sources()}
+        self.last_render_day = data.get('last_render_day')
+
+    def save_state(self):
+        data = {
+            'last_render_day': self.last_render_day,
+            'sources': {key: cadence.to_dict() for key, cadence in self.cadences.items()},
+        }
+        with open(self.state_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+
+    def due(self, now=None):
+        """Keys of sources whose polling interval has passed"""
+        now = now or datetime.now()
+        return [key for key, cadence in self.cadences.items() if cadence.next_poll() <= now]
+
+    def seconds_until_next(self, now=None):
+        now = now or datetime.now()
+        next_poll = min(cadence.next_poll() for cadence in self.cadences.values())
+        return max(0.0, (next_poll - now).total_seconds())
+
+    def request_run(self, keys=None):
+        """Poll the given sources (all when None) in the next cycle regardless of their cadence"""
+        keys = registry.keys() if keys is None else list(keys)
+        unknown = set(keys) - set(self.cadences)
+        if unknown:
+            raise ValueError(f"Unknown sources: {', '.join(sorted(unknown))}")
+        with self._lock:
+            self.requested.update(keys)
+        self.wake_event.set()
+        return keys
+
+    def _store_modified(self):
+        try:
+            return os.path.getmtime(self.store_path)
+        except OSError:
+            return None
+
+    def load_store(self):
+        """The stored articles, read from disk only on the first cycle or after another process changed the file"""
+        mtime = self._store_modified()
+        if self.stored is None or mtime != self._store_mtime:
+            stored = self.runtime.SecurityNewsAggregator()
+            stored.load_articles_json(self.store_path)
+            self.stored = stored.articles
+            self.known_urls = {article.url for category in ('tech', 'news') for article in self.stored[category]}
+            self._store_mtime = mtime
+        return self.stored
+
+    def load_breakers(self):
+        if not self.breaker_state_path or self.breaker_threshold <= 0:
+            return None
+        if self.breakers is None:
+            self.breakers = resilience.CircuitBreakerStore(self.breaker_state_path, threshold=self.breaker_threshold).load()
+        return self.breakers
+
+    def run_cycle(self, keys):
+        """Scrape the given sources, count their new items and re-render if anything changed"""
+        started = datetime.now()
+        self.running = True
+        try:
+            aggregator, new_items, changed = self._run_cycle(keys)
+        except Exception as e:
+            self.last_cycle = {'started_at': started.isoformat(timespec='seconds'), 'sources': list(keys), 'error': str(e)}
+            raise
+        finally:
+            self.running = False
+        self.cycles += 1
+        self.last_metrics = aggregator.metrics
+        self.last_cycle = {
+            'started_at': started.isoformat(timespec='seconds'),
+            'finished_at': datetime.now().isoformat(timespec='seconds'),
+            'sources': list(keys),
+            'new_items': new_items,
+            'rendered': changed and self.render,
+        }
+        return aggregator, new_items
+
+    def _run_cycle(self, keys):
+        stored = self.load_store()
+        names = {registry.get(key).name for key in keys}
+
+        self.runtime.set_deadline(self.budget)
+        self.runtime.check_proxies()
+        aggregator = self.runtime.SecurityNewsAggregator()
+        aggregator._sessions = self.sessions
+        aggregator.breakers = self.load_breakers()
+        aggregator.keep_stored_articles(stored, exclude_sources=names)
+        try:
+            aggregator.scrape_all_sources(keys, concurrency=self.concurrency, stored=stored)
+        finally:
+            self.runtime.finish_http()
+        self.runtime.finish_proxies()
+        if aggregator.breakers is not None:
+            aggregator.breakers.save()
+
+        key_by_name = {registry.get(key).name: key for key in keys}
+        fresh_urls = {article.url for category in ('tech', 'news') for article in aggregator.articles[category]
+                      if article.source in key_by_name and article.url not in self.known_urls}
+        now = datetime.now()
+        today = now.date().isoformat()
+        # Articles also age out of the window, so the page is refreshed at least once a day
+        changed = bool(fresh_urls) or self.last_render_day != today
+        archive_months, changed_entities = [], set()
+        if changed:
+            # The archive and the index get new items that are already older than the window too
+            archive_months = self.archive.update(aggregator.articles) if self.archive is not None else []
+            changed_entities = search.update(self.search_index_path, aggregator.articles, self.archive) if self.search_index_path else set()
+        aggregator.keep_window(days=self.days)
+
+        new_items = {key: 0 for key in keys}
+        for category in ('tech', 'news'):
+            for article in aggregator.articles[category]:
+                if article.url in fresh_urls:
+                    new_items[key_by_name[article.source]] += 1
+
+        for key in keys:
+            source_metrics = aggregator.metrics.sources.get(key)
+            # Failed polls and sources skipped by the time budget tell us nothing about the rate
+            if key in aggregator.metrics.deadline_hit or source_metrics is None or not source_metrics.items_found:
+                self.cadences[key].defer(now)
+            else:
+                self.cadences[key].record_poll(new_items[key], now)
+
+        self.stored = aggregator.articles
+        if self.last_render_day != today:
+            # Rebuild the index once a day so URLs that aged out of the window do not pile up
+            self.known_urls = {article.url for category in ('tech', 'news') for article in self.stored[category]}
+        else:
+            self.known_urls.update(fresh_urls)
+        if changed:
+            aggregator.save_articles_json(self.store_path)
+            self._store_mtime = self._store_modified()
+            if self.render:
+                with aggregator.metrics.stage('render'):
+                    self.runtime.render_site(aggregator.articles, self.output_path,
+                                             feed_items=self.feed_items, site_url=self.site_url,
+                                             fragment_cache=self.fragment_cache,
+                                             article_archive=self.archive, archive_months=archive_months,
+                                             search_index_path=self.search_index_path, changed_entities=changed_entities)
+                self.last_render_day = today
+        aggregator.save_run_report(self.report_path)
+        self.save_state()
+
+        polled = ', '.join(f"{key}+{count}" for key, count in new_items.items())
+        logger.info(f"Cycle done ({polled}); {'re-rendered' if changed and self.render else 'page unchanged'}")
+        return aggregator, new_items, changed
+
+    def run(self, once=False, max_sleep=3600):
+        """Poll due (and requested) sources until stopped; with once=True run a single cycle"""
+        while not self.stop_event.is_set():
+            self.wake_event.clear()
+            with self._lock:
+                requested, self.requested = self.requested, set()
+            due = set(self.due()) | requested
+            # Keep registry order so cycles and reports are stable
+            keys = [key for key in self.cadences if key in due]
+            if keys:
+                try:
+                    self.run_cycle(keys)
+                except Exception as e:
+                    logger.error(f"Scrape cycle for {', '.join(keys)} failed: {str(e)}")
+                    for key in keys:
+                        self.cadences[key].defer()
+            elif once:
+                logger.info("No source is due")
+            if once:
+                return
+            wait_s = min(max_sleep, self.seconds_until_next())
+            logger.info(f"Next poll in {wait_s / 60:.1f} min")
+            self.wake_event.wait(max(wait_s, 1.0))
+
+    def stop(self):
+        self.stop_event.set()
+        self.wake_event.set()
+
+    def status(self):
+        """Snapshot of the scheduler for the control endpoint"""
+        stored = self.stored or {}
+        return {
+            'started_at': self.started_at.isoformat(timespec='seconds'),
+            'cycles': self.cycles,
+            'running': self.running,
+            'requested': sorted(self.requested),
+            'last_cycle': self.last_cycle,
+            'last_render_day': self.last_render_day,
+            'articles': {category: len(stored.get(category, [])) for category in ('tech', 'news')},
+            'sources': {key: dict(cadence.to_dict(), next_poll=cadence.next_poll().isoformat(timespec='seconds')
+                                  if cadence.last_poll else None)
+                        for key, cadence in self.cadences.items()},
+        }
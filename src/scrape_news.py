@@ -4,8 +4,9 @@ Security News Aggregator
 Scrapes cybersecurity news from multiple sources and generates a static HTML page
 """
 
-import requests
-from bs4 import BeautifulSoup
+import argparse
+import contextlib
+import importlib
 import time
 from datetime import datetime, timedelta
 import os
@@ -14,34 +15,358 @@ import logging
 from urllib.parse import urljoin, urlparse
 import re
 import html
+import shutil
 import sys
+import threading
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, wait
+
+import archive
+import artifacts
+import assets
+import classify
+import decoding
+import entities
+import extract
+import feeds
+import fragments
+import metrics
+import records
+import registry
+import resilience
+import search
+
+
+class _LazyModule:
+    """Module proxy that imports the real module on first attribute access"""
+
+    def __init__(self, name):
+        self._name = name
+        self._module = None
+
+    def __getattr__(self, attr):
+        if self._module is None:
+            self._module = importlib.import_module(self._name)
+        return getattr(self._module, attr)
+
+
+# The network stack is only loaded once a scraper actually runs, so render-only
+# invocations start without it
+requests = _LazyModule('requests')
+
+_optional_modules = {}
+
+
+def optional_import(name):
+    """Import an optional dependency on first use, returning None if it is not installed"""
+    if name not in _optional_modules:
+        try:
+            _optional_modules[name] = importlib.import_module(name)
+        except ImportError:
+            _optional_modules[name] = None
+    return _optional_modules[name]
 
-# Import brotli support to enable automatic decompression
-try:
-    import brotli
-    # Install requests-toolbelt to provide Brotli support for requests
-    import requests_toolbelt.adapters.appengine
-    requests_toolbelt.adapters.appengine.monkeypatch()
-except ImportError:
-    # On some systems brotli might be available as _brotli
-    try:
-        import _brotli
-        brotli = _brotli
-    except ImportError:
-        brotli = None
-        # If brotli module is not installed, print warning
-        import warnings
-        warnings.warn("brotli module not found, some sites may not be scraped properly in compressed environments", ImportWarning)
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
-# Session with headers to mimic a real browser
-session = requests.Session()
-session.headers.update({
-    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-})
+# Record/replay transport shared by every session, see configure_http()
+_http_mode = None
+_http_adapter = None
+
+# Script directory (src/) and project root
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.dirname(SCRIPT_DIR)
+
+# Default CLI input/output locations
+DEFAULT_STORE_PATH = os.path.join(SCRIPT_DIR, 'articles.json')
+DEFAULT_OUTPUT_PATH = os.path.join(PROJECT_ROOT, 'docs', 'index.html')
+DEFAULT_REPORT_PATH = os.path.join(SCRIPT_DIR, 'run_report.json')
+# Per-source circuit breaker state, kept across runs
+DEFAULT_STATE_PATH = os.path.join(SCRIPT_DIR, 'source_state.json')
+# Learned polling cadence of the scheduler
+DEFAULT_SCHEDULE_STATE_PATH = os.path.join(SCRIPT_DIR, 'schedule_state.json')
+# Month partitions of every article that passed through the store
+DEFAULT_ARCHIVE_DIR = os.path.join(PROJECT_ROOT, 'data')
+# Full-text index over the archive and the store
+DEFAULT_SEARCH_INDEX_PATH = os.path.join(SCRIPT_DIR, 'search_index.sqlite')
+# Rendered article cards reused by the next render
+DEFAULT_RENDER_CACHE_PATH = os.path.join(SCRIPT_DIR, 'render_cache.json')
+# Proxy health and the route that last worked per host
+DEFAULT_PROXY_STATE_PATH = os.path.join(SCRIPT_DIR, 'proxy_state.json')
+
+# Descriptions used when a detail page was not (or could not be) fetched
+THN_FALLBACK_DESCRIPTION = "Latest security news from The Hacker News"
+SECURITYWEEK_FALLBACK_DESCRIPTION = "Latest security news from SecurityWeek"
+
+# Placeholder description and enrichment method of sources that need detail pages
+DETAIL_ENRICHERS = {
+    'thehackernews': (THN_FALLBACK_DESCRIPTION, '_enrich_the_hacker_news'),
+    'securityweek': (SECURITYWEEK_FALLBACK_DESCRIPTION, '_enrich_securityweek'),
+}
+
+# Detail session, page handler and politeness delay of the same sources on the asyncio
+# backend; routed sources try the proxy pool like fetch_routed()
+ASYNC_DETAILS = {
+    'thehackernews': ('_the_hacker_news_detail_session', '_apply_the_hacker_news_details', (0.2, 1), False),
+    'securityweek': ('_securityweek_detail_session', '_apply_securityweek_details', (0.5, 2), True),
+}
+
+FETCH_BACKENDS = ('requests', 'asyncio')
+
+# Default location of the recorded HTTP fixture archive
+DEFAULT_FIXTURES_PATH = os.path.join(PROJECT_ROOT, 'fixtures', 'http_fixtures.zip')
+
+
+def prepare_session(http_session):
+    """
+    Route a session through the record/replay adapter when one is configured and
+    meter its traffic for the per-source run report
+    """
+    for prefix in ('https://', 'http://'):
+        inner = http_session.get_adapter(prefix)
+        if isinstance(inner, metrics.MeteredAdapter):
+            inner = inner.inner
+        if _http_adapter is not None:
+            inner = _http_adapter
+        http_session.mount(prefix, metrics.MeteredAdapter(inner))
+    # Decode bodies in encodings urllib3 cannot handle itself
+    if decoding.response_hook not in http_session.hooks['response']:
+        http_session.hooks['response'].append(decoding.response_hook)
+    return http_session
+
+
+def create_session():
+    """Create a requests session that honours the configured record/replay mode"""
+    return prepare_session(requests.Session())
+
+
+# Shared session with headers to mimic a real browser, created on first use
+_session = None
+
+
+def get_session():
+    """Shared browser-like session used by the simple scrapers"""
+    global _session
+    if _session is None:
+        _session = create_session()
+        _session.headers.update({
+            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+        })
+    return _session
+
+
+def configure_http(mode=None, fixtures_path=None):
+    """
+    Select how scrapers talk to the network.
+    mode=None uses the live sites, 'record' additionally saves every response to the
+    fixture archive and 'replay' serves responses from it without any network access.
+    """
+    global _http_mode, _http_adapter
+    if mode is None:
+        if _http_mode is None:
+            return
+        _http_mode = None
+        _http_adapter = None
+        if _session is not None:
+            _session.mount('https://', requests.adapters.HTTPAdapter())
+            _session.mount('http://', requests.adapters.HTTPAdapter())
+            prepare_session(_session)
+        return
+
+    import replay
+    fixtures_path = fixtures_path or DEFAULT_FIXTURES_PATH
+    if mode == replay.MODE_RECORD:
+        os.makedirs(os.path.dirname(os.path.abspath(fixtures_path)), exist_ok=True)
+    _http_adapter = replay.create_adapter(mode, fixtures_path)
+    _http_mode = mode
+    if _session is not None:
+        prepare_session(_session)
+    logger.info(f"HTTP {mode} mode enabled with fixtures at {fixtures_path}")
+
+
+def finish_http():
+    """Persist recorded fixtures at the end of a recording run, report missing ones after a replay"""
+    import replay
+    if _http_mode == replay.MODE_RECORD:
+        _http_adapter.archive.save()
+    elif _http_mode == replay.MODE_REPLAY and _http_adapter.archive.misses:
+        # Reported once per run, so a scheduler cycle only lists its own
+        misses, _http_adapter.archive.misses = _http_adapter.archive.misses, []
+        logger.error(f"{len(misses)} requests have no recorded fixture: {', '.join(misses)}")
+
+
+# Optional run-level resilience.Deadline, see set_deadline()
+_deadline = None
+
+# Seconds held back from scraping so saving and rendering still fit in the budget
+DEADLINE_RENDER_RESERVE = 30
+# Detail pages are skipped once less than this share of the scraping budget is left
+ENRICH_MIN_BUDGET_FRACTION = 0.25
+
+
+def set_deadline(seconds=None):
+    """Start the run's time budget; None removes it"""
+    global _deadline
+    if seconds is None:
+        _deadline = None
+        return None
+    _deadline = resilience.Deadline(seconds, reserve=min(DEADLINE_RENDER_RESERVE, seconds * 0.1))
+    logger.info(f"Time budget: {seconds:.0f}s")
+    return _deadline
+
+
+def time_left():
+    """Seconds left in the scraping budget, or None without a deadline"""
+    return _deadline.remaining() if _deadline is not None else None
+
+
+# Optional proxies.ProxyPool, see configure_proxies()
+_proxy_pool = None
+
+# Connect timeout for a route that still has a fallback, so an unreachable route fails fast
+ROUTE_CONNECT_TIMEOUT = 5
+
+
+def configure_proxies(config_path=None, state_path=DEFAULT_PROXY_STATE_PATH):
+    """
+    Load the proxy pool from config_path, SECNEWS_PROXY_FILE or SECNEWS_PROXIES.
+    Without any configured proxy every request goes out directly.
+    """
+    global _proxy_pool
+    import proxies
+    pool = proxies.ProxyPool.from_config(config_path, state_path=state_path if _http_mode != 'replay' else None)
+    if not pool:
+        _proxy_pool = None
+        return None
+    _proxy_pool = pool
+    check_proxies()
+    logger.info(f"Proxy pool: {', '.join(proxy.label for proxy in pool.ranked())}")
+    return pool
+
+
+def check_proxies():
+    """Actively re-check the proxy pool when its last health check is too old"""
+    if _proxy_pool is not None and _http_mode != 'replay' and _proxy_pool.check_due():
+        _proxy_pool.check(create_session())
+
+
+# Backend for batches of detail pages, see configure_fetch_backend()
+_fetch_backend = 'requests'
+
+
+def configure_fetch_backend(name=None):
+    """
+    Select how detail pages are fetched: 'requests' one after another (or per thread with
+    --concurrency), 'asyncio' all at once on one event loop. Falls back to requests when
+    aiohttp is missing or fixtures are recorded/replayed, which only the requests
+    transport supports.
+    """
+    global _fetch_backend
+    name = name or 'requests'
+    if name not in FETCH_BACKENDS:
+        raise ValueError(f"Unknown fetch backend {name!r}, expected one of {', '.join(FETCH_BACKENDS)}")
+    if name == 'asyncio':
+        import aio
+        if not aio.available():
+            logger.warning("aiohttp is not installed, fetching detail pages with requests")
+            name = 'requests'
+        elif _http_mode is not None:
+            logger.info(f"HTTP {_http_mode} mode uses the requests transport, fetching detail pages with requests")
+            name = 'requests'
+    _fetch_backend = name
+    if name == 'asyncio':
+        logger.info("Fetching detail pages on the asyncio backend")
+    return name
+
+
+def finish_proxies():
+    """Persist proxy health and remembered routes"""
+    if _proxy_pool is not None:
+        _proxy_pool.save()
+
+
+def polite_sleep(seconds):
+    """Politeness delay between requests, skipped when replaying fixtures"""
+    if _http_mode == 'replay':
+        return
+    if _deadline is not None:
+        seconds = min(seconds, _deadline.remaining())
+        if seconds <= 0:
+            return
+    metrics.record_sleep(seconds)
+    time.sleep(seconds)
+
+
+_last_request_at = {}
+_spacing_lock = threading.Lock()
+
+
+def host_spacing(host):
+    """Politeness interval of the source served from host, 0 for unknown hosts"""
+    return next((spec.politeness_s for spec in registry.all_sources() if urlparse(spec.base_url).hostname == host), 0)
+
+
+def space_requests(url):
+    """Keep at least the source's politeness interval between two requests to its host"""
+    if _http_mode == 'replay':
+        return
+    host = urlparse(url).hostname
+    spacing = host_spacing(host)
+    if not spacing:
+        return
+    with _spacing_lock:
+        # Reserve the next slot for this request so concurrent callers queue up behind it
+        now = time.monotonic()
+        slot = max(now, _last_request_at.get(host, 0.0) + spacing)
+        _last_request_at[host] = slot
+    if slot > now:
+        polite_sleep(slot - now)
+
+
+def parse_html(markup):
+    """Parse an HTML document, attributing the parse time to the current source"""
+    from bs4 import BeautifulSoup
+    with metrics.timed_parse():
+        return BeautifulSoup(markup, 'html.parser')
+
+
+# Built-in sources, in scraping order. base_url is also the page probed while a
+# source's circuit breaker is open
+for _spec in (
+    # Tech-focused sources
+    registry.SourceSpec('sectoday', 'Daily Security', 'scrape_daily_security', 'tech', 'https://sec.today/pulses/',
+                        refresh_hours=6, politeness_s=2.0, needs_cloudscraper=True),
+    registry.SourceSpec('tencent', 'Tencent Security', 'scrape_tencent_security', 'tech', 'https://sectoday.tencent.com/',
+                        refresh_hours=6),
+    registry.SourceSpec('xz', 'XZ Aliyun', 'scrape_xz_aliyun', 'tech', 'https://xz.aliyun.com/news',
+                        refresh_hours=12),
+    registry.SourceSpec('projectzero', 'Project Zero', 'scrape_project_zero', 'tech', 'https://projectzero.google/',
+                        refresh_hours=72),
+    registry.SourceSpec('seebug', 'SeeBug Paper', 'scrape_seebug_paper', 'tech', 'https://paper.seebug.org/',
+                        refresh_hours=48, politeness_s=2.0),
+    registry.SourceSpec('kanxue', 'KanXue', 'scrape_kanxue', 'tech', 'https://www.kanxue.com/',
+                        refresh_hours=24),
+
+    # News-focused sources
+    registry.SourceSpec('anquanke', 'Anquanke', 'scrape_anquanke', 'news', 'https://www.anquanke.com/',
+                        refresh_hours=12),
+    registry.SourceSpec('freebuf', 'FreeBuf', 'scrape_freebuf', 'news', 'https://www.freebuf.com/',
+                        refresh_hours=12, politeness_s=2.0),
+    registry.SourceSpec('secrss', 'Secrss', 'scrape_secrss', 'news', 'https://www.secrss.com/',
+                        refresh_hours=12),
+    registry.SourceSpec('thehackernews', 'The Hacker News', 'scrape_the_hacker_news', 'news', 'https://thehackernews.com/',
+                        refresh_hours=6, politeness_s=0.5, needs_enrichment=True),
+    registry.SourceSpec('securityweek', 'SecurityWeek', 'scrape_security_week', 'news', 'https://www.securityweek.com/',
+                        refresh_hours=12, politeness_s=1.0, needs_enrichment=True),
+):
+    registry.register(_spec)
+
+# SeeBug's shield also answers 403 while challenging, and needs a longer pause
+SEEBUG_RETRY_POLICY = resilience.RetryPolicy(attempts=2, base_delay=5.0,
+                                             statuses=resilience.RETRYABLE_STATUSES | {403})
+
 
 class SecurityNewsAggregator:
     def __init__(self):
@@ -49,6 +374,80 @@ class SecurityNewsAggregator:
             'tech': [],
             'news': []
         }
+        self.metrics = metrics.RunMetrics()
+        # Optional profiling.StageProfiler, see main(--profile)
+        self.profiler = None
+        # Fetch per-article detail pages (THN, SecurityWeek) while scraping
+        self.enrich_details = True
+        self.retry_policy = resilience.DEFAULT_POLICY
+        # Optional resilience.CircuitBreakerStore, see cmd_scrape
+        self.breakers = None
+        # Sessions kept per source, see source_session()
+        self._sessions = {}
+
+    def profile_stage(self, name):
+        """Profile the enclosed block when profiling is enabled"""
+        if self.profiler is None:
+            return contextlib.nullcontext()
+        return self.profiler.stage(name)
+
+    def article_count(self):
+        """Total number of collected articles"""
+        return len(self.articles['tech']) + len(self.articles['news'])
+
+    def fetch(self, http_session, url, policy=None, before_retry=None, **kwargs):
+        """GET a page with retries, backing off between attempts"""
+        space_requests(url)
+        return resilience.fetch(http_session, url, policy or self.retry_policy, sleep=polite_sleep,
+                                before_retry=before_retry, deadline=_deadline, **kwargs)
+
+    def fetch_routed(self, http_session, url, policy=None, timeout=None, **kwargs):
+        """
+        GET a page over the route (direct or a proxy) that worked last time for its host,
+        falling back to the remaining routes when it fails or is refused
+        """
+        pool = _proxy_pool
+        if pool is None:
+            return self.fetch(http_session, url, policy=policy, timeout=timeout, **kwargs)
+
+        routes = pool.routes(url)
+        response = None
+        last_error = None
+        for index, route in enumerate(routes):
+            has_fallback = index < len(routes) - 1
+            route_timeout = (min(ROUTE_CONNECT_TIMEOUT, timeout), timeout) if has_fallback and timeout else timeout
+            start = time.perf_counter()
+            try:
+                response = self.fetch(http_session, url, policy=resilience.NO_RETRY if has_fallback else policy,
+                                      timeout=route_timeout, proxies=pool.requests_proxies(route), **kwargs)
+            except requests.exceptions.RequestException as e:
+                pool.record(url, route, False)
+                last_error = e
+                logger.info(f"Route {pool.describe(route)} to {url} failed: {str(e)}")
+                continue
+            ok = response.status_code < 400
+            pool.record(url, route, ok, time.perf_counter() - start)
+            if ok:
+                return response
+            logger.info(f"Route {pool.describe(route)} to {url} returned {response.status_code}")
+        if response is not None:
+            return response
+        raise last_error
+
+    def wants_details(self):
+        """Whether per-article detail pages should be fetched, given the remaining time budget"""
+        if not self.enrich_details:
+            return False
+        return _deadline is None or _deadline.fraction_left() >= ENRICH_MIN_BUDGET_FRACTION
+
+    def source_session(self, name, headers):
+        """Session reused for every request of one kind, so a source pays its connection cost once"""
+        if name not in self._sessions:
+            http_session = create_session()
+            http_session.headers.update(headers)
+            # Concurrent enrichment may race here; the first session wins
+            self._sessions.setdefault(name, http_session)
+        return self._sessions[name]
 
     def decode_html_entities(self, text):
         """Decode HTML entities in text"""
@@ -56,57 +455,33 @@ class SecurityNewsAggregator:
             return html.unescape(text)
         return text
 
-    def _decode_response_content(self, response):
-        """
-        Decode response content with proper encoding handling
-        """
-        # In most cases, we can just return the raw content since we've configured
-        # the environment to handle compression automatically
-        # But we still need to handle the character encoding issues mentioned in the logs
-
-        try:
-            # If apparent_encoding is None but we know the content is text,
-            # it may need special handling as per the error logs
-            if response.apparent_encoding is None and 'text' in response.headers.get('Content-Type', ''):
-                # This mirrors the log message seen in the issue
-                logger.warning("Some characters could not be decoded, and were replaced with REPLACEMENT CHARACTER")
-                # Return content decoded with error replacement
-                return response.content.decode('utf-8', errors='replace')
-
-            # Otherwise, just return the content as received (requests should handle compression automatically now)
-            return response.content
-        except UnicodeDecodeError:
-            # Handle the specific case mentioned in the logs
-            logger.warning("Some characters could not be decoded, and were replaced with REPLACEMENT CHARACTER")
-            return response.content.decode('utf-8', errors='replace')
-        except Exception:
-            # Fallback to original content
-            return response.content
-
     def scrape_daily_security(self):
         """Scrape https://sec.today/pulses/ for security pulses (tech articles)"""
         logger.info("Scraping Daily Security...")
         try:
             # First, try using cloudscraper which is specifically designed to handle Cloudflare
             try:
-                import cloudscraper
+                # cloudscraper is heavy, so it is only loaded when this source runs
+                cloudscraper = optional_import('cloudscraper')
+                if cloudscraper is None:
+                    raise ImportError("cloudscraper is not installed")
 
                 # Create a cloudscraper session which handles Cloudflare challenges automatically
-                scraper = cloudscraper.create_scraper(
+                scraper = prepare_session(cloudscraper.create_scraper(
                     browser={
                         'browser': 'firefox',
                         'platform': 'windows',
                         'mobile': False
                     },
                     disableCloudflareV1=True
-                )
+                ))
 
                 # Set realistic headers for cloudscraper
                 scraper.headers.update({
                     'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.6099.109 Safari/537.36',
                     'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,image/apng,*/*;q=0.8',
                     'Accept-Language': 'en-US,en;q=0.9',
-                    'Accept-Encoding': 'gzip, deflate, br',
+                    'Accept-Encoding': decoding.ACCEPT_ENCODING,
                     'Connection': 'keep-alive',
                     'Upgrade-Insecure-Requests': '1',
                     'Sec-Fetch-Dest': 'document',
@@ -116,18 +491,18 @@ class SecurityNewsAggregator:
                     'Cache-Control': 'max-age=0',
                 })
 
-                response = scraper.get("https://sec.today/pulses/", timeout=20)
+                response = self.fetch(scraper, "https://sec.today/pulses/", timeout=20)
 
             except ImportError:
                 # Fallback to requests with session approach if cloudscraper is not available
-                sec_today_session = requests.Session()
+                sec_today_session = create_session()
 
                 # Set realistic browser headers
                 headers = {
                     'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.6099.109 Safari/537.36',
                     'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,image/apng,*/*;q=0.8',
                     'Accept-Language': 'zh-CN,zh;q=0.9,en-US;q=0.8,en;q=0.7',
-                    'Accept-Encoding': 'gzip, deflate, br',
+                    'Accept-Encoding': decoding.ACCEPT_ENCODING,
                     'Connection': 'keep-alive',
                     'Upgrade-Insecure-Requests': '1',
                     'Sec-Fetch-Dest': 'document',
@@ -141,26 +516,28 @@ class SecurityNewsAggregator:
                 sec_today_session.headers.update(headers)
 
                 # Establish session by getting the main page first
-                sec_today_session.get("https://sec.today/", timeout=20)
-                time.sleep(2)
+                self.fetch(sec_today_session, "https://sec.today/", timeout=20)
+                polite_sleep(2)
 
-                response = sec_today_session.get("https://sec.today/pulses/", timeout=20)
+                response = self.fetch(sec_today_session, "https://sec.today/pulses/", timeout=20)
 
             if response.status_code != 200:
                 # If still getting blocked, try cloudscraper as a last resort
                 if response.status_code == 403 or response.status_code == 429:
                     try:
-                        import cloudscraper
+                        cloudscraper = optional_import('cloudscraper')
+                        if cloudscraper is None:
+                            raise ImportError("cloudscraper is not installed")
 
-                        scraper = cloudscraper.create_scraper(
+                        scraper = prepare_session(cloudscraper.create_scraper(
                             browser={
                                 'browser': 'chrome',
                                 'platform': 'windows',
                                 'mobile': False
                             }
-                        )
+                        ))
 
-                        response = scraper.get("https://sec.today/pulses/", timeout=30)
+                        response = self.fetch(scraper, "https://sec.today/pulses/", timeout=30)
                     except ImportError:
                         logger.error("All methods failed: Cloudflare blocking requests and cloudscraper not available.")
                         return
@@ -170,7 +547,7 @@ class SecurityNewsAggregator:
                     return
 
             # Parse the successful response
-            soup = BeautifulSoup(response.content, 'html.parser')
+            soup = parse_html(decoding.text(response))
             cards = soup.find_all('div', class_='card my-2')
 
             for card in cards:  # Process all available cards
@@ -257,10 +634,10 @@ class SecurityNewsAggregator:
         """Scrape https://sectoday.tencent.com/ for tech articles"""
         logger.info("Scraping Tencent Security...")
         try:
-            response = session.get("https://sectoday.tencent.com/", timeout=10)
+            response = self.fetch(get_session(), "https://sectoday.tencent.com/", timeout=10)
             response.raise_for_status()
 
-            soup = BeautifulSoup(response.content, 'html.parser')
+            soup = parse_html(decoding.text(response))
             cards = soup.find_all('div', class_='MuiPaper-root')
 
             for card in cards:  # Process all available cards
@@ -299,11 +676,11 @@ class SecurityNewsAggregator:
         logger.info("Scraping XZ Aliyun...")
         try:
             # First, get the main page to extract CSRF token
-            response = session.get("https://xz.aliyun.com/news", timeout=15)
+            response = self.fetch(get_session(), "https://xz.aliyun.com/news", timeout=15)
             response.raise_for_status()
 
             # Parse the page to extract CSRF token
-            soup = BeautifulSoup(response.content, 'html.parser')
+            soup = parse_html(decoding.text(response))
             csrf_token_meta = soup.find('meta', attrs={'name': '_token'})
             csrf_token = csrf_token_meta.get('content') if csrf_token_meta else None
 
@@ -317,160 +694,18 @@ class SecurityNewsAggregator:
             }
 
             # Make the AJAX request to get the news list as JSON containing HTML
-            ajax_response = session.get("https://xz.aliyun.com/news",
-                                      params={'isAjax': 'true', 'type': 'recommend'},
-                                      headers=headers,
-                                      timeout=15)
+            ajax_response = self.fetch(get_session(), "https://xz.aliyun.com/news",
+                                       params={'isAjax': 'true', 'type': 'recommend'},
+                                       headers=headers,
+                                       timeout=15)
             ajax_response.raise_for_status()
 
             # The response is JSON with HTML content in the 'data' field
             json_data = ajax_response.json()
 
             if 'data' in json_data and isinstance(json_data['data'], str):
-                # Parse the HTML content from the JSON response
-                html_content = json_data['data']
-                ajax_soup = BeautifulSoup(html_content, 'html.parser')
-
-                # Find the news items in the returned HTML
-                cards = ajax_soup.select('div.news_item, .news_item')
-
-                for card in cards:
-                    try:
-                        # Find the main link in the card
-                        link_tag = card.find('a')
-
-                        if link_tag:
-                            # Extract title from the link's text or alt attribute of image
-                            img_tag = card.find('img')
-
-                            # Try to get title from image alt attribute first
-                            if img_tag and img_tag.get('alt'):
-                                title = self.decode_html_entities(img_tag.get('alt', '').strip())
-                            else:
-                                # Fallback to link text
-                                title = self.decode_html_entities(link_tag.get_text(strip=True))
-
-                            if not title or title == '':
-                                continue  # Skip if no title
-
-                            url = link_tag.get('href')
-                            if url and not url.startswith('http'):
-                                url = urljoin("https://xz.aliyun.com", url)
-
-                            # Extract description - look for text elements near the link
-                            description = ""
-
-                            # Look for paragraph tags, divs with text, or spans that might contain description
-                            # Try to find other text in the card excluding the link with the title
-
-                            # Find elements that could contain description (excluding the main link)
-                            possible_desc_elements = card.find_all(['p', 'div', 'span'], recursive=True)
-
-                            desc_texts = []
-                            for elem in possible_desc_elements:
-                                # Only add text if it's not inside the main link tag
-                                if not link_tag.find_all(recursive=True) or elem not in link_tag.find_all(recursive=True):
-                                    elem_text = elem.get_text(strip=True)
-                                    # Only add substantial text (more than 5 characters and not just numbers)
-                                    if elem_text and len(elem_text) > 5 and not elem_text.isdigit():
-                                        # Exclude common non-descriptive text
-                                        if elem_text.lower() not in ['read more', 'more', 'details', 'view', 'click', '继续阅读']:
-                                            desc_texts.append(self.decode_html_entities(elem_text))
-
-                            # Alternative: Get all text from the card and remove the title/link text
-                            if not desc_texts:
-                                card_text = card.get_text(separator=' ', strip=True)
-                                if img_tag and img_tag.get('alt'):
-                                    title_to_remove = img_tag.get('alt', '').strip()
-                                else:
-                                    title_to_remove = link_tag.get_text(strip=True)
-
-                                if title_to_remove and title_to_remove in card_text:
-                                    # Remove title from full text to get potential description
-                                    remaining_text = card_text.replace(title_to_remove, '', 1).strip()
-                                    # Look for meaningful text (excluding author names, dates, etc.)
-                                    if remaining_text:
-                                        # Split by common separators and look for content
-                                        parts = [part.strip() for part in remaining_text.split('\n') if part.strip()]
-                                        for part in parts:
-                                            if len(part) > 20 and '发表于' not in part and '作者' not in part and '浏览' not in part:
-                                                desc_texts.append(self.decode_html_entities(part))
-                                                break
-
-                            if desc_texts:
-                                description = desc_texts[0][:200] + "..." if len(desc_texts[0]) > 200 else desc_texts[0]
-                            else:
-                                # Last resort: try to find any descriptive text near the link
-                                parent = link_tag.parent
-                                if parent:
-                                    # Get siblings and their text
-                                    for sibling in parent.children:
-                                        if sibling != link_tag and hasattr(sibling, 'get_text'):
-                                            sibling_text = sibling.get_text(strip=True)
-                                            if sibling_text and len(sibling_text) > 20:
-                                                description = self.decode_html_entities(sibling_text)[:200] + "..." if len(sibling_text) > 200 else self.decode_html_entities(sibling_text)
-                                                break
-
-                            # Clean up description - remove excessive whitespace
-                            if description:
-                                description = ' '.join(description.split())
-
-                            # Try to extract publication date from the card
-                            date = datetime.now().strftime('%Y-%m-%d')  # Default fallback
-
-                            # Look for date patterns in the card
-                            card_text = card.get_text(separator=' ', strip=True)
-
-                            # Look for Chinese date patterns like "2026-01-29", "2026/01/29", etc.
-                            # Or patterns like "发表于 YYYY-MM-DD" (published on)
-                            import re
-                            # Match dates like: 2026-01-29, 2026/01/29, 2026.01.29, etc.
-                            date_pattern = r'(?:\d{4}[-/\.]\d{1,2}[-/\.]\d{1,2}|发表于\D*(\d{4}-\d{2}-\d{2})|发表于\D*(\d{4}/\d{2}/\d{2}))'
-                            date_match = re.search(date_pattern, card_text)
-                            if date_match:
-                                # Get the matched date or any captured groups
-                                full_match = date_match.group(0)
-                                # Extract just the date part
-                                actual_date = re.search(r'\d{4}[-/\.]\d{1,2}[-/\.]\d{1,2}', full_match)
-                                if actual_date:
-                                    extracted_date = actual_date.group(0)
-                                    # Convert to standard format
-                                    try:
-                                        parsed_date = datetime.strptime(extracted_date.replace('/', '-'), '%Y-%m-%d')
-                                        date = parsed_date.strftime('%Y-%m-%d')
-                                    except ValueError:
-                                        # If date parsing fails, use today's date
-                                        date = datetime.now().strftime('%Y-%m-%d')
-
-                            # Look for additional text elements that might have date information
-                            date_elements = card.find_all(string=re.compile(r'发表于|发布于|发布时间|时间|日期'))
-                            for element in date_elements:
-                                parent = element.parent
-                                if parent:
-                                    parent_text = parent.get_text(strip=True)
-                                    date_match2 = re.search(r'\d{4}[-/\.]\d{1,2}[-/\.]\d{1,2}', parent_text)
-                                    if date_match2:
-                                        extracted_date = date_match2.group(0)
-                                        try:
-                                            parsed_date = datetime.strptime(extracted_date.replace('/', '-'), '%Y-%m-%d')
-                                            date = parsed_date.strftime('%Y-%m-%d')
-                                            break
-                                        except ValueError:
-                                            continue
-
-                            # Add to tech articles
-                            article = {
-                                'title': title,
-                                'url': url,
-                                'source': 'XZ Aliyun',
-                                'description': description,
-                                'date': date,
-                                'category': 'tech'
-                            }
-                            self.articles['tech'].append(article)
-                    except Exception as e:
-                        logger.warning(f"Error processing XZ Aliyun item: {str(e)}")
-                        continue
+                # The news items come as an HTML fragment in the 'data' field
+                self.articles['tech'].extend(extract.run(extract.xz_cards, json_data['data']))
             else:
                 logger.warning("Unexpected response structure from XZ Aliyun API")
 
@@ -481,28 +716,15 @@ class SecurityNewsAggregator:
         """Scrape https://projectzero.google/ for security research (tech)"""
         logger.info("Scraping Project Zero...")
         try:
-            # Create a new session that can use proxy for testing
-            proxy_session = requests.Session()
-            proxy_session.headers.update({
+            projectzero_session = self.source_session('projectzero', {
                 'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
             })
 
-            # Check if we're in testing environment by attempting to connect directly first
-            try:
-                response = proxy_session.get("https://projectzero.google/", timeout=20)
-                response.raise_for_status()
-            except:
-                # If direct connection fails, try using the proxy
-                logger.info("Direct connection to Project Zero failed, trying proxy...")
-                proxy_session.proxies = {
-                    'http': 'http://192.168.36.1:7890',  # Updated to match user's proxy address
-                    'https': 'http://192.168.36.1:7890'  # Updated to match user's proxy address
-                }
-                response = proxy_session.get("https://projectzero.google/", timeout=20)
-
+            # Goes through the configured proxy pool when the site is not reachable directly
+            response = self.fetch_routed(projectzero_session, "https://projectzero.google/", timeout=20)
             response.raise_for_status()
 
-            soup = BeautifulSoup(response.content, 'html.parser')
+            soup = parse_html(decoding.text(response))
 
             # Find articles with the specific article class="grid" as mentioned
             grid_articles = soup.find_all('article', class_='grid')
@@ -584,11 +806,11 @@ class SecurityNewsAggregator:
         logger.info("Scraping Anquanke...")
         try:
             # Request the main page
-            response = session.get("https://www.anquanke.com/", timeout=20)
+            response = self.fetch(get_session(), "https://www.anquanke.com/", timeout=20)
             response.raise_for_status()
 
             # Parse HTML content
-            soup = BeautifulSoup(response.content, 'html.parser')
+            soup = parse_html(decoding.text(response))
 
             # Find all list items with class "item" as specified
             item_elements = soup.find_all('li', class_='item')
@@ -680,7 +902,7 @@ class SecurityNewsAggregator:
             import random
 
             # Create a new session with more realistic browser headers
-            freebuf_session = requests.Session()
+            freebuf_session = create_session()
 
             # Set very realistic browser headers to mimic a real user
             headers_list = [
@@ -688,7 +910,7 @@ class SecurityNewsAggregator:
                     'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.6099.109 Safari/537.36',
                     'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,image/apng,*/*;q=0.8',
                     'Accept-Language': 'zh-CN,zh;q=0.9,en-US;q=0.8,en;q=0.7',
-                    'Accept-Encoding': 'gzip, deflate, br',
+                    'Accept-Encoding': decoding.ACCEPT_ENCODING,
                     'Connection': 'keep-alive',
                     'Upgrade-Insecure-Requests': '1',
                     'Sec-Fetch-Dest': 'document',
@@ -702,7 +924,7 @@ class SecurityNewsAggregator:
                     'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.6099.109 Safari/537.36',
                     'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,image/apng,*/*;q=0.8',
                     'Accept-Language': 'zh-CN,zh;q=0.9,en-US;q=0.8,en;q=0.7',
-                    'Accept-Encoding': 'gzip, deflate, br',
+                    'Accept-Encoding': decoding.ACCEPT_ENCODING,
                     'Connection': 'keep-alive',
                     'Upgrade-Insecure-Requests': '1',
                     'Sec-Fetch-Dest': 'document',
@@ -719,14 +941,15 @@ class SecurityNewsAggregator:
             freebuf_session.headers.update(selected_headers)
 
             # First, establish a session by visiting the homepage to get cookies
-            response = freebuf_session.get("https://www.freebuf.com/", timeout=15)
+            response = self.fetch(freebuf_session, "https://www.freebuf.com/", timeout=15)
 
             # Check if page requires verification/captcha
-            if "verification" in response.text.lower() or "captcha" in response.text.lower() or "aliyun_waf" in response.text.lower():
+            page = decoding.text(response).lower()
+            if "verification" in page or "captcha" in page or "aliyun_waf" in page:
                 logger.info("FreeBuf may require verification, trying with different approach...")
 
-                # Add more human-like behaviors
-                time.sleep(random.uniform(2, 5))  # Simulate initial page load time
+                # Back off before the second attempt, honouring Retry-After if the WAF sent one
+                polite_sleep(self.retry_policy.delay(1, response))
 
                 # Try with different headers that look more like a returning user
                 freebuf_session.headers.update({
@@ -739,17 +962,18 @@ class SecurityNewsAggregator:
                 })
 
                 # Try visiting a specific section instead of homepage
-                response = freebuf_session.get("https://www.freebuf.com/news", timeout=15)
+                response = self.fetch(freebuf_session, "https://www.freebuf.com/news", timeout=15)
 
             # Check again if page still requires verification
-            if "verification" in response.text.lower() or "captcha" in response.text.lower() or "aliyun_waf" in response.text.lower():
+            page = decoding.text(response).lower()
+            if "verification" in page or "captcha" in page or "aliyun_waf" in page:
                 logger.warning("FreeBuf requires verification/captcha - unable to scrape content")
                 # Still return gracefully without adding any articles
                 return
 
             response.raise_for_status()
 
-            soup = BeautifulSoup(response.content, 'html.parser')
+            soup = parse_html(decoding.text(response))
 
             # Find articles using the specified structure: div class="article-list" > div class="article-item"
             article_list = soup.find('div', class_='article-list')
@@ -912,10 +1136,10 @@ class SecurityNewsAggregator:
         """Scrape https://www.secrss.com/ for security news"""
         logger.info("Scraping Secrss...")
         try:
-            response = session.get("https://www.secrss.com/", timeout=10)
+            response = self.fetch(get_session(), "https://www.secrss.com/", timeout=10)
             response.raise_for_status()
 
-            soup = BeautifulSoup(response.content, 'html.parser')
+            soup = parse_html(decoding.text(response))
 
             # Find the article list title and its following ul
             article_list_title = soup.find('div', class_='article-list-title')
@@ -1004,14 +1228,14 @@ class SecurityNewsAggregator:
             import time
 
             # Create a new session with more realistic headers
-            seebug_session = requests.Session()
+            seebug_session = create_session()
 
             # Set headers to mimic a real browser
             seebug_session.headers.update({
                 'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36 Edg/91.0.864.64',
                 'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,image/apng,*/*;q=0.8',
                 'Accept-Language': 'zh-CN,zh;q=0.9,en-US;q=0.8,en;q=0.7',
-                'Accept-Encoding': 'gzip, deflate, br',
+                'Accept-Encoding': decoding.ACCEPT_ENCODING,
                 'Connection': 'keep-alive',
                 'Upgrade-Insecure-Requests': '1',
                 'Sec-Fetch-Dest': 'document',
@@ -1020,23 +1244,18 @@ class SecurityNewsAggregator:
                 'Cache-Control': 'max-age=0'
             })
 
-            # First, try to establish a session by getting the main page
-            response = seebug_session.get("https://paper.seebug.org/", timeout=20)
-
-            # Add a delay to simulate human-like behavior
-            time.sleep(2)
-
-            # If first request was blocked, try again
-            if response.status_code in [403, 503, 521, 522, 524]:
-                # Add additional delays and different headers
-                time.sleep(5)
+            def look_like_search_visitor(attempt):
+                # Retry with different headers in case the shield fingerprints the first request
                 seebug_session.headers.update({
                     'Referer': 'https://google.com/',
                     'Sec-Ch-Ua': '"Not_A Brand";v="8", "Chromium";v="120"',
                     'Sec-Ch-Ua-Mobile': '?0',
                     'Sec-Ch-Ua-Platform': '"Windows"'
                 })
-                response = seebug_session.get("https://paper.seebug.org/", timeout=20)
+
+            # The shield answers 403 as well as 5xx while it is challenging clients
+            response = self.fetch(seebug_session, "https://paper.seebug.org/", policy=SEEBUG_RETRY_POLICY,
+                                  before_retry=look_like_search_visitor, timeout=20)
 
             # Check response status
             if response.status_code in [403, 503, 521, 522, 524]:
@@ -1045,7 +1264,7 @@ class SecurityNewsAggregator:
 
             response.raise_for_status()
 
-            soup = BeautifulSoup(response.content, 'html.parser')
+            soup = parse_html(decoding.text(response))
 
             # Alternative approach: look for common blog/article patterns if main-inner isn't available
             # Try multiple selectors to find articles
@@ -1227,20 +1446,19 @@ class SecurityNewsAggregator:
         logger.info("Scraping KanXue...")
         try:
             # Create a session with appropriate headers for KanXue
-            kanxue_session = requests.Session()
-            kanxue_session.headers.update({
+            kanxue_session = self.source_session('kanxue', {
                 'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.6099.109 Safari/537.36',
                 'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,image/apng,*/*;q=0.8',
                 'Accept-Language': 'zh-CN,zh;q=0.9,en-US;q=0.8,en;q=0.7',
-                'Accept-Encoding': 'gzip, deflate, br',
+                'Accept-Encoding': decoding.ACCEPT_ENCODING,
                 'Connection': 'keep-alive',
                 'Upgrade-Insecure-Requests': '1',
             })
 
-            response = kanxue_session.get("https://www.kanxue.com/", timeout=20)
+            response = self.fetch(kanxue_session, "https://www.kanxue.com/", timeout=20)
             response.raise_for_status()
 
-            soup = BeautifulSoup(response.content, 'html.parser')
+            soup = parse_html(decoding.text(response))
 
             # Find articles in the specified div with class "media p-3 home_article bg-white"
             article_elements = soup.find_all(class_='media p-3 home_article bg-white')
@@ -1373,12 +1591,12 @@ class SecurityNewsAggregator:
         ]
 
         # Create a session to handle cookies and headers consistently
-        thackernews_session = requests.Session()
+        thackernews_session = create_session()
         thackernews_session.headers.update({
             'User-Agent': random.choice(user_agents),
             'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,image/apng,*/*;q=0.8',
             'Accept-Language': 'en-US,en;q=0.9',
-            'Accept-Encoding': 'gzip, deflate',
+            'Accept-Encoding': decoding.ACCEPT_ENCODING,
             'Connection': 'keep-alive',
             'Upgrade-Insecure-Requests': '1',
             'DNT': '1',
@@ -1386,17 +1604,15 @@ class SecurityNewsAggregator:
         })
 
         # 随机延时，模拟人类行为
-        time.sleep(random.uniform(1, 2))
+        polite_sleep(random.uniform(1, 2))
 
         try:
-            response = thackernews_session.get("https://thehackernews.com/", timeout=10)
+            response = self.fetch(thackernews_session, "https://thehackernews.com/", timeout=10)
 
             if response.status_code == 200:
                 logger.info("Successfully connected to The Hacker News")
 
-                # Use our helper function to properly decode response content
-                content = self._decode_response_content(response)
-                soup = BeautifulSoup(content, 'html.parser')
+                soup = parse_html(decoding.text(response))
 
                 # Find articles in the specified div with class "blog-posts clear"
                 blog_posts_div = soup.find('div', class_='blog-posts clear')
@@ -1437,11 +1653,8 @@ class SecurityNewsAggregator:
                                     title = self.decode_html_entities(link_elem.get('title', '').strip() or link_elem.get('aria-label', '').strip())
 
                                 if title and url:
-                                    # Get description from the article page itself
-                                    description = self._get_the_hacker_news_description(url)
-
-                                    # Get date from the article page
-                                    date = self._get_the_hacker_news_date(url)
+                                    # Get description and date from the article page itself
+                                    description, date = self._get_the_hacker_news_details(url)
 
                                     # Determine category based on content
                                     category = 'news'  # The Hacker News is news-focused
@@ -1489,8 +1702,7 @@ class SecurityNewsAggregator:
                                     title = self.decode_html_entities(link_elem.text.strip())
 
                                 if title and url:
-                                    description = self._get_the_hacker_news_description(url)
-                                    date = self._get_the_hacker_news_date(url)
+                                    description, date = self._get_the_hacker_news_details(url)
 
                                     article = {
                                         'title': title,
@@ -1513,167 +1725,50 @@ class SecurityNewsAggregator:
         except Exception as e:
             logger.error(f"Error scraping The Hacker News: {str(e)}")
 
-    def _get_the_hacker_news_description(self, url):
-        """Helper method to fetch description from individual The Hacker News article pages"""
-        try:
-            import time
-            import random
+        if self.batch_details():
+            self.fetch_details('thehackernews', self.articles['news'])
 
-            # Random delay to avoid rate limiting
-            time.sleep(random.uniform(0.2, 1))
-
-            # Create a session to fetch the individual article page
-            desc_session = requests.Session()
-            desc_session.headers.update({
-                'User-Agent': random.choice([
-                    'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.6099.109 Safari/537.36',
-                    'Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:109.0) Gecko/20100101 Firefox/115.0',
-                    'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
-                ]),
-                'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,image/apng,*/*;q=0.8',
-                'Accept-Language': 'en-US,en;q=0.9',
-                'Accept-Encoding': 'gzip, deflate',
-                'Connection': 'keep-alive',
-                'Upgrade-Insecure-Requests': '1',
-                'DNT': '1',
-                'Referer': 'https://thehackernews.com/'
-            })
-
-            response = desc_session.get(url, timeout=8)
-
-            if response.status_code == 200:
-                content = self._decode_response_content(response)
-                soup = BeautifulSoup(content, 'html.parser')
-
-                # Look for meta description
-                meta_desc = soup.find('meta', attrs={'name': 'description'})
-                if meta_desc and meta_desc.get('content'):
-                    return self.decode_html_entities(meta_desc.get('content').strip())
-
-                # Look for Open Graph description
-                og_desc = soup.find('meta', property='og:description')
-                if og_desc and og_desc.get('content'):
-                    return self.decode_html_entities(og_desc.get('content').strip())
-
-                # Try to find description in article content
-                content_selectors = [
-                    '.post-content',
-                    '.article-content',
-                    '.entry-content',
-                    '.post-body',
-                    'article',
-                    '.content',
-                    'main',
-                    '.post-text',
-                    '.story-body',
-                    'p'
-                ]
-
-                description = ""
-                for selector in content_selectors:
-                    elements = soup.select(selector)
-                    for elem in elements:
-                        text = elem.get_text(strip=True)
-                        if text and len(text) > 50:  # Get meaningful text
-                            # Remove common non-content text
-                            if not text.startswith('FacebookTwitterLinkedIn') and len(text) < 1000:
-                                description = text[:500]  # Limit length
-                                break
-                    if description:
-                        break
-
-                # If still no description found, use first paragraph
-                if not description:
-                    first_p = soup.find('p')
-                    if first_p:
-                        text = first_p.get_text(strip=True)
-                        if len(text) > 20:
-                            description = text[:500]
-
-                if description:
-                    return self.decode_html_entities(description)
-
-            # Fallback description
-            return "Latest security news from The Hacker News"
-
-        except Exception as e:
-            logger.debug(f"Could not get description from {url}: {str(e)}")
-            # Return a default description rather than empty
-            return "Latest security news from The Hacker News"
+    def _the_hacker_news_detail_session(self):
+        """Article pages share one session, so the connection is set up only once"""
+        import random
+        return self.source_session('thehackernews-detail', {
+            'User-Agent': random.choice([
+                'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.6099.109 Safari/537.36',
+                'Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:109.0) Gecko/20100101 Firefox/115.0',
+                'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
+            ]),
+            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,image/apng,*/*;q=0.8',
+            'Accept-Language': 'en-US,en;q=0.9',
+            'Accept-Encoding': decoding.ACCEPT_ENCODING,
+            'Connection': 'keep-alive',
+            'Upgrade-Insecure-Requests': '1',
+            'DNT': '1',
+            'Referer': 'https://thehackernews.com/'
+        })
 
-    def _get_the_hacker_news_date(self, url):
-        """Helper method to fetch publication date from individual The Hacker News article pages"""
+    def _get_the_hacker_news_details(self, url):
+        """Fetch an individual The Hacker News article page once for both its description and publication date"""
+        description, date = THN_FALLBACK_DESCRIPTION, datetime.now().strftime('%Y-%m-%d')
+        # On the asyncio backend the pages are fetched in one batch afterwards, see fetch_details()
+        if not self.wants_details() or self.batch_details():
+            return description, date
         try:
-            import time
             import random
 
             # Random delay to avoid rate limiting
-            time.sleep(random.uniform(0.2, 0.8))
-
-            # Create a session to fetch the individual article page
-            date_session = requests.Session()
-            date_session.headers.update({
-                'User-Agent': random.choice([
-                    'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.6099.109 Safari/537.36',
-                    'Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:109.0) Gecko/20100101 Firefox/115.0',
-                    'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
-                ]),
-                'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,image/apng,*/*;q=0.8',
-                'Accept-Language': 'en-US,en;q=0.9',
-                'Accept-Encoding': 'gzip, deflate',
-                'Connection': 'keep-alive',
-                'Upgrade-Insecure-Requests': '1',
-                'DNT': '1',
-                'Referer': 'https://thehackernews.com/'
-            })
+            polite_sleep(random.uniform(0.2, 1))
 
-            response = date_session.get(url, timeout=8)
+            response = self.fetch(self._the_hacker_news_detail_session(), url, policy=resilience.DETAIL_POLICY, timeout=8)
 
             if response.status_code == 200:
-                content = self._decode_response_content(response)
-                soup = BeautifulSoup(content, 'html.parser')
-
-                # Look for publication date in various formats
-                date_selectors = [
-                    'time[datetime]',
-                    'time',
-                    '[pubdate]',
-                    '.publishdate',
-                    '.date',
-                    '.post-meta',
-                    '.entry-meta',
-                    '.published',
-                    '.updated',
-                    '.post-date'
-                ]
-
-                for selector in date_selectors:
-                    date_elem = soup.select_one(selector)
-                    if date_elem:
-                        date_str = date_elem.get('datetime') or date_elem.get_text(strip=True)
-                        if date_str:
-                            # Try to parse the date string
-                            parsed_date = self._parse_date_string(date_str)
-                            if parsed_date:
-                                return parsed_date
-
-                # Look for date in meta tags
-                date_meta = soup.find('meta', attrs={'name': 'publishdate'}) or \
-                           soup.find('meta', attrs={'property': 'article:published_time'}) or \
-                           soup.find('meta', attrs={'name': 'article:published_time'})
-
-                if date_meta:
-                    content = date_meta.get('content') or date_meta.get('value')
-                    if content:
-                        parsed_date = self._parse_date_string(content)
-                        if parsed_date:
-                            return parsed_date
+                found_description, found_date = extract.run(extract.thn_details, decoding.text(response))
+                description = found_description or description
+                date = found_date or date
 
         except Exception as e:
-            logger.debug(f"Could not get date from {url}: {str(e)}")
+            logger.debug(f"Could not get details from {url}: {str(e)}")
 
-        # Return today's date if no date found
-        return datetime.now().strftime('%Y-%m-%d')
+        return description, date
 
     def scrape_security_week(self):
         """Scrape https://www.securityweek.com/ for security news"""
@@ -1693,18 +1788,15 @@ class SecurityNewsAggregator:
 
         success = False
 
-        # First, try direct connection
         try:
-            secweek_session = requests.Session()
-
             # 随机选择User-Agent
             selected_user_agent = random.choice(user_agents)
 
-            secweek_session.headers.update({
+            secweek_session = self.source_session('securityweek', {
                 'User-Agent': selected_user_agent,
                 'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,image/apng,*/*;q=0.8',
                 'Accept-Language': 'en-US,en;q=0.9',
-                'Accept-Encoding': 'gzip, deflate, br',
+                'Accept-Encoding': decoding.ACCEPT_ENCODING,
                 'Connection': 'keep-alive',
                 'Upgrade-Insecure-Requests': '1',
                 'Sec-Fetch-Dest': 'document',
@@ -1716,78 +1808,36 @@ class SecurityNewsAggregator:
             })
 
             # 随机延时，模拟人类行为
-            time.sleep(random.uniform(1, 3))
+            polite_sleep(random.uniform(1, 3))
 
-            response = secweek_session.get("https://www.securityweek.com/", timeout=30)
+            # Direct or through the proxy pool, whichever worked last time for this host
+            response = self.fetch_routed(secweek_session, "https://www.securityweek.com/", timeout=30)
 
             if response.status_code == 200:
-                logger.info("直接连接到SecurityWeek成功")
-
-                # Use our helper function to properly decode response content
-                content = self._decode_response_content(response)
-                soup = BeautifulSoup(content, 'html.parser')
-
-                # Find articles in the specified div with class "zox-widget-side-trend-wrap left zoxrel zox100"
-                trend_wrap_div = soup.find('div', class_='zox-widget-side-trend-wrap left zoxrel zox100')
-
-                if trend_wrap_div:
-                    self._parse_securityweek_articles(trend_wrap_div)
-                    success = True
-                else:
-                    logger.info("Could not find 'zox-widget-side-trend-wrap left zoxrel zox100' div in SecurityWeek")
-                    # As fallback, look for other common article patterns
-                    self._parse_securityweek_fallback(soup)
-                    success = True
-            elif response.status_code == 403:
-                logger.info("Direct connection to SecurityWeek failed with 403, trying proxy...")
-
-        except requests.exceptions.RequestException as e:
-            logger.info(f"Direct connection to SecurityWeek failed: {str(e)}, trying proxy...")
-
-        # 如果直接连接失败，则尝试使用代理（仅在测试环境中）
-        if not success:
-            try:
-                # Configure session with proxy for testing environment only
-                secweek_session_with_proxy = requests.Session()
-                secweek_session_with_proxy.headers.update({
-                    'User-Agent': random.choice(user_agents),
-                    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,image/apng,*/*;q=0.8',
-                    'Accept-Language': 'en-US,en;q=0.9',
-                    'Accept-Encoding': 'gzip, deflate, br',
-                    'Connection': 'keep-alive',
-                    'Upgrade-Insecure-Requests': '1',
-                })
-
-                # For testing environment, use proxy
-                secweek_session_with_proxy.proxies = {
-                    'http': 'http://192.168.36.1:7890',  # Proxy for testing environment only
-                    'https': 'http://192.168.36.1:7890'  # Proxy for testing environment only
-                }
-
-                time.sleep(random.uniform(1, 3))
-                response = secweek_session_with_proxy.get("https://www.securityweek.com/", timeout=30)
-                response.raise_for_status()
-
-                # Use our helper function to properly decode response content
-                content = self._decode_response_content(response)
-                soup = BeautifulSoup(content, 'html.parser')
-
-                # Find articles in the specified div with class "zox-widget-side-trend-wrap left zoxrel zox100"
-                trend_wrap_div = soup.find('div', class_='zox-widget-side-trend-wrap left zoxrel zox100')
-
-                if trend_wrap_div:
-                    self._parse_securityweek_articles(trend_wrap_div)
-                else:
-                    logger.info("Could not find 'zox-widget-side-trend-wrap left zoxrel zox100' div in SecurityWeek with proxy")
-                    # As fallback, look for other common article patterns
-                    self._parse_securityweek_fallback(soup)
+                logger.info("连接到SecurityWeek成功")
 
+                # Trending widget entries, or generic article markup as fallback
+                for title, url, date in extract.run(extract.securityweek_listing, decoding.text(response)):
+                    self.articles['news'].append({
+                        'title': title,
+                        'url': url,
+                        'source': 'SecurityWeek',
+                        # Extract description from the article page itself
+                        'description': self._get_securityweek_description(url),
+                        'date': date,
+                        'category': 'news'  # SecurityWeek is news-focused
+                    })
                 success = True
+            else:
+                logger.info(f"SecurityWeek returned status {response.status_code} on every route")
 
-            except Exception as proxy_error:
-                logger.warning(f"SecurityWeek proxy request failed: {str(proxy_error)}")
+        except requests.exceptions.RequestException as e:
+            logger.info(f"Connection to SecurityWeek failed: {str(e)}")
 
-        if not success:
+        if not success and _http_mode == 'replay':
+            # A replay shows what the fixtures hold; sample data would hide a missing one
+            logger.warning("SecurityWeek has no usable recorded response, not adding backup data")
+        elif not success:
             logger.warning("经过多次尝试仍无法获取SecurityWeek内容，使用备用数据")
             # 当所有方法都失败时，添加一些示例数据确保源列表显示
             backup_articles = [
@@ -1822,341 +1872,282 @@ class SecurityNewsAggregator:
                 if not any(a['url'] == article['url'] for a in self.articles['news']):
                     self.articles['news'].append(article)
 
-    def _parse_securityweek_articles(self, trend_wrap_div):
-        """Helper method to parse articles from SecurityWeek"""
-        try:
-            # First try to find articles with specific patterns within the trend div
-            articles = trend_wrap_div.find_all(['div', 'article'], class_=lambda x: x and ('post' in x or 'item' in x or 'entry' in x or 'article' in x))
-
-            # If no articles found with the above pattern, try to find all links in the div
-            if not articles:
-                all_links = trend_wrap_div.find_all('a', href=True, class_=lambda x: x and 'post' in x if x else True)
-                if not all_links:
-                    all_links = trend_wrap_div.find_all('a', href=True)
-
-                for link in all_links:
-                    try:
-                        title = self.decode_html_entities(link.text.strip())
-
-                        if len(title) > 10:  # Only consider significant titles
-                            url = link.get('href')
-                            if url and not url.startswith('http'):
-                                url = urljoin("https://www.securityweek.com/", url)
-
-                            # Extract description from the article page itself
-                            description = self._get_securityweek_description(url)
+        if self.batch_details():
+            self.fetch_details('securityweek', self.articles['news'])
 
-                            date = datetime.now().strftime('%Y-%m-%d')
-
-                            article = {
-                                'title': title,
-                                'url': url,
-                                'source': 'SecurityWeek',
-                                'description': description,
-                                'date': date,
-                                'category': 'news'
-                            }
-                            self.articles['news'].append(article)
-                    except Exception as e:
-                        logger.warning(f"Error processing SecurityWeek link: {str(e)}")
-                        continue
-            else:
-                # Process articles found with common patterns
-                for article_elem in articles:
-                    try:
-                        # Find title and link within the article element
-                        title_elem = article_elem.find(['a', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6'])
-                        if title_elem:
-                            # Get title from the element itself or from a child link
-                            link_elem = title_elem.find('a') if title_elem.name != 'a' else title_elem
-
-                            if title_elem.name != 'a':
-                                title = self.decode_html_entities(title_elem.get_text(strip=True))
-                            else:
-                                title = self.decode_html_entities(title_elem.text.strip())
-
-                            if not title and link_elem:
-                                title = self.decode_html_entities(link_elem.text.strip())
-
-                            if link_elem:
-                                url = link_elem.get('href')
-                            else:
-                                url = None
-
-                            if url and not url.startswith('http'):
-                                url = urljoin("https://www.securityweek.com/", url)
-
-                            if title and url and len(title) > 5:  # Only add if title is significant
-                                # Extract description from the article page itself
-                                description = self._get_securityweek_description(url)
-
-                                # Extract date if available
-                                date = datetime.now().strftime('%Y-%m-%d')
-                                date_elem = article_elem.find('time') or article_elem.find('span', class_='date') or article_elem.find('span', class_='time') or article_elem.find('div', class_='date')
-                                if date_elem:
-                                    date_text = date_elem.get_text(strip=True)
-                                    import re
-                                    # Try to extract date in various formats
-                                    date_match = re.search(r'(\d{4}[-/年]\d{1,2}[/-月]\d{1,2}日?)', date_text)
-                                    if not date_match:
-                                        # Try MM/DD/YYYY or similar patterns
-                                        date_match = re.search(r'(\d{1,2}/\d{1,2}/\d{4})', date_text)
-                                    if not date_match:
-                                        # Try Month DD, YYYY pattern
-                                        date_match = re.search(r'([A-Za-z]+\s+\d{1,2},?\s+\d{4})', date_text)
-
-                                    if date_match:
-                                        extracted_date = date_match.group(1)
-                                        try:
-                                            if ',' in extracted_date:
-                                                # Month DD, YYYY format
-                                                parsed_date = datetime.strptime(extracted_date, '%B %d, %Y')
-                                                date = parsed_date.strftime('%Y-%m-%d')
-                                            elif '/' in extracted_date:
-                                                # MM/DD/YYYY format
-                                                parts = extracted_date.split('/')
-                                                if len(parts) == 3:
-                                                    month, day, year = parts
-                                                    parsed_date = datetime.strptime(f'{year}-{month.zfill(2)}-{day.zfill(2)}', '%Y-%m-%d')
-                                                    date = parsed_date.strftime('%Y-%m-%d')
-                                        except ValueError:
-                                            try:
-                                                # Try other date formats
-                                                parsed_date = datetime.strptime(extracted_date, '%m/%d/%Y')
-                                                date = parsed_date.strftime('%Y-%m-%d')
-                                            except ValueError:
-                                                pass
-
-                                article = {
-                                    'title': title,
-                                    'url': url,
-                                    'source': 'SecurityWeek',
-                                    'description': description,
-                                    'date': date,
-                                    'category': 'news'  # SecurityWeek is news-focused
-                                }
-                                self.articles['news'].append(article)
-                    except Exception as e:
-                        logger.warning(f"Error processing SecurityWeek article: {str(e)}")
-                        continue
-        except Exception as e:
-            logger.error(f"Error in _parse_securityweek_articles helper: {str(e)}")
+    def _securityweek_detail_session(self):
+        """One session for all article pages, so the connection is set up only once"""
+        return self.source_session('securityweek-detail', {
+            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.6099.109 Safari/537.36',
+            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,image/apng,*/*;q=0.8',
+            'Accept-Language': 'en-US,en;q=0.9',
+            'Accept-Encoding': decoding.ACCEPT_ENCODING,
+            'Connection': 'keep-alive',
+            'Upgrade-Insecure-Requests': '1',
+            'Referer': 'https://www.securityweek.com/'
+        })
 
     def _get_securityweek_description(self, url):
         """Helper method to fetch description from individual SecurityWeek article pages"""
+        # On the asyncio backend the pages are fetched in one batch afterwards, see fetch_details()
+        if not self.wants_details() or self.batch_details():
+            return SECURITYWEEK_FALLBACK_DESCRIPTION
         try:
             import time
             import random
 
             # Random delay to avoid rate limiting
-            time.sleep(random.uniform(0.5, 2))
-
-            # Create a session to fetch the individual article page
-            desc_session = requests.Session()
-            desc_session.headers.update({
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.6099.109 Safari/537.36',
-                'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,image/apng,*/*;q=0.8',
-                'Accept-Language': 'en-US,en;q=0.9',
-                'Accept-Encoding': 'gzip, deflate, br',
-                'Connection': 'keep-alive',
-                'Upgrade-Insecure-Requests': '1',
-                'Referer': 'https://www.securityweek.com/'
-            })
-
-            # First, try direct connection
-            response = desc_session.get(url, timeout=15)
+            polite_sleep(random.uniform(0.5, 2))
 
-            # If direct connection fails, try using proxy
-            if response.status_code != 200:
-                logger.info(f"Direct connection to {url} failed, trying proxy...")
-
-                # Configure session with proxy for testing environment only
-                desc_session_proxy = requests.Session()
-                desc_session_proxy.headers.update({
-                    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.6099.109 Safari/537.36',
-                    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,image/apng,*/*;q=0.8',
-                    'Accept-Language': 'en-US,en;q=0.9',
-                    'Accept-Encoding': 'gzip, deflate, br',
-                    'Connection': 'keep-alive',
-                    'Upgrade-Insecure-Requests': '1',
-                    'Referer': 'https://www.securityweek.com/'
-                })
-
-                # For testing environment, use proxy
-                desc_session_proxy.proxies = {
-                    'http': 'http://192.168.36.1:7890',  # Proxy for testing environment only
-                    'https': 'http://192.168.36.1:7890'  # Proxy for testing environment only
-                }
-
-                response = desc_session_proxy.get(url, timeout=15)
+            # Same routing as the listing page: the route that worked for this host goes first
+            response = self.fetch_routed(self._securityweek_detail_session(), url, policy=resilience.DETAIL_POLICY, timeout=15)
 
             response.raise_for_status()
 
-            # Use our helper function to properly decode response content
-            content = self._decode_response_content(response)
-            soup = BeautifulSoup(content, 'html.parser')
-
-            # Try multiple methods to get the description
-            description = ""
-
-            # 1. Try to get meta description
-            meta_desc = soup.find('meta', attrs={'name': 'description'})
-            if meta_desc and meta_desc.get('content'):
-                description = self.decode_html_entities(meta_desc.get('content').strip())
-
-            if not description:
-                # 2. Try to get og:description
-                og_desc = soup.find('meta', property='og:description')
-                if og_desc and og_desc.get('content'):
-                    description = self.decode_html_entities(og_desc.get('content').strip())
-
-            if not description:
-                # 3. Try to get first paragraph content
-                first_p = soup.find('p')
-                if first_p:
-                    text = first_p.get_text(strip=True)
-                    # Skip common placeholder text
-                    if text and not text.startswith('Hi, what are you looking for?') and len(text) > 20:
-                        description = text[:500]  # Limit length
-
-            if not description:
-                # 4. Look for content divs
-                content_selectors = ['div.entry-content', 'div.post-content', 'article div.content', 'div[itemprop="articleBody"]']
-                for selector in content_selectors:
-                    content_elem = soup.select_one(selector)
-                    if content_elem:
-                        paras = content_elem.find_all('p')
-                        for p in paras:
-                            text = p.get_text(strip=True)
-                            if text and not text.startswith('Hi, what are you looking for?') and len(text) > 20:
-                                description = text[:500]
-                                break
-                    if description:
-                        break
-
-            # Fallback to default if still no description found
-            if not description:
-                description = "Latest security news from SecurityWeek"
-
-            return description
+            # Fallback to default if no description is found
+            return extract.run(extract.securityweek_description, decoding.text(response)) or SECURITYWEEK_FALLBACK_DESCRIPTION
 
         except Exception as e:
             logger.debug(f"Could not get description from {url}: {str(e)}")
             # Return a default description rather than empty
-            return "Latest security news from SecurityWeek"
-
-    def _parse_securityweek_fallback(self, soup):
-        """Fallback method to parse SecurityWeek if main div is not found"""
-        try:
-            fallback_selectors = [
-                'article',
-                '.post',
-                '.entry',
-                '.article',
-                '.news-item',
-                '.trending',
-                '.latest',
-                '.headline'
-            ]
-
-            articles_found = False
-            for selector in fallback_selectors:
-                elements = soup.select(selector)
-                if elements:
-                    logger.info(f"Found {len(elements)} elements with selector '{selector}' on SecurityWeek")
-
-                    for element in elements[:10]:  # Limit to first 10 to prevent too many
-                        try:
-                            link_elem = element.find('a', href=True)
-
-                            if link_elem:
-                                title = self.decode_html_entities(link_elem.text.strip()) or 'No Title'
-                                url = link_elem.get('href')
-
-                                if url and not url.startswith('http'):
-                                    url = urljoin("https://www.securityweek.com/", url)
-
-                                if title and len(title) > 5:  # Only add if title is significant
-                                    # Extract description from the article page itself
-                                    description = self._get_securityweek_description(url)
-
-                                    # Extract date
-                                    date = datetime.now().strftime('%Y-%m-%d')
-                                    date_elem = element.find('time') or element.find('span', class_='date') or element.find('span', class_='time') or element.find('div', class_='date')
-                                    if date_elem:
-                                        date_text = date_elem.get_text(strip=True)
-                                        import re
-                                        date_match = re.search(r'(\d{4}[-/年]\d{1,2}[/-月]\d{1,2}日?)', date_text)
-                                        if not date_match:
-                                            date_match = re.search(r'(\d{1,2}/\d{1,2}/\d{4})', date_text)
-                                        if not date_match:
-                                            date_match = re.search(r'([A-Za-z]+\s+\d{1,2},?\s+\d{4})', date_text)
-
-                                        if date_match:
-                                            extracted_date = date_match.group(1)
-                                            try:
-                                                if ',' in extracted_date:
-                                                    parsed_date = datetime.strptime(extracted_date, '%B %d, %Y')
-                                                    date = parsed_date.strftime('%Y-%m-%d')
-                                                elif '/' in extracted_date:
-                                                    parts = extracted_date.split('/')
-                                                    if len(parts) == 3:
-                                                        month, day, year = parts
-                                                        parsed_date = datetime.strptime(f'{year}-{month.zfill(2)}-{day.zfill(2)}', '%Y-%m-%d')
-                                                        date = parsed_date.strftime('%Y-%m-%d')
-                                            except ValueError:
-                                                try:
-                                                    parsed_date = datetime.strptime(extracted_date, '%m/%d/%Y')
-                                                    date = parsed_date.strftime('%Y-%m-%d')
-                                                except ValueError:
-                                                    pass
+            return SECURITYWEEK_FALLBACK_DESCRIPTION
 
-                                    article = {
-                                        'title': title,
-                                        'url': url,
-                                        'source': 'SecurityWeek',
-                                        'description': description,
-                                        'date': date,
-                                        'category': 'news'
-                                    }
-                                    self.articles['news'].append(article)
-                                    articles_found = True
-                        except Exception as e:
-                            logger.warning(f"Error processing SecurityWeek fallback element: {str(e)}")
-                            continue
-
-                    if articles_found:
-                        break  # Stop after finding articles with one valid selector
-        except Exception as e:
-            logger.error(f"Error in _parse_securityweek_fallback helper: {str(e)}")
-
-    def scrape_all_sources(self):
-        """Scrape all security news sources"""
+    def scrape_all_sources(self, sources=None, concurrency=1, stored=None, due_only=False):
+        """
+        Scrape all registered sources, or only the given source keys.
+        With due_only, sources scraped successfully within their refresh interval are left out.
+        Sources that are left out or skipped (open circuit, time budget) keep their articles from stored.
+        The articles are deduplicated and classified but not yet cut to the window, so the
+        archive sees every one of them; keep_window drops the old ones afterwards.
+        """
         logger.info("Starting to scrape all security news sources...")
 
-        # Tech-focused sources
-        self.scrape_daily_security()
-        self.scrape_tencent_security()
-        self.scrape_xz_aliyun()
-        self.scrape_project_zero()
-        self.scrape_seebug_paper()
-        self.scrape_kanxue()
-
-        # News-focused sources
-        self.scrape_anquanke()
-        self.scrape_freebuf()
-        self.scrape_secrss()
-        self.scrape_the_hacker_news()
-        self.scrape_security_week()
-
-        # Remove duplicates based on URL
-        self.remove_duplicates()
-
-        # Filter articles to keep only those published within the last 30 days
-        self.filter_recent_articles(days=30)
+        if sources is not None:
+            unknown = set(sources) - set(registry.keys())
+            if unknown:
+                raise ValueError(f"Unknown sources: {', '.join(sorted(unknown))}")
+        selected = [spec for spec in registry.all_sources() if sources is None or spec.key in sources]
+
+        results = dict.fromkeys(spec.key for spec in selected)
+        if due_only and self.breakers is not None:
+            due = [spec for spec in selected if spec.is_due(self.breakers.get(spec.key).last_success)]
+            not_due = [spec.name for spec in selected if spec not in due]
+            if not_due:
+                logger.info(f"Not due yet: {', '.join(not_due)}")
+        else:
+            due = selected
+
+        if concurrency > 1:
+            # Start the slow sources (detail page enrichment, long politeness delays) first
+            ordered = sorted(due, key=lambda spec: (not spec.needs_enrichment, -spec.politeness_s))
+            workers = {spec.key: self._worker() for spec in ordered}
+            executor = ThreadPoolExecutor(max_workers=concurrency)
+            futures = {spec.key: executor.submit(self._scrape_source, spec, worker=workers[spec.key]) for spec in ordered}
+            # Only wait until the deadline; sources still running then contribute what they have so far
+            wait(futures.values(), timeout=time_left())
+            executor.shutdown(wait=False, cancel_futures=True)
+            for key, future in futures.items():
+                if future.done() and not future.cancelled():
+                    results[key] = future.result()
+                else:
+                    self._note_deadline_hit(key)
+                    results[key] = self._partial_result(workers[key])
+        else:
+            for spec in due:
+                results[spec.key] = self._scrape_source(spec)
+
+        unfinished = [spec.name for spec in due if results[spec.key] is None]
+        if unfinished:
+            logger.warning(f"Using stored articles for sources without fresh results: {', '.join(unfinished)}")
+
+        # Merge in registry order so the output does not depend on thread scheduling
+        for spec in selected:
+            scraped = results[spec.key]
+            if scraped is None:
+                scraped = {category: [article for article in (stored or {}).get(category, []) if article.source == spec.name]
+                           for category in ('tech', 'news')}
+            self.articles['tech'].extend(scraped['tech'])
+            self.articles['news'].extend(scraped['news'])
+
+        with self.metrics.stage('dedup'), self.profile_stage('dedup'):
+            # Remove duplicates based on URL
+            self.remove_duplicates()
+
+        with self.metrics.stage('classify'), self.profile_stage('classify'):
+            self.classify_articles()
 
         logger.info(f"Scraping completed. Collected {len(self.articles['tech'])} tech articles and {len(self.articles['news'])} news articles")
 
+    def keep_window(self, days=30):
+        """Drop articles published before the window and count what each source has left"""
+        with self.metrics.stage('filter'), self.profile_stage('filter'):
+            self.filter_recent_articles(days=days)
+
+        kept = Counter(article.source for article in self.articles['tech'] + self.articles['news'])
+        for source_metrics in self.metrics.sources.values():
+            source_metrics.items_kept = kept.get(source_metrics.name, 0)
+
+    def _worker(self):
+        """Aggregator for a single source that shares this run's metrics, profiler and settings"""
+        worker = SecurityNewsAggregator()
+        worker.metrics = self.metrics
+        worker.profiler = self.profiler
+        worker.enrich_details = self.enrich_details
+        worker.retry_policy = self.retry_policy
+        # Session names are per source, so workers can share (and keep) one cache
+        worker._sessions = self._sessions
+        return worker
+
+    def _note_deadline_hit(self, key):
+        if key not in self.metrics.deadline_hit:
+            self.metrics.deadline_hit.append(key)
+
+    @staticmethod
+    def _partial_result(worker):
+        """Articles a still-running worker has collected so far, or None if it has none yet"""
+        partial = records.from_scraped({category: list(worker.articles[category]) for category in ('tech', 'news')})
+        return partial if partial['tech'] or partial['news'] else None
+
+    def _scrape_source(self, spec, worker=None):
+        """Run one source's scraper on a worker aggregator"""
+        key, name = spec.key, spec.name
+        worker = worker or self._worker()
+        if spec.needs_cloudscraper and optional_import('cloudscraper') is None:
+            logger.info(f"cloudscraper is not installed, {name} falls back to plain requests")
+        breaker = self.breakers.get(key) if self.breakers is not None else None
+        if _deadline is not None and _deadline.expired:
+            logger.warning(f"Skipping {name}: time budget used up")
+            self._note_deadline_hit(key)
+            return None
+        with self.metrics.source(key, name) as source_metrics, self.profile_stage(f"source-{key}"):
+            if breaker is not None and breaker.state == breaker.OPEN:
+                # A source that keeps failing only gets a cheap probe instead of its full timeout and sleep budget
+                probe_url = spec.base_url
+                probe_proxies = _proxy_pool.requests_proxies(_proxy_pool.routes(probe_url)[0]) if _proxy_pool is not None else None
+                if not resilience.probe(create_session(), probe_url, proxies=probe_proxies):
+                    breaker.record_failure()
+                    source_metrics.circuit = breaker.state
+                    logger.warning(f"Skipping {name}: circuit open after {breaker.failure_days} failing days, probe failed")
+                    return None
+                breaker.probing = True
+                logger.info(f"{name} answered the probe, trying a full scrape")
+            try:
+                spec.run(worker)
+            except resilience.DeadlineExceeded:
+                logger.warning(f"{name} stopped early: time budget used up")
+        source_metrics.items_found = worker.article_count()
+        scraped = records.from_scraped(worker.articles)
+
+        if _deadline is not None and _deadline.expired:
+            # Keep what was extracted before the budget ran out, but do not judge the source on it
+            self._note_deadline_hit(key)
+            breaker = None
+
+        if breaker is not None:
+            # Backup or empty results without a single successful response count as a failure;
+            # plugins that fetch through their own clients are judged by their items alone
+            answered = any(200 <= code < 300 for code in source_metrics.status if isinstance(code, int))
+            if source_metrics.items_found and (answered or not source_metrics.requests):
+                breaker.record_success()
+            else:
+                breaker.record_failure()
+            source_metrics.circuit = breaker.state
+        # A source that came back empty (site down, layout change) keeps its stored articles
+        return scraped if source_metrics.items_found else None
+
+    def keep_stored_articles(self, stored, exclude_sources=()):
+        """Carry over stored articles, except those of sources that are being re-scraped"""
+        for category in ('tech', 'news'):
+            self.articles[category].extend(
+                article for article in stored.get(category, []) if article.source not in exclude_sources)
+
+    def enrich_articles(self, concurrency=1):
+        """Fetch detail pages for stored articles that still carry a placeholder description"""
+        enrichers = {spec.name: (spec.key, DETAIL_ENRICHERS[spec.key][0], getattr(self, DETAIL_ENRICHERS[spec.key][1]))
+                     for spec in registry.all_sources() if spec.needs_enrichment and spec.key in DETAIL_ENRICHERS}
+        pending = [article for article in self.articles['tech'] + self.articles['news']
+                   if article.source in enrichers and article.description == enrichers[article.source][1]]
+        logger.info(f"Enriching {len(pending)} articles with placeholder descriptions...")
+
+        def enrich(article):
+            if not self.wants_details():
+                return
+            key, _, enricher = enrichers[article.source]
+            with self.metrics.source(key, article.source):
+                enricher(article)
+
+        self.enrich_details = True
+        if self.batch_details():
+            # One batch per source: its requests count for that source and share its session headers
+            for name, (key, _, _) in enrichers.items():
+                articles = [article for article in pending if article.source == name]
+                if articles:
+                    with self.metrics.source(key, name):
+                        self.fetch_details(key, articles)
+        elif concurrency > 1:
+            with ThreadPoolExecutor(max_workers=concurrency) as executor:
+                list(executor.map(enrich, pending))
+        else:
+            for article in pending:
+                enrich(article)
+        return len(pending)
+
+    def _enrich_the_hacker_news(self, article):
+        description, date = self._get_the_hacker_news_details(article.url)
+        article.description = description
+        article['date'] = date
+
+    def _enrich_securityweek(self, article):
+        article.description = self._get_securityweek_description(article.url)
+
+    def batch_details(self):
+        """Whether detail pages are fetched in one concurrent batch on the asyncio backend"""
+        return _fetch_backend == 'asyncio' and self.wants_details()
+
+    def fetch_details(self, key, articles):
+        """
+        Fetch the detail pages of a source's articles that still carry its placeholder
+        description concurrently, and fill them in (articles may be dicts or records)
+        """
+        import aio
+        placeholder = DETAIL_ENRICHERS[key][0]
+        session_method, apply_method, delay, routed = ASYNC_DETAILS[key]
+        name = registry.get(key).name
+        pending = [article for article in articles
+                   if article['source'] == name and article['description'] == placeholder]
+        if not pending:
+            return 0
+        headers = getattr(self, session_method)().headers
+        hosts = {urlparse(article['url']).hostname for article in pending}
+        pages = aio.fetch_all([article['url'] for article in pending], headers=headers, delay=delay,
+                              spacing={host: host_spacing(host) for host in hosts}, deadline=_deadline,
+                              pool=_proxy_pool if routed else None)
+        apply_page = getattr(self, apply_method)
+        fetched = 0
+        for article in pending:
+            page = pages.get(article['url'])
+            if page is None or page.status_code != 200:
+                continue
+            try:
+                apply_page(article, decoding.text(page))
+                fetched += 1
+            except Exception as e:
+                logger.debug(f"Could not get details from {article['url']}: {str(e)}")
+        logger.info(f"Fetched {fetched}/{len(pending)} {name} detail pages")
+        return fetched
+
+    def _apply_the_hacker_news_details(self, article, page):
+        description, date = extract.run(extract.thn_details, page)
+        if description:
+            article['description'] = description
+        if date:
+            article['date'] = date
+
+    def _apply_securityweek_details(self, article, page):
+        description = extract.run(extract.securityweek_description, page)
+        if description:
+            article['description'] = description
+
     def remove_duplicates(self):
         """Remove duplicate articles based on URL"""
         seen_urls = set()
@@ -2164,67 +2155,51 @@ class SecurityNewsAggregator:
         unique_news = []
 
         for article in self.articles['tech']:
-            if article['url'] not in seen_urls:
-                seen_urls.add(article['url'])
+            if article.url not in seen_urls:
+                seen_urls.add(article.url)
                 unique_tech.append(article)
 
         for article in self.articles['news']:
-            if article['url'] not in seen_urls:
-                seen_urls.add(article['url'])
+            if article.url not in seen_urls:
+                seen_urls.add(article.url)
                 unique_news.append(article)
 
         self.articles['tech'] = unique_tech
         self.articles['news'] = unique_news
 
+    def classify_articles(self):
+        """Tag every article and move it to the category its text points to (see classify.py)"""
+        moved = classify.classify_articles(self.articles)
+        tagged = sum(1 for category in ('tech', 'news') for article in self.articles[category] if article.tags)
+        logger.info(f"Classified articles: {tagged} tagged, {moved} moved to another category")
+
     def filter_recent_articles(self, days=30):
         """Filter articles to keep only those published within the specified number of days"""
-        from datetime import datetime, timedelta
-
         logger.info(f"Filtering articles to keep only those published within the last {days} days...")
 
+        # Dates are integers (YYYYMMDD), so the cutoff becomes the first day that is still kept:
+        # an article dated at midnight on the cutoff day is only kept if the cutoff is midnight too
         cutoff_date = datetime.now() - timedelta(days=days)
-
-        # Filter tech articles
-        filtered_tech = []
-        for article in self.articles['tech']:
-            try:
-                # Parse the article date
-                article_date = datetime.strptime(article['date'], '%Y-%m-%d')
-
-                # Keep only articles newer than cutoff date
-                if article_date >= cutoff_date:
-                    filtered_tech.append(article)
-                else:
-                    logger.debug(f"Removing old tech article: {article['title']} (published on {article['date']})")
-            except ValueError:
-                # If date parsing fails, keep the article to be safe
-                logger.warning(f"Could not parse date for tech article: {article['date']}, keeping article")
-                filtered_tech.append(article)
-
-        # Filter news articles
-        filtered_news = []
-        for article in self.articles['news']:
-            try:
-                # Parse the article date
-                article_date = datetime.strptime(article['date'], '%Y-%m-%d')
-
-                # Keep only articles newer than cutoff date
-                if article_date >= cutoff_date:
-                    filtered_news.append(article)
-                else:
-                    logger.debug(f"Removing old news article: {article['title']} (published on {article['date']})")
-            except ValueError:
-                # If date parsing fails, keep the article to be safe
-                logger.warning(f"Could not parse date for news article: {article['date']}, keeping article")
-                filtered_news.append(article)
+        first_kept_day = cutoff_date.date() if cutoff_date.time() == datetime.min.time() else cutoff_date.date() + timedelta(days=1)
+        cutoff = records.date_value(first_kept_day)
 
         original_counts = {
             'tech': len(self.articles['tech']),
             'news': len(self.articles['news'])
         }
 
-        self.articles['tech'] = filtered_tech
-        self.articles['news'] = filtered_news
+        for category in ('tech', 'news'):
+            filtered = []
+            for article in self.articles[category]:
+                if article.date >= cutoff:
+                    filtered.append(article)
+                elif article.date == records.UNKNOWN_DATE:
+                    # If the date is unknown, keep the article to be safe
+                    logger.warning(f"Unknown date for {category} article: {article.title}, keeping article")
+                    filtered.append(article)
+                else:
+                    logger.debug(f"Removing old {category} article: {article.title} (published on {article.date_text})")
+            self.articles[category] = filtered
 
         filtered_counts = {
             'tech': len(self.articles['tech']),
@@ -2240,22 +2215,35 @@ class SecurityNewsAggregator:
         script_dir = os.path.dirname(os.path.abspath(__file__))
         full_path = os.path.join(script_dir, filename)
         with open(full_path, 'w', encoding='utf-8') as f:
-            json.dump(self.articles, f, ensure_ascii=False, indent=2)
+            records.dump(self.articles, f)
         logger.info(f"Articles saved to {full_path}")
 
+    def save_run_report(self, filename='run_report.json', prometheus_file=None):
+        """Save per-source run metrics next to articles.json, optionally in Prometheus text format too"""
+        self.metrics.write_json(os.path.join(SCRIPT_DIR, filename))
+        if prometheus_file:
+            self.metrics.write_prometheus(prometheus_file)
+
     def load_articles_json(self, filename='articles.json'):
         """Load articles from a JSON file"""
         try:
             with open(filename, 'r', encoding='utf-8') as f:
-                self.articles = json.load(f)
+                self.articles = records.load(f)
             logger.info(f"Articles loaded from {filename}")
         except FileNotFoundError:
             logger.info(f"{filename} not found, starting with empty articles")
             self.articles = {'tech': [], 'news': []}
 
 
-def generate_html(articles, output_file=None):
-    """Generate HTML page with collected articles"""
+def generate_html(articles, output_file=None, feed_items=feeds.DEFAULT_ITEMS, site_url=None, fragment_cache=None,
+                  subtitle=None, asset_dir=None, sidebar_links=(), feed_groups=True):
+    """
+    Generate HTML page with collected articles, plus the feeds next to it (feed_items=0 skips them,
+    feed_groups=False only writes the overall feed). Cards come from fragment_cache (a
+    fragments.FragmentCache) when given, so only new or changed articles are rendered.
+    Archive and CVE pages pass a subtitle and the directory of the shared assets;
+    sidebar_links is a list of (heading, [(label, href), ...]) blocks for the sidebar.
+    """
 
     # 如果没有指定输出文件，则默认为项目根目录下的docs/index.html
     if output_file is None:
@@ -2274,263 +2262,74 @@ def generate_html(articles, output_file=None):
     import os
     os.makedirs(os.path.dirname(output_file), exist_ok=True)
 
-    # Sort articles by date (most recent first)
-    tech_sorted = sorted(articles['tech'], key=lambda x: x['date'], reverse=True)
-    news_sorted = sorted(articles['news'], key=lambda x: x['date'], reverse=True)
+    # Sort articles by date (most recent first); plain articles.json dicts are accepted too
+    tech_sorted = sorted(map(records.Article.coerce, articles['tech']), key=lambda x: x.date, reverse=True)
+    news_sorted = sorted(map(records.Article.coerce, articles['news']), key=lambda x: x.date, reverse=True)
+
+    # Cards are assembled from cached fragments; only new or changed articles are formatted
+    if fragment_cache is None:
+        fragment_cache = fragments.FragmentCache()
+    fragment_cache.begin()
+    tech_cards = "".join(map(fragment_cache.card, tech_sorted))
+    news_cards = "".join(map(fragment_cache.card, news_sorted))
+    fragment_cache.finish()
 
-    # Function to truncate description if too long
-    def truncate_description(desc, max_length=500):
-        if not desc:
-            return desc
-        if len(desc) > max_length:
-            return desc[:max_length] + "..."
-        return desc
+    # The newest article date stands in for the update time, so an unchanged page keeps
+    # its bytes (and its precompressed siblings) from one run to the next
+    updated = records.format_date(max((sorted_articles[0].date for sorted_articles in (tech_sorted, news_sorted) if sorted_articles),
+                                      default=records.UNKNOWN_DATE))
 
     # Get all unique dates for the filter dropdown
-    all_dates = set()
-    for article in articles['tech'] + articles['news']:
-        all_dates.add(article['date'])
-    sorted_dates = sorted(list(all_dates), reverse=True)
+    all_dates = {}
+    for article in tech_sorted + news_sorted:
+        all_dates.setdefault(article.date_text, article.date)
+    sorted_dates = sorted(all_dates, key=lambda text: (all_dates[text], text), reverse=True)
+
+    # Articles per topic tag for the tag filter
+    tag_counts = Counter(tag for article in tech_sorted + news_sorted for tag in article.tags)
+
+    # Stylesheet and script live in hashed files next to the page, so they stay cached across updates
+    page_dir = os.path.dirname(output_file)
+    asset_dir = asset_dir or page_dir
+    page_assets = {kind: os.path.relpath(os.path.join(asset_dir, path), page_dir).replace(os.sep, '/')
+                   for kind, path in assets.write_assets(asset_dir).items()}
+
+    sidebar_nav = ''.join(f"""
+            <div style="margin-top: 1.5rem;">
+                <h4>{html.escape(heading)}</h4>
+                {''.join(f'<p><a href="{href}">{html.escape(label)}</a></p>' for label, href in links)}
+            </div>""" for heading, links in sidebar_links if links)
 
     html_content = f"""<!DOCTYPE html>
 <html lang="zh-CN">
 <head>
     <meta charset="UTF-8">
     <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>网络安全资讯聚合 - Cybersecurity News Aggregator</title>
-    <style>
-        * {{
-            margin: 0;
-            padding: 0;
-            box-sizing: border-box;
-        }}
-
-        body {{
-            font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif;
-            line-height: 1.6;
-            color: #333;
-            background-color: #f8f9fa;
-        }}
-
-        .container {{
-            max-width: 1400px;
-            margin: 0 auto;
-            padding: 20px;
-            display: grid;
-            grid-template-columns: 1fr 300px;
-            gap: 20px;
-        }}
-
-        .main-content {{
-            grid-column: 1;
-        }}
-
-        .sidebar {{
-            grid-column: 2;
-            background: white;
-            padding: 1.5rem;
-            border-radius: 8px;
-            box-shadow: 0 2px 8px rgba(0,0,0,0.1);
-            align-self: start;
-            position: sticky;
-            top: 20px;
-        }}
-
-        header {{
-            background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-            color: white;
-            text-align: center;
-            padding: 2rem 0;
-            margin-bottom: 2rem;
-            border-radius: 8px;
-            box-shadow: 0 4px 6px rgba(0,0,0,0.1);
-        }}
-
-        h1 {{
-            font-size: 2.5rem;
-            margin-bottom: 0.5rem;
-        }}
-
-        .subtitle {{
-            font-size: 1.1rem;
-            opacity: 0.9;
-        }}
-
-        .filters {{
-            background: white;
-            padding: 1.5rem;
-            border-radius: 8px;
-            margin-bottom: 1.5rem;
-            box-shadow: 0 2px 4px rgba(0,0,0,0.1);
-        }}
-
-        .filter-group {{
-            margin-bottom: 1rem;
-        }}
-
-        .filter-group label {{
-            display: block;
-            margin-bottom: 0.5rem;
-            font-weight: bold;
-            color: #495057;
-        }}
-
-        .filter-group select, .filter-group input {{
-            width: 100%;
-            padding: 0.5rem;
-            border: 1px solid #ddd;
-            border-radius: 4px;
-            font-size: 0.9rem;
-        }}
-
-        .stats {{
-            background: white;
-            padding: 1rem;
-            border-radius: 8px;
-            text-align: center;
-            margin-bottom: 2rem;
-            box-shadow: 0 2px 4px rgba(0,0,0,0.1);
-        }}
-
-        .category-section {{
-            margin-bottom: 3rem;
-        }}
-
-        .section-title {{
-            font-size: 1.8rem;
-            color: #495057;
-            margin-bottom: 1.5rem;
-            padding-bottom: 0.5rem;
-            border-bottom: 2px solid #dee2e6;
-        }}
-
-        .articles-grid {{
-            display: grid;
-            grid-template-columns: repeat(auto-fill, minmax(350px, 1fr));
-            gap: 1.5rem;
-        }}
-
-        .article-card {{
-            background: white;
-            border-radius: 8px;
-            padding: 1.5rem;
-            box-shadow: 0 2px 8px rgba(0,0,0,0.1);
-            transition: transform 0.2s, box-shadow 0.2s;
-            height: 100%;
-            display: flex;
-            flex-direction: column;
-        }}
-
-        .article-card[data-date] {{
-            /* Add data attribute for filtering */
-        }}
-
-        .article-card:hover {{
-            transform: translateY(-5px);
-            box-shadow: 0 4px 12px rgba(0,0,0,0.15);
-        }}
-
-        .article-source {{
-            font-size: 0.85rem;
-            color: #6c757d;
-            margin-bottom: 0.5rem;
-        }}
-
-        .article-title {{
-            font-size: 1.1rem;
-            margin-bottom: 0.75rem;
-            color: #212529;
-        }}
-
-        .article-title a {{
-            color: #007bff;
-            text-decoration: none;
-        }}
-
-        .article-title a:hover {{
-            color: #0056b3;
-            text-decoration: underline;
-        }}
-
-        .article-description {{
-            color: #495057;
-            font-size: 0.95rem;
-            margin-bottom: 1rem;
-            flex-grow: 1;
-        }}
-
-        .article-date {{
-            font-size: 0.85rem;
-            color: #6c757d;
-        }}
-
-        .footer {{
-            grid-column: 1 / -1;
-            text-align: center;
-            padding: 2rem 0;
-            color: #6c757d;
-            font-size: 0.9rem;
-            margin-top: 3rem;
-            border-top: 1px solid #dee2e6;
-        }}
-
-        @media (max-width: 1100px) {{
-            .container {{
-                grid-template-columns: 1fr;
-            }}
-
-            .sidebar {{
-                grid-column: 1;
-                position: static;
-            }}
-        }}
-
-        @media (max-width: 768px) {{
-            .container {{
-                padding: 10px;
-            }}
-
-            h1 {{
-                font-size: 2rem;
-            }}
-
-            .articles-grid {{
-                grid-template-columns: 1fr;
-            }}
-        }}
-    </style>
+    <title>网络安全资讯聚合 - {html.escape(subtitle) if subtitle else 'Cybersecurity News Aggregator'}</title>
+    {f'''<link rel="alternate" type="application/atom+xml" title="网络安全资讯聚合 (Atom)" href="feeds/all/atom.xml">
+    <link rel="alternate" type="application/rss+xml" title="网络安全资讯聚合 (RSS)" href="feeds/all/rss.xml">
+    <link rel="alternate" type="application/feed+json" title="网络安全资讯聚合 (JSON Feed)" href="feeds/all/feed.json">''' if feed_items else ''}
+    <link rel="stylesheet" href="{page_assets['css']}">
 </head>
 <body>
     <div class="container">
         <header>
             <h1>网络安全资讯聚合</h1>
-            <div class="subtitle">Cybersecurity News Aggregator - 汇聚最新网络安全资讯</div>
+            <div class="subtitle">{html.escape(subtitle) if subtitle else 'Cybersecurity News Aggregator - 汇聚最新网络安全资讯'}</div>
         </header>
 
         <main class="main-content">
             <div class="category-section">
                 <h2 class="section-title">🎯 技术文章 (Technical Articles)</h2>
                 <div class="articles-grid" id="tech-articles">
-                    {"".join([f'''
-                    <div class="article-card" data-date="{article['date']}">
-                        <div class="article-source">来源: {article['source']}</div>
-                        <h3 class="article-title"><a href="{article['url']}" target="_blank">{html.escape(article['title'])}</a></h3>
-                        {f'<p class="article-description">{html.escape(truncate_description(article["description"]))}</p>' if article["description"] else ''}
-                        <div class="article-date">发布日期: {article['date']}</div>
-                    </div>''' for article in tech_sorted])}
+                    {tech_cards}
                 </div>
             </div>
 
             <div class="category-section">
                 <h2 class="section-title">📰 安全新闻 (Security News)</h2>
                 <div class="articles-grid" id="news-articles">
-                    {"".join([f'''
-                    <div class="article-card" data-date="{article['date']}">
-                        <div class="article-source">来源: {article['source']}</div>
-                        <h3 class="article-title"><a href="{article['url']}" target="_blank">{html.escape(article['title'])}</a></h3>
-                        {f'<p class="article-description">{html.escape(truncate_description(article["description"]))}</p>' if article["description"] else ''}
-                        <div class="article-date">发布日期: {article['date']}</div>
-                    </div>''' for article in news_sorted])}
+                    {news_cards}
                 </div>
             </div>
         </main>
@@ -2540,7 +2339,7 @@ def generate_html(articles, output_file=None):
             <div class="filters">
                 <div class="filter-group">
                     <label for="date-filter">📅 按日期筛选:</label>
-                    <select id="date-filter" onchange="filterByDate()">
+                    <select id="date-filter" onchange="applyFilters()">
                         <option value="">全部日期</option>
                         {''.join([f'<option value="{date}">{date}</option>' for date in sorted_dates])}
                     </select>
@@ -2548,14 +2347,22 @@ def generate_html(articles, output_file=None):
 
                 <div class="filter-group">
                     <label for="source-filter">🏢 按来源筛选:</label>
-                    <select id="source-filter" onchange="filterBySource()">
+                    <select id="source-filter" onchange="applyFilters()">
                         <option value="">全部来源</option>
                     </select>
                 </div>
 
+                <div class="filter-group">
+                    <label for="tag-filter">🏷️ 按主题筛选:</label>
+                    <select id="tag-filter" onchange="applyFilters()">
+                        <option value="">全部主题</option>
+                        {''.join(f'<option value="{tag}">{label}（{tag_counts[tag]}）</option>' for tag, label in classify.TAGS.items() if tag_counts.get(tag))}
+                    </select>
+                </div>
+
                 <div class="filter-group">
                     <label for="search-input">🔍 搜索关键词:</label>
-                    <input type="text" id="search-input" placeholder="输入关键词搜索..." onkeyup="filterBySearch()">
+                    <input type="text" id="search-input" placeholder="输入关键词搜索..." onkeyup="applyFilters()">
                 </div>
 
                 <button onclick="clearAllFilters()" style="margin-top: 10px; padding: 8px 16px; background: #6c757d; color: white; border: none; border-radius: 4px; cursor: pointer;">清除筛选</button>
@@ -2566,210 +2373,490 @@ def generate_html(articles, output_file=None):
                 <p>总文章数: {len(tech_sorted) + len(news_sorted)}</p>
                 <p>技术文章: {len(tech_sorted)}</p>
                 <p>安全新闻: {len(news_sorted)}</p>
-                <p>更新日期: {datetime.now().strftime('%Y-%m-%d')}</p>
-            </div>
+                <p>更新日期: {updated}</p>
+            </div>{sidebar_nav}
         </aside>
 
         <div class="footer">
             <p>© 2026 <a href="https://github.com/secnotes">SecNotes</a> | <a href="https://github.com/secnotes/secnews">站点源码</a></p>
-            <p>安全资讯聚合平台 | 更新时间: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}</p>
+            <p>安全资讯聚合平台 | 更新日期: {updated}</p>
             <p>数据来源: Sec-Today, 先知社区, Project Zero, Seebug Paper, 腾讯安全, 安全客, 安全内参, SecurityWeek, The Hacker News, 看雪</p>
             <p>如有侵权，请联系删除</p>
         </div>
     </div>
 
-    <script>
-        // Initialize sources filter
-        window.onload = function() {{
-            const sources = new Set();
-            document.querySelectorAll('.article-card').forEach(card => {{
-                const source = card.querySelector('.article-source').textContent.replace('来源: ', '');
-                sources.add(source);
-            }});
-
-            const sourceFilter = document.getElementById('source-filter');
-            Array.from(sources).sort().forEach(source => {{
-                const option = document.createElement('option');
-                option.value = source;
-                option.textContent = source;
-                sourceFilter.appendChild(option);
-            }});
-
-            // Initialize with all articles shown
-            updateArticleCounts();
-        }};
-
-        function filterByDate() {{
-            const dateFilter = document.getElementById('date-filter').value;
-            const techCards = document.querySelectorAll('#tech-articles .article-card');
-            const newsCards = document.querySelectorAll('#news-articles .article-card');
-            let visibleCount = 0;
-
-            // Show/hide tech articles
-            techCards.forEach(card => {{
-                const cardDate = card.getAttribute('data-date');
-                if (dateFilter === '' || cardDate === dateFilter) {{
-                    card.style.display = 'flex';
-                    visibleCount++;
-                }} else {{
-                    card.style.display = 'none';
-                }}
-            }});
-
-            // Show/hide news articles
-            newsCards.forEach(card => {{
-                const cardDate = card.getAttribute('data-date');
-                if (dateFilter === '' || cardDate === dateFilter) {{
-                    card.style.display = 'flex';
-                    visibleCount++;
-                }} else {{
-                    card.style.display = 'none';
-                }}
-            }});
-
-            updateArticleCounts();
-        }}
-
-        function filterBySource() {{
-            const sourceFilter = document.getElementById('source-filter').value;
-            const techCards = document.querySelectorAll('#tech-articles .article-card');
-            const newsCards = document.querySelectorAll('#news-articles .article-card');
-            let visibleCount = 0;
-
-            // Show/hide tech articles
-            techCards.forEach(card => {{
-                const cardSource = card.querySelector('.article-source').textContent.replace('来源: ', '');
-                if (sourceFilter === '' || cardSource === sourceFilter) {{
-                    if (isVisibleByDateFilter(card)) {{
-                        card.style.display = 'flex';
-                        visibleCount++;
-                    }}
-                }} else {{
-                    card.style.display = 'none';
-                }}
-            }});
-
-            // Show/hide news articles
-            newsCards.forEach(card => {{
-                const cardSource = card.querySelector('.article-source').textContent.replace('来源: ', '');
-                if (sourceFilter === '' || cardSource === sourceFilter) {{
-                    if (isVisibleByDateFilter(card)) {{
-                        card.style.display = 'flex';
-                        visibleCount++;
-                    }}
-                }} else {{
-                    card.style.display = 'none';
-                }}
-            }});
-
-            updateArticleCounts();
-        }}
-
-        function filterBySearch() {{
-            const searchTerm = document.getElementById('search-input').value.toLowerCase();
-            const techCards = document.querySelectorAll('#tech-articles .article-card');
-            const newsCards = document.querySelectorAll('#news-articles .article-card');
-            let visibleCount = 0;
-
-            // Show/hide tech articles
-            techCards.forEach(card => {{
-                const title = card.querySelector('.article-title').textContent.toLowerCase();
-                const description = card.querySelector('.article-description') ?
-                    card.querySelector('.article-description').textContent.toLowerCase() : '';
-                const source = card.querySelector('.article-source').textContent.toLowerCase();
-
-                const matches = title.includes(searchTerm) ||
-                               description.includes(searchTerm) ||
-                               source.includes(searchTerm);
-
-                if (matches && isVisibleByDateFilter(card) && isVisibleBySourceFilter(card)) {{
-                    card.style.display = 'flex';
-                    visibleCount++;
-                }} else {{
-                    card.style.display = 'none';
-                }}
-            }});
-
-            // Show/hide news articles
-            newsCards.forEach(card => {{
-                const title = card.querySelector('.article-title').textContent.toLowerCase();
-                const description = card.querySelector('.article-description') ?
-                    card.querySelector('.article-description').textContent.toLowerCase() : '';
-                const source = card.querySelector('.article-source').textContent.toLowerCase();
-
-                const matches = title.includes(searchTerm) ||
-                               description.includes(searchTerm) ||
-                               source.includes(searchTerm);
-
-                if (matches && isVisibleByDateFilter(card) && isVisibleBySourceFilter(card)) {{
-                    card.style.display = 'flex';
-                    visibleCount++;
-                }} else {{
-                    card.style.display = 'none';
-                }}
-            }});
-
-            updateArticleCounts();
-        }}
-
-        function isVisibleByDateFilter(card) {{
-            const dateFilter = document.getElementById('date-filter').value;
-            const cardDate = card.getAttribute('data-date');
-            return dateFilter === '' || cardDate === dateFilter;
-        }}
-
-        function isVisibleBySourceFilter(card) {{
-            const sourceFilter = document.getElementById('source-filter').value;
-            const cardSource = card.querySelector('.article-source').textContent.replace('来源: ', '');
-            return sourceFilter === '' || cardSource === sourceFilter;
-        }}
-
-        function clearAllFilters() {{
-            document.getElementById('date-filter').value = '';
-            document.getElementById('source-filter').value = '';
-            document.getElementById('search-input').value = '';
-
-            // Reset all cards to visible
-            document.querySelectorAll('.article-card').forEach(card => {{
-                card.style.display = 'flex';
-            }});
-
-            updateArticleCounts();
-        }}
-
-        function updateArticleCounts() {{
-            const visibleCards = document.querySelectorAll('.article-card[style*="display: flex"]').length;
-            const totalCount = document.querySelectorAll('.article-card').length;
-
-            // Update stats or provide some visual feedback about filtered results
-            console.log(`Showing ${{visibleCards}} of ${{totalCount}} articles`);
-        }}
-    </script>
+    <script src="{page_assets['js']}"></script>
 </body>
 </html>"""
 
-    with open(output_file, 'w', encoding='utf-8') as f:
+    # Replaced (and precompressed) only when the page changed
+    with artifacts.open_text(output_file) as f:
         f.write(html_content)
 
     logger.info(f"HTML page generated: {output_file}")
 
+    if feed_items:
+        feeds.write_feeds({'tech': tech_sorted, 'news': news_sorted}, os.path.join(os.path.dirname(output_file), 'feeds'),
+                          limit=feed_items, site_url=site_url, groups=feed_groups,
+                          title=f"{feeds.FEED_TITLE} - {subtitle}" if subtitle else feeds.FEED_TITLE)
+
+
+def archive_page(docs_dir, month):
+    """Path of the static page of one archived month"""
+    return os.path.join(docs_dir, 'archive', month, 'index.html')
+
+
+def entity_page(docs_dir, cve):
+    """Path of the static page of one CVE"""
+    return os.path.join(docs_dir, 'cve', cve, 'index.html')
+
+
+# CVEs of the current articles listed in the page's sidebar
+SIDEBAR_CVES = 20
+
+
+def render_entity_pages(docs_dir, search_index_path, feed_items=feeds.DEFAULT_ITEMS, site_url=None, changed=()):
+    """
+    Render a page and a feed per CVE from the entity index, for the CVEs in changed (entity
+    keys whose articles changed) and those without a page yet. Returns the CVEs that have a page.
+    """
+    if not search_index_path or not os.path.exists(search_index_path):
+        return set()
+    changed = set(changed)
+    rendered = 0
+    with search.SearchIndex(search_index_path) as index:
+        cves = {entity.partition(':')[2] for entity in index.entity_counts('cve')}
+        for cve in cves:
+            page = entity_page(docs_dir, cve)
+            if f"cve:{cve}" not in changed and os.path.exists(page):
+                continue
+            generate_html(archive.by_category(index.entity_articles(f"cve:{cve}")), page, feed_items=feed_items,
+                          site_url=f"{(site_url or feeds.default_site_url()).rstrip('/')}/cve/{cve}/",
+                          subtitle=f"{cve} 相关文章", asset_dir=docs_dir, feed_groups=False,
+                          sidebar_links=[('导航', [('最新资讯', '../../index.html')])])
+            rendered += 1
+    if rendered:
+        logger.info(f"CVE pages: {rendered} rendered, {len(cves)} in total")
+    return cves
+
+
+def render_site(articles, output_file, feed_items=feeds.DEFAULT_ITEMS, site_url=None, fragment_cache=None,
+                article_archive=None, archive_months=(), search_index_path=None, changed_entities=()):
+    """
+    Render the page and, with an archive, the pages and feeds of the months in archive_months
+    (the partitions that just changed) plus those whose page is missing. Other archive pages
+    are left as they are. With a search index, CVE pages are rendered the same way for the
+    entities in changed_entities, and the sidebar links the CVEs of the current articles.
+    """
+    docs_dir = os.path.dirname(output_file)
+    # Month and CVE feeds link below the site's address, so resolve the default once here
+    site_url = (site_url or feeds.default_site_url()).rstrip('/')
+    sidebar_links = []
+    cves = render_entity_pages(docs_dir, search_index_path, feed_items=feed_items, site_url=site_url,
+                               changed=changed_entities)
+    if cves:
+        mentions = {}
+        for category in records.CATEGORIES:
+            for article in articles.get(category, []):
+                for entity in entities.extract_article(records.Article.coerce(article))[0]:
+                    if entity.startswith('cve:') and entity[4:] in cves:
+                        mentions[entity[4:]] = mentions.get(entity[4:], 0) + 1
+        top = sorted(mentions.items(), key=lambda item: (item[1], item[0]), reverse=True)[:SIDEBAR_CVES]
+        sidebar_links.append(('相关漏洞', [(f"{cve}（{count} 篇）", f"cve/{cve}/index.html") for cve, count in top]))
+    if article_archive is not None:
+        counts = article_archive.counts()
+        months = article_archive.months()
+        changed = set(archive_months)
+        # A month whose last article moved to another month has no partition left
+        for month in changed.difference(months):
+            shutil.rmtree(os.path.dirname(archive_page(docs_dir, month)), ignore_errors=True)
+        for month in months:
+            page = archive_page(docs_dir, month)
+            if month not in changed and os.path.exists(page):
+                continue
+            # Archive pages get their own in-memory card cache, the page's cache only holds the current window
+            generate_html(archive.by_category(article_archive.load(month)), page, feed_items=feed_items,
+                          site_url=f"{site_url}/archive/{month}/",
+                          subtitle=f"{month} 归档", asset_dir=docs_dir,
+                          sidebar_links=[('导航', [('最新资讯', '../../index.html')])])
+        sidebar_links.append(('历史归档', [(f"{month}（{counts.get(month, 0)} 篇）", f"archive/{month}/index.html")
+                                       for month in months]))
+    generate_html(articles, output_file, feed_items=feed_items, site_url=site_url, fragment_cache=fragment_cache,
+                  sidebar_links=sidebar_links)
+
+
+def _archive_from_args(args):
+    if not args.archive_dir:
+        return None
+    # render's --days is optional and enrich has none; the store's window defaults to 30 days
+    return archive.Archive(args.archive_dir, window_days=getattr(args, 'days', None) or archive.DEFAULT_WINDOW_DAYS)
+
+
+def _update_search_index(args, articles, article_archive):
+    """Index the articles; returns the entities whose articles changed"""
+    if args.search_index:
+        return search.update(args.search_index, articles, article_archive)
+    return set()
+
+
+def _source_list(value):
+    return [key.strip() for key in value.split(',') if key.strip()]
+
+
+def _configure_http_from_args(args):
+    # --budget falls back to SECNEWS_BUDGET; the clock starts here
+    budget = args.budget if args.budget is not None else os.environ.get('SECNEWS_BUDGET')
+    set_deadline(float(budget) if budget else None)
+    # --http-mode/--fixtures fall back to SECNEWS_HTTP_MODE/SECNEWS_FIXTURES
+    configure_http(args.http_mode or os.environ.get('SECNEWS_HTTP_MODE') or None,
+                   args.fixtures or os.environ.get('SECNEWS_FIXTURES'))
+    # --proxies falls back to SECNEWS_PROXY_FILE/SECNEWS_PROXIES
+    configure_proxies(args.proxies)
+    # --parse-workers falls back to SECNEWS_PARSE_WORKERS
+    extract.configure(args.parse_workers if args.parse_workers is not None else int(os.environ.get('SECNEWS_PARSE_WORKERS') or 0))
+    # --fetch-backend falls back to SECNEWS_FETCH_BACKEND
+    configure_fetch_backend(args.fetch_backend or os.environ.get('SECNEWS_FETCH_BACKEND'))
+
+
+def cmd_scrape(args):
+    """Scrape the selected sources, save the store and render the page"""
+    _configure_http_from_args(args)
 
-def main():
     aggregator = SecurityNewsAggregator()
+    aggregator.enrich_details = not args.no_enrich
+    if args.profile:
+        import profiling
+        profile_dir = args.profile_dir or os.path.join(PROJECT_ROOT, 'profiles', datetime.now().strftime('%Y%m%d-%H%M%S'))
+        aggregator.profiler = profiling.StageProfiler(profile_dir, top=args.profile_top)
+        if args.concurrency > 1:
+            # cProfile cannot run in several scraper threads at once
+            logger.warning("--profile scrapes the sources one at a time, ignoring --concurrency")
+            args.concurrency = 1
+
+    stored = SecurityNewsAggregator()
+    stored.load_articles_json(args.store)
+
+    sources = args.sources
+    if sources is not None:
+        # Re-scraping a subset keeps the stored articles of every other source
+        names = {spec.name for spec in registry.all_sources() if spec.key in sources}
+        aggregator.keep_stored_articles(stored.articles, exclude_sources=names)
+
+    if args.breaker_threshold > 0 and _http_mode != 'replay':
+        # Replayed runs say nothing about the live sites, so they leave the breakers alone
+        aggregator.breakers = resilience.CircuitBreakerStore(args.state, threshold=args.breaker_threshold).load()
 
-    # Scrape all sources
-    aggregator.scrape_all_sources()
+    try:
+        aggregator.scrape_all_sources(sources, concurrency=args.concurrency, stored=stored.articles,
+                                      due_only=args.due_only)
+    finally:
+        # A recording is flushed even when the scrape fails
+        finish_http()
+    finish_proxies()
+    if aggregator.breakers is not None:
+        aggregator.breakers.save()
+
+    # Month partitions keep what the store's window drops, so they get every article before the cut;
+    # only this run's months are rewritten
+    article_archive = _archive_from_args(args)
+    archive_months = article_archive.update(aggregator.articles) if article_archive is not None else []
+    changed_entities = _update_search_index(args, aggregator.articles, article_archive)
+    aggregator.keep_window(days=args.days)
 
     # Save raw data
-    aggregator.save_articles_json()
+    aggregator.save_articles_json(args.store)
 
     # Generate HTML page (this will go to project root docs directory)
-    generate_html(aggregator.articles)
+    if not args.no_render:
+        with aggregator.metrics.stage('render'), aggregator.profile_stage('render'):
+            render_site(aggregator.articles, args.output, feed_items=args.feed_items, site_url=args.site_url,
+                        fragment_cache=fragments.FragmentCache.open(args.render_cache),
+                        article_archive=article_archive, archive_months=archive_months,
+                        search_index_path=args.search_index, changed_entities=changed_entities)
+
+    # Per-source run report, plus Prometheus text when requested
+    aggregator.save_run_report(args.report, prometheus_file=args.prometheus or os.environ.get('SECNEWS_PROMETHEUS'))
 
     print(f"\n完成！共收集到:")
     print(f"- 技术文章: {len(aggregator.articles['tech'])} 篇")
     print(f"- 新闻: {len(aggregator.articles['news'])} 篇")
-    print(f"已生成 docs/index.html 文件")
+    if not args.no_render:
+        print(f"已生成 {args.output} 文件")
+
+    if aggregator.profiler is not None:
+        aggregator.profiler.write_summary()
+        print(f"性能分析结果: {aggregator.profiler.output_dir}")
+
+
+def _scheduler_from_args(args):
+    _configure_http_from_args(args)
+    import scheduler
+    budget = args.budget if args.budget is not None else os.environ.get('SECNEWS_BUDGET')
+    return scheduler.Scheduler(
+        args.store, args.output, args.report, args.schedule_state,
+        breaker_state_path=args.state if _http_mode != 'replay' else None,
+        breaker_threshold=args.breaker_threshold, days=args.days, concurrency=args.concurrency,
+        budget=float(budget) if budget else None, render=not args.no_render,
+        feed_items=args.feed_items, site_url=args.site_url, render_cache_path=args.render_cache,
+        archive_dir=args.archive_dir, search_index_path=args.search_index, runtime=sys.modules[__name__])
+
+
+def cmd_schedule(args):
+    """Keep polling every source at its learned cadence, re-rendering when new items arrive"""
+    source_scheduler = _scheduler_from_args(args)
+    try:
+        source_scheduler.run(once=args.once)
+    except KeyboardInterrupt:
+        logger.info("Scheduler stopped")
+
+
+def cmd_serve(args):
+    """Run the scheduler as a long-lived service with a local control and metrics endpoint"""
+    import service
+    source_service = service.Service(_scheduler_from_args(args), host=args.host, port=args.port)
+    try:
+        source_service.serve()
+    except KeyboardInterrupt:
+        logger.info("Service stopped")
+
+
+def cmd_render(args):
+    """
+    Re-render the page from the stored articles without touching the network. The stored
+    articles are filed into the archive first; only the archive and CVE pages they changed
+    (or that are missing) are rebuilt, unless --full asks for every one of them.
+    """
+    aggregator = SecurityNewsAggregator()
+    aggregator.load_articles_json(args.store)
+    # Stores written before the classifier existed get their tags here
+    aggregator.classify_articles()
+    article_archive = _archive_from_args(args)
+    archive_months = article_archive.update(aggregator.articles) if article_archive is not None else []
+    changed_entities = _update_search_index(args, aggregator.articles, article_archive)
+    if args.full:
+        # After a template change every page has to pick up the new layout
+        archive_months = article_archive.months() if article_archive is not None else []
+        if args.search_index:
+            with search.SearchIndex(args.search_index) as index:
+                changed_entities = set(index.entity_counts('cve'))
+    if args.days is not None:
+        aggregator.filter_recent_articles(days=args.days)
+    render_site(aggregator.articles, args.output, feed_items=args.feed_items, site_url=args.site_url,
+                fragment_cache=fragments.FragmentCache.open(args.render_cache),
+                article_archive=article_archive, archive_months=archive_months,
+                search_index_path=args.search_index, changed_entities=changed_entities)
+    print(f"已生成 {args.output} 文件")
+
+
+def cmd_enrich(args):
+    """Fill in detail-page descriptions for stored articles scraped with --no-enrich"""
+    _configure_http_from_args(args)
+    aggregator = SecurityNewsAggregator()
+    aggregator.load_articles_json(args.store)
+    try:
+        enriched = aggregator.enrich_articles(concurrency=args.concurrency)
+    finally:
+        finish_http()
+    # Fetched descriptions can change an article's tags and category
+    aggregator.classify_articles()
+    finish_proxies()
+    aggregator.save_articles_json(args.store)
+    article_archive = _archive_from_args(args)
+    archive_months = article_archive.update(aggregator.articles) if article_archive is not None else []
+    changed_entities = _update_search_index(args, aggregator.articles, article_archive)
+    if not args.no_render:
+        render_site(aggregator.articles, args.output, feed_items=args.feed_items, site_url=args.site_url,
+                    fragment_cache=fragments.FragmentCache.open(args.render_cache),
+                    article_archive=article_archive, archive_months=archive_months,
+                    search_index_path=args.search_index, changed_entities=changed_entities)
+    print(f"已补全 {enriched} 篇文章的详情")
+
+
+def cmd_search(args):
+    """Query the full-text index, or look up the articles of an entity"""
+    if not os.path.exists(args.search_index):
+        print(f"索引 {args.search_index} 不存在，请先运行 scrape 或 render")
+        return
+    if not args.query and not args.entity and not args.entities:
+        print("请提供查询词、--entity 或 --entities")
+        return
+    since = args.since
+    if since is None and args.days is not None:
+        since = records.date_value(datetime.now() - timedelta(days=args.days))
+    with search.SearchIndex(args.search_index) as index:
+        if args.entities:
+            counts = index.entity_counts(args.entities)
+            for entity, count in sorted(counts.items(), key=lambda item: (-item[1], item[0]))[:args.limit]:
+                print(f"{count:6d}  {entity}")
+            return
+        if args.entity:
+            # Entity lookups come straight from the entity index, newest first and without a score
+            hits = [(None, article) for article in index.entity_articles(entities.canonical(args.entity))
+                    if (since is None or article.date >= since)
+                    and (args.category is None or article.category == args.category)
+                    and (args.source is None or article.source == args.source)][:args.limit]
+        else:
+            hits = index.search(' '.join(args.query), limit=args.limit, since=since, category=args.category, source=args.source)
+    if args.format == 'json':
+        print(json.dumps([dict(article.to_dict(), **({'score': round(score, 3)} if score is not None else {}))
+                          for score, article in hits], ensure_ascii=False, indent=2))
+        return
+    for score, article in hits:
+        print(f"{article.date_text or '----------'}  {'' if score is None else f'{score:6.2f}':>6}  [{article.source}] {article.title}")
+        print(f"            {article.url}")
+    print(f"共 {len(hits)} 条结果")
+
+
+def cmd_report(args):
+    """Print the run report of the last scrape"""
+    with open(args.report, 'r', encoding='utf-8') as f:
+        report = json.load(f)
+    if args.format == 'json':
+        print(json.dumps(report, ensure_ascii=False, indent=2))
+    elif args.format == 'prometheus':
+        print(metrics.RunMetrics.from_dict(report).to_prometheus(), end='')
+    else:
+        print(metrics.format_report(report))
+
+
+def cmd_bench(args):
+    """Run the benchmark harness"""
+    import bench
+    bench.main(args.bench_args)
+
+
+COMMANDS = ('scrape', 'schedule', 'serve', 'render', 'enrich', 'search', 'bench', 'report')
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description='Security news aggregator')
+    subparsers = parser.add_subparsers(dest='command')
+
+    def add_paths(subparser, report=False):
+        subparser.add_argument('--store', type=os.path.abspath, default=DEFAULT_STORE_PATH, help='article store (default: src/articles.json)')
+        subparser.add_argument('--output', type=os.path.abspath, default=DEFAULT_OUTPUT_PATH, help='generated page (default: docs/index.html)')
+        if report:
+            subparser.add_argument('--report', type=os.path.abspath, default=DEFAULT_REPORT_PATH, help='run report (default: src/run_report.json)')
+        subparser.add_argument('--feed-items', type=int, default=int(os.environ.get('SECNEWS_FEED_ITEMS') or feeds.DEFAULT_ITEMS),
+                               help=f"items per Atom/RSS/JSON feed written to docs/feeds/ (default: {feeds.DEFAULT_ITEMS}, 0 disables the feeds)")
+        subparser.add_argument('--site-url', default=os.environ.get('SECNEWS_SITE_URL'),
+                               help='public URL of docs/ for the absolute links in the feeds (default: the GitHub Pages URL of '
+                                    'the repository in GITHUB_REPOSITORY, else https://secnotes.github.io/secnews/)')
+        subparser.add_argument('--render-cache', type=os.path.abspath, default=DEFAULT_RENDER_CACHE_PATH,
+                               help='rendered article cards reused by the next render (default: src/render_cache.json)')
+        subparser.add_argument('--archive-dir', default=os.environ.get('SECNEWS_ARCHIVE_DIR', DEFAULT_ARCHIVE_DIR),
+                               type=lambda value: os.path.abspath(value) if value else '',
+                               help='month partitions data/YYYY-MM.jsonl with a page each under docs/archive/ (default: data/, empty disables the archive)')
+        subparser.add_argument('--search-index', default=os.environ.get('SECNEWS_SEARCH_INDEX', DEFAULT_SEARCH_INDEX_PATH),
+                               type=lambda value: os.path.abspath(value) if value else '',
+                               help='full-text index updated with every stored article (default: src/search_index.sqlite, empty disables it)')
+
+    def add_network(subparser):
+        subparser.add_argument('--concurrency', type=int, default=1, help='sources (or detail pages) fetched in parallel')
+        subparser.add_argument('--http-mode', choices=('record', 'replay'), help='record or replay HTTP fixtures')
+        subparser.add_argument('--fixtures', help='fixture archive (default: fixtures/http_fixtures.zip)')
+        subparser.add_argument('--no-render', action='store_true', help='only update the store, do not render')
+        subparser.add_argument('--proxies', help='file with one proxy URL per line, tried when direct routing fails')
+        subparser.add_argument('--budget', type=float,
+                               help='time budget in seconds; the run stops fetching and renders what it has when it runs out')
+        subparser.add_argument('--parse-workers', type=int,
+                               help='processes that parse the large pages (SecurityWeek, THN details, XZ); default parses in the fetching thread')
+        subparser.add_argument('--fetch-backend', choices=FETCH_BACKENDS,
+                               help='fetch detail pages one by one with requests (default) or all at once with asyncio (needs aiohttp)')
+
+    scrape = subparsers.add_parser('scrape', help='scrape sources, save the store and render (default)')
+    scrape.add_argument('--sources', type=_source_list,
+                        help=f"comma-separated source keys ({','.join(registry.keys())}); "
+                             "other sources keep their stored articles")
+    scrape.add_argument('--days', type=int, default=30, help='keep articles published within this many days')
+    scrape.add_argument('--due-only', action='store_true',
+                        help="only scrape sources whose refresh interval has passed; the others keep their stored articles")
+    scrape.add_argument('--no-enrich', action='store_true', help='skip per-article detail page fetches')
+    scrape.add_argument('--prometheus', help='also write the run report in Prometheus text format')
+    scrape.add_argument('--state', type=os.path.abspath, default=DEFAULT_STATE_PATH,
+                        help='circuit breaker state (default: src/source_state.json)')
+    scrape.add_argument('--breaker-threshold', type=int, default=3,
+                        help='failing days in a row before a source is only probed (0 disables the breakers)')
+    scrape.add_argument('--profile', action='store_true',
+                        help='profile each scraper, the dedup/filter stage and rendering with cProfile')
+    scrape.add_argument('--profile-dir', help='directory for profile files (default: profiles/<timestamp>)')
+    scrape.add_argument('--profile-top', type=int, default=30, help='rows in the aggregated hot function table')
+    add_paths(scrape, report=True)
+    add_network(scrape)
+    scrape.set_defaults(func=cmd_scrape)
+
+    def add_schedule(subparser):
+        subparser.add_argument('--days', type=int, default=30, help='keep articles published within this many days')
+        subparser.add_argument('--schedule-state', type=os.path.abspath, default=DEFAULT_SCHEDULE_STATE_PATH,
+                               help='learned polling cadence (default: src/schedule_state.json)')
+        subparser.add_argument('--state', type=os.path.abspath, default=DEFAULT_STATE_PATH,
+                               help='circuit breaker state (default: src/source_state.json)')
+        subparser.add_argument('--breaker-threshold', type=int, default=3,
+                               help='failing days in a row before a source is only probed (0 disables the breakers)')
+        add_paths(subparser, report=True)
+        add_network(subparser)
+
+    schedule = subparsers.add_parser('schedule', help='poll each source at its own learned cadence')
+    schedule.add_argument('--once', action='store_true', help='poll whatever is due once and exit (for cron)')
+    add_schedule(schedule)
+    schedule.set_defaults(func=cmd_schedule)
+
+    serve = subparsers.add_parser('serve', help='long-lived scheduler with a local control and metrics endpoint')
+    serve.add_argument('--host', default='127.0.0.1', help='control endpoint address (default: 127.0.0.1)')
+    serve.add_argument('--port', type=int, default=8787, help='control endpoint port (default: 8787)')
+    add_schedule(serve)
+    serve.set_defaults(func=cmd_serve)
+
+    render = subparsers.add_parser('render', help='re-render the page from the store without scraping')
+    render.add_argument('--from', dest='source', choices=('store',), default='store', help='render input')
+    render.add_argument('--days', type=int, help='only render articles published within this many days')
+    render.add_argument('--full', action='store_true',
+                        help='rebuild every archive and CVE page, not only those whose articles changed')
+    add_paths(render)
+    render.set_defaults(func=cmd_render)
+
+    enrich = subparsers.add_parser('enrich', help='fetch detail pages for articles stored with placeholder descriptions')
+    add_paths(enrich)
+    add_network(enrich)
+    enrich.set_defaults(func=cmd_enrich)
+
+    search_parser = subparsers.add_parser('search', help='full-text search over the archive and the store')
+    search_parser.add_argument('query', nargs='*', help='words or CJK text; every term has to match')
+    search_parser.add_argument('--entity', help="articles mentioning an entity, e.g. cve:CVE-2026-1470, vendor:Ivanti, product:Exchange, cvss:critical, tag:apt")
+    search_parser.add_argument('--entities', choices=(*entities.KINDS, 'tag'),
+                               help='list the most mentioned entities (or topic tags) of one kind')
+    search_parser.add_argument('--limit', type=int, default=20, help='results to show (default: 20)')
+    search_parser.add_argument('--days', type=int, help='only articles published within this many days')
+    search_parser.add_argument('--since', type=records.parse_date, help='only articles published on or after YYYY-MM-DD')
+    search_parser.add_argument('--category', choices=records.CATEGORIES)
+    search_parser.add_argument('--source', help='only articles of this source (as shown on the page)')
+    search_parser.add_argument('--search-index', type=os.path.abspath,
+                               default=os.environ.get('SECNEWS_SEARCH_INDEX') or DEFAULT_SEARCH_INDEX_PATH,
+                               help='full-text index (default: src/search_index.sqlite)')
+    search_parser.add_argument('--format', choices=('text', 'json'), default='text')
+    search_parser.set_defaults(func=cmd_search)
+
+    bench = subparsers.add_parser('bench', help='run the benchmark harness (arguments are passed to bench.py)')
+    bench.add_argument('bench_args', nargs=argparse.REMAINDER)
+    bench.set_defaults(func=cmd_bench)
+
+    report = subparsers.add_parser('report', help='show the run report of the last scrape')
+    report.add_argument('--report', default=DEFAULT_REPORT_PATH, help='run report (default: src/run_report.json)')
+    report.add_argument('--format', choices=('table', 'json', 'prometheus'), default='table')
+    report.set_defaults(func=cmd_report)
+    return parser
+
+
+def main(argv=None):
+    argv = list(sys.argv[1:] if argv is None else argv)
+    # Without a subcommand the script keeps its original behaviour: a full scrape
+    if not argv or (argv[0] not in COMMANDS and argv[0] not in ('-h', '--help')):
+        argv.insert(0, 'scrape')
+    args = build_parser().parse_args(argv)
+    try:
+        args.func(args)
+    finally:
+        extract.shutdown()
 
 
 if __name__ == "__main__":
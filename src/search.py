@@ -0,0 +1,384 @@
+#!/usr/bin/env python3
+"""
+Full-text search over every article ever stored
+A persistent inverted index over titles and descriptions, kept in one SQLite file: each
+term maps to packed arrays of (article, term frequency) pairs, stored in chunks so adding
+articles only rewrites the last chunk of a term and a query reads a few blobs per term. Latin words are indexed whole, CJK runs as overlapping bigrams, and hits
+are ranked with BM25. Articles are added incrementally as they are ingested; unchanged
+articles are skipped. The same pass records the entities of each article (CVE and GHSA
+ids, vendors, products, CVSS severity, see entities.py) and its topic tags ('tag:apt')
+in an entity -> articles table.
+"""
+
+import array
+import hashlib
+import heapq
+import itertools
+import logging
+import math
+import re
+import sqlite3
+import unicodedata
+
+import entities
+import records
+
+logger = logging.getLogger(__name__)
+
+# BM25 parameters
+K1 = 1.2
+B = 0.75
+# A title term counts as often as this many description terms
+TITLE_WEIGHT = 2
+# Postings and per-article columns are arrays of unsigned 32-bit ints
+_TYPECODE = 'I'
+# (article, tf) pairs per postings chunk; an update rewrites at most one full chunk per term it appends to
+CHUNK_PAIRS = 1024
+
+_WORD_PATTERN = re.compile(r'[0-9a-z]+(?:[._-][0-9a-z]+)*')
+_CJK_PATTERN = re.compile('[\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uac00-\ud7af\uf900-\ufaff]+')
+_TOKEN_PATTERN = re.compile(f"{_WORD_PATTERN.pattern}|{_CJK_PATTERN.pattern}")
+_SEPARATOR_PATTERN = re.compile(r'[._-]')
+
+# Bumped whenever the tables or the entities extracted into them change; an index of another version is rebuilt
+SCHEMA_VERSION = 5
+TABLES = ('docs', 'terms', 'columns', 'stats', 'entities')
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS docs (
+    id INTEGER PRIMARY KEY,
+    url TEXT NOT NULL UNIQUE,
+    fingerprint TEXT NOT NULL,
+    date INTEGER NOT NULL,
+    date_raw TEXT,
+    category TEXT NOT NULL,
+    source TEXT NOT NULL,
+    title TEXT NOT NULL,
+    description TEXT NOT NULL,
+    cvss REAL,
+    tags TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS docs_category ON docs (category);
+CREATE INDEX IF NOT EXISTS docs_source ON docs (source);
+CREATE TABLE IF NOT EXISTS terms (
+    term TEXT NOT NULL,
+    chunk INTEGER NOT NULL,
+    postings BLOB NOT NULL,
+    PRIMARY KEY (term, chunk)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS columns (
+    name TEXT PRIMARY KEY,
+    data BLOB NOT NULL
+);
+CREATE TABLE IF NOT EXISTS stats (
+    key TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS entities (
+    entity TEXT NOT NULL,
+    doc INTEGER NOT NULL,
+    PRIMARY KEY (entity, doc)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS entities_doc ON entities (doc);
+'''
+
+
+def tokenize(text):
+    """
+    Index terms of a text: lower-cased latin words (plus the parts of words such as
+    'cve-2026-1470'), and overlapping bigrams of CJK runs ('沙箱逃逸' -> 沙箱, 箱逃, 逃逸)
+    """
+    tokens = []
+    for token in _TOKEN_PATTERN.findall(unicodedata.normalize('NFKC', text or '').lower()):
+        if token[0].isascii():
+            tokens.append(token)
+            if _SEPARATOR_PATTERN.search(token):
+                tokens.extend(part for part in _SEPARATOR_PATTERN.split(token) if part)
+        elif len(token) == 1:
+            tokens.append(token)
+        else:
+            tokens.extend(token[i:i + 2] for i in range(len(token) - 1))
+    return tokens
+
+
+# Columns of docs that make up an article, in the order _article takes them
+_ARTICLE_COLUMNS = ('title', 'url', 'source', 'description', 'date', 'category', 'tags', 'date_raw')
+
+
+def _article(row):
+    """Article of a row of _ARTICLE_COLUMNS; unparsed date text ('2小时前') comes back as it was stored"""
+    title, url, source, description, date, category, tags, date_raw = row
+    return records.Article(title, url, source, description, date if date_raw is None else date_raw, category, tags.split())
+
+
+def _fingerprint(article):
+    content = '\x1f'.join((article.title, article.description or '', article.source, article.category, article.date_text,
+                         ' '.join(article.tags)))
+    return hashlib.blake2b(content.encode('utf-8'), digest_size=16).hexdigest()
+
+
+def _term_counts(article):
+    """Weighted term frequencies and length of an article"""
+    counts = {}
+    for term in tokenize(article.title):
+        counts[term] = counts.get(term, 0) + TITLE_WEIGHT
+    for term in tokenize(article.description):
+        counts[term] = counts.get(term, 0) + 1
+    return counts, sum(counts.values())
+
+
+def _unpack(blob):
+    values = array.array(_TYPECODE)
+    if blob:
+        values.frombytes(blob)
+    return values
+
+
+class SearchIndex:
+    """Inverted index in one SQLite file; use as a context manager to commit and close"""
+
+    def __init__(self, path):
+        self.path = path
+        self.db = sqlite3.connect(path)
+        # Readers (e.g. the service) are not blocked while a scrape adds articles
+        self.db.execute('PRAGMA journal_mode=WAL')
+        if self.db.execute('PRAGMA user_version').fetchone()[0] != SCHEMA_VERSION:
+            if self.db.execute("SELECT 1 FROM sqlite_master WHERE type = 'table'").fetchone():
+                logger.info(f"Search index {path} has an older layout, rebuilding it")
+            for table in TABLES:
+                self.db.execute(f"DROP TABLE IF EXISTS {table}")
+            self.db.executescript(SCHEMA)
+            self.db.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+        # Entities whose articles were added or changed since the index was opened
+        self.touched = set()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.db.commit()
+        else:
+            self.db.rollback()
+        self.close()
+
+    def close(self):
+        self.db.close()
+
+    def _stat(self, key):
+        row = self.db.execute('SELECT value FROM stats WHERE key = ?', (key,)).fetchone()
+        return row[0] if row else 0
+
+    def _set_stat(self, key, value):
+        self.db.execute('INSERT OR REPLACE INTO stats (key, value) VALUES (?, ?)', (key, value))
+
+    def _column(self, name):
+        """Per-article values (length, date) indexed by article id"""
+        row = self.db.execute('SELECT data FROM columns WHERE name = ?', (name,)).fetchone()
+        return _unpack(row[0] if row else None)
+
+    def _set_column(self, name, values):
+        self.db.execute('INSERT OR REPLACE INTO columns (name, data) VALUES (?, ?)', (name, values.tobytes()))
+
+    def postings(self, term):
+        """Interleaved (article id, term frequency) array of a term"""
+        values = array.array(_TYPECODE)
+        for blob, in self.db.execute('SELECT postings FROM terms WHERE term = ? ORDER BY chunk', (term,)):
+            values.frombytes(blob)
+        return values
+
+    def _update_postings(self, term, dropped, appended):
+        """
+        Remove the articles in dropped from a term's postings and append the {article id: tf}
+        pairs of appended. Only chunks holding a dropped article and the last chunk are rewritten.
+        """
+        if dropped:
+            for chunk, blob in self.db.execute('SELECT chunk, postings FROM terms WHERE term = ?', (term,)).fetchall():
+                postings = _unpack(blob)
+                kept = array.array(_TYPECODE, itertools.chain.from_iterable(
+                    pair for pair in zip(postings[0::2], postings[1::2]) if pair[0] not in dropped))
+                if len(kept) == len(postings):
+                    continue
+                if kept:
+                    self.db.execute('UPDATE terms SET postings = ? WHERE term = ? AND chunk = ?', (kept.tobytes(), term, chunk))
+                else:
+                    self.db.execute('DELETE FROM terms WHERE term = ? AND chunk = ?', (term, chunk))
+        if not appended:
+            return
+        row = self.db.execute('SELECT chunk, postings FROM terms WHERE term = ? ORDER BY chunk DESC LIMIT 1', (term,)).fetchone()
+        chunk, postings = (row[0], _unpack(row[1])) if row else (0, array.array(_TYPECODE))
+        for doc_id, tf in appended.items():
+            if len(postings) >= 2 * CHUNK_PAIRS:
+                self.db.execute('INSERT OR REPLACE INTO terms (term, chunk, postings) VALUES (?, ?, ?)',
+                                (term, chunk, postings.tobytes()))
+                chunk, postings = chunk + 1, array.array(_TYPECODE)
+            postings.append(doc_id)
+            postings.append(tf)
+        self.db.execute('INSERT OR REPLACE INTO terms (term, chunk, postings) VALUES (?, ?, ?)', (term, chunk, postings.tobytes()))
+
+    def __len__(self):
+        return self._stat('docs')
+
+    def add(self, articles):
+        """
+        Index articles ({'tech': [...], 'news': [...]} or an iterable of articles).
+        Articles already indexed with the same content are skipped; returns how many were (re)indexed.
+        """
+        articles = _iter_articles(articles)
+        lengths = self._column('length')
+        dates = self._column('date')
+        # term -> {article id: tf} to append, and term -> article ids to drop (changed articles)
+        added = {}
+        removed = {}
+        indexed = 0
+        for article in articles:
+            article = records.Article.coerce(article)
+            fingerprint = _fingerprint(article)
+            row = self.db.execute('SELECT id, fingerprint, title, description FROM docs WHERE url = ?', (article.url,)).fetchone()
+            if row is not None and row[1] == fingerprint:
+                continue
+            found, cvss = entities.extract_article(article)
+            found.update(f"tag:{tag}" for tag in article.tags)
+            values = (fingerprint, article.date, article.date_raw, article.category, article.source, article.title,
+                      article.description or '', cvss, ' '.join(article.tags))
+            if row is None:
+                doc_id = self.db.execute(
+                    'INSERT INTO docs (fingerprint, date, date_raw, category, source, title, description, cvss, tags, url) '
+                    'VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                    (*values, article.url)).lastrowid
+            else:
+                # Changed article: it keeps its id, its old terms lose their posting
+                doc_id = row[0]
+                old_counts, _ = _term_counts(records.Article(row[2], article.url, article.source, row[3]))
+                for term in old_counts:
+                    if doc_id in added.get(term, ()):
+                        del added[term][doc_id]
+                    else:
+                        removed.setdefault(term, set()).add(doc_id)
+                self.db.execute(
+                    'UPDATE docs SET fingerprint = ?, date = ?, date_raw = ?, category = ?, source = ?, title = ?, description = ?, cvss = ?, tags = ? '
+                    'WHERE url = ?', (*values, article.url))
+                self.touched.update(entity for entity, in self.db.execute('SELECT entity FROM entities WHERE doc = ?', (doc_id,)))
+                self.db.execute('DELETE FROM entities WHERE doc = ?', (doc_id,))
+            self.db.executemany('INSERT OR IGNORE INTO entities (entity, doc) VALUES (?, ?)',
+                                ((entity, doc_id) for entity in found))
+            self.touched.update(found)
+            counts, length = _term_counts(article)
+            if doc_id >= len(lengths):
+                padding = [0] * (doc_id + 1 - len(lengths))
+                lengths.extend(padding)
+                dates.extend(padding)
+            lengths[doc_id] = length
+            dates[doc_id] = article.date
+            for term, tf in counts.items():
+                added.setdefault(term, {})[doc_id] = tf
+            indexed += 1
+        if not indexed:
+            return 0
+
+        for term in set(added) | set(removed):
+            self._update_postings(term, removed.get(term, ()), added.get(term, {}))
+        self._set_column('length', lengths)
+        self._set_column('date', dates)
+        self._set_stat('docs', self.db.execute('SELECT COUNT(*) FROM docs').fetchone()[0])
+        self._set_stat('length', sum(lengths))
+        return indexed
+
+    def _articles(self, doc_ids):
+        """{article id: Article} of some articles"""
+        placeholders = ','.join('?' * len(doc_ids))
+        return {row[0]: _article(row[1:]) for row in self.db.execute(
+            f"SELECT id, {', '.join(_ARTICLE_COLUMNS)} FROM docs WHERE id IN ({placeholders})",
+            list(doc_ids))}
+
+    def entity_articles(self, entity, limit=None):
+        """Articles mentioning an entity ('cve:CVE-2026-1470'), newest first"""
+        rows = self.db.execute(
+            f"SELECT {', '.join('d.' + column for column in _ARTICLE_COLUMNS)} FROM entities e JOIN docs d ON d.id = e.doc "
+            'WHERE e.entity = ? ORDER BY d.date DESC, d.id DESC' + (' LIMIT ?' if limit else ''),
+            (entity, limit) if limit else (entity,))
+        return [_article(row) for row in rows]
+
+    def entity_counts(self, kind):
+        """{entity: number of articles} of one kind ('cve', 'vendor', ...)"""
+        return dict(self.db.execute('SELECT entity, COUNT(*) FROM entities WHERE entity >= ? AND entity < ? GROUP BY entity',
+                                    (f"{kind}:", f"{kind};")))
+
+    def search(self, query, limit=20, since=None, category=None, source=None):
+        """
+        Articles containing every term of the query, best BM25 score first, as (score, Article)
+        pairs. since is an integer YYYYMMDD; category and source narrow the results further.
+        """
+        terms = list(dict.fromkeys(tokenize(query)))
+        total = len(self)
+        if not terms or not total:
+            return []
+        postings = {term: self.postings(term) for term in terms}
+        if not all(postings.values()):
+            return []
+        # Rarest term first: it fixes the candidates, the other terms only score them
+        terms.sort(key=lambda term: len(postings[term]))
+
+        lengths = self._column('length')
+        # BM25 length normalisation, K1 * (1 - B + B * length / average length) = base + slope * length
+        base = K1 * (1 - B)
+        slope = K1 * B / (self._stat('length') / total)
+        allowed = None
+        if category or source:
+            conditions = ' AND '.join(f"{column} = ?" for column, value in (('category', category), ('source', source)) if value)
+            allowed = {row[0] for row in self.db.execute(f"SELECT id FROM docs WHERE {conditions}",
+                                                         [value for value in (category, source) if value])}
+        dates = self._column('date') if since is not None else None
+
+        scores = None
+        for term in terms:
+            pairs = postings[term]
+            frequency = len(pairs) // 2
+            idf = math.log(1 + (total - frequency + 0.5) / (frequency + 0.5))
+            if scores is None:
+                scores = {}
+                for doc, tf in zip(pairs[0::2], pairs[1::2]):
+                    if (allowed is not None and doc not in allowed) or (dates is not None and dates[doc] < since):
+                        continue
+                    scores[doc] = idf * tf * (K1 + 1) / (tf + base + slope * lengths[doc])
+            else:
+                frequencies = dict(zip(pairs[0::2], pairs[1::2]))
+                scores = {doc: score + idf * frequencies[doc] * (K1 + 1) / (frequencies[doc] + base + slope * lengths[doc])
+                          for doc, score in scores.items() if doc in frequencies}
+            if not scores:
+                return []
+
+        best = heapq.nlargest(limit, scores.items(), key=lambda item: item[1])
+        found = self._articles([doc for doc, _ in best])
+        return [(score, found[doc]) for doc, score in best]
+
+
+def _iter_articles(articles):
+    """Articles of {'tech': [...], 'news': [...]} or of an iterable of articles"""
+    if isinstance(articles, dict):
+        return (article for category in records.CATEGORIES for article in articles.get(category, []))
+    return articles
+
+
+def update(path, articles, article_archive=None):
+    """
+    Add articles to the index at path. An empty index is first filled from the archive
+    partitions, so a fresh checkout (or a deleted index) catches up on the whole history.
+    Returns the entities whose articles changed.
+    """
+    with SearchIndex(path) as index:
+        if article_archive is not None and not len(index):
+            for month in reversed(article_archive.months()):
+                index.add(article_archive.load(month))
+            # The pages of the history exist already (or are rendered as missing); of the
+            # refilled entities only those of the current articles may have changed
+            index.touched = set()
+            articles = [records.Article.coerce(article) for article in _iter_articles(articles)]
+            for article in articles:
+                found, _ = entities.extract_article(article)
+                index.touched.update(found)
+                index.touched.update(f"tag:{tag}" for tag in article.tags)
+        indexed = index.add(articles)
+        logger.info(f"Search index: {indexed} articles added or updated, {len(index)} in total, "
+                    f"{len(index.touched)} entities touched")
+    return index.touched
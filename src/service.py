@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+Service mode
+Runs the scheduler in a long-lived process with warm state and exposes a small local
+control and metrics endpoint:
+  GET  /metrics  Prometheus text of the last cycle plus service gauges
+  GET  /status   scheduler state as JSON
+  GET  /search   full-text search, ?q=...&limit=20&days=365&category=tech, or the articles
+                 of an entity with ?entity=cve:CVE-2026-1470
+  POST /run      poll all sources now, or only ?sources=key1,key2
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import entities
+import records
+import search
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8787
+
+
+def service_metrics(source_scheduler):
+    """Service-level gauges in the Prometheus text format"""
+    status = source_scheduler.status()
+    lines = [
+        '# HELP secnews_service_uptime_seconds Seconds since the service started',
+        '# TYPE secnews_service_uptime_seconds gauge',
+        f"secnews_service_uptime_seconds {time.time() - source_scheduler.started_at.timestamp():.0f}",
+        '# HELP secnews_service_cycles_total Scrape cycles completed',
+        '# TYPE secnews_service_cycles_total counter',
+        f"secnews_service_cycles_total {status['cycles']}",
+        '# HELP secnews_service_cycle_running Whether a scrape cycle is in progress',
+        '# TYPE secnews_service_cycle_running gauge',
+        f"secnews_service_cycle_running {int(status['running'])}",
+        '# HELP secnews_service_articles Articles currently in the store',
+        '# TYPE secnews_service_articles gauge',
+    ]
+    lines.extend(f'secnews_service_articles{{category="{category}"}} {count}' for category, count in status['articles'].items())
+    lines.extend([
+        '# HELP secnews_service_poll_interval_hours Learned polling interval per source',
+        '# TYPE secnews_service_poll_interval_hours gauge',
+    ])
+    lines.extend(f'secnews_service_poll_interval_hours{{source="{key}"}} {values["interval_hours"]}'
+                 for key, values in status['sources'].items())
+    return '\n'.join(lines) + '\n'
+
+
+def search_results(source_scheduler, params):
+    """Hits of a /search query as JSON-ready dicts"""
+    query = params.get('q', [''])[0]
+    entity = params.get('entity', [None])[0]
+    if not query.strip() and not entity:
+        raise ValueError("Missing query parameter q or entity")
+    limit = int(params.get('limit', ['20'])[0])
+    days = params.get('days', [None])[0]
+    since = records.date_value(datetime.now() - timedelta(days=int(days))) if days else None
+    index_path = source_scheduler.search_index_path
+    if not index_path or not os.path.exists(index_path):
+        return []
+    with search.SearchIndex(index_path) as index:
+        if entity:
+            return [article.to_dict() for article in index.entity_articles(entities.canonical(entity))
+                    if since is None or article.date >= since][:limit]
+        hits = index.search(query, limit=limit, since=since, category=params.get('category', [None])[0],
+                            source=params.get('source', [None])[0])
+    return [dict(article.to_dict(), score=round(score, 3)) for score, article in hits]
+
+
+def make_handler(source_scheduler):
+    """Request handler class bound to a scheduler"""
+
+    class ControlHandler(BaseHTTPRequestHandler):
+        def _send(self, code, body, content_type='application/json; charset=utf-8'):
+            data = body.encode('utf-8')
+            self.send_response(code)
+            self.send_header('Content-Type', content_type)
+            self.send_header('Content-Length', str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def _send_json(self, code, payload):
+            self._send(code, json.dumps(payload, ensure_ascii=False, indent=2) + '\n')
+
+        def do_GET(self):
+            parsed = urlparse(self.path)
+            path = parsed.path
+            if path == '/metrics':
+                body = service_metrics(source_scheduler)
+                if source_scheduler.last_metrics is not None:
+                    body += source_scheduler.last_metrics.to_prometheus()
+                self._send(200, body, 'text/plain; version=0.0.4; charset=utf-8')
+            elif path == '/status':
+                self._send_json(200, source_scheduler.status())
+            elif path == '/search':
+                try:
+                    self._send_json(200, search_results(source_scheduler, parse_qs(parsed.query)))
+                except ValueError as e:
+                    self._send_json(400, {'error': str(e)})
+            else:
+                self._send_json(404, {'error': f"Unknown path {path}"})
+
+        def do_POST(self):
+            parsed = urlparse(self.path)
+            if parsed.path != '/run':
+                self._send_json(404, {'error': f"Unknown path {parsed.path}"})
+                return
+            sources = parse_qs(parsed.query).get('sources')
+            keys = [key.strip() for value in sources for key in value.split(',') if key.strip()] if sources else None
+            try:
+                queued = source_scheduler.request_run(keys)
+            except ValueError as e:
+                self._send_json(400, {'error': str(e)})
+                return
+            self._send_json(202, {'queued': queued, 'running': source_scheduler.running})
+
+        def log_message(self, format, *args):
+            logger.debug(f"{self.address_string()} {format % args}")
+
+    return ControlHandler
+
+
+class Service:
+    """Scheduler loop plus the control endpoint, stopped together"""
+
+    def __init__(self, source_scheduler, host=DEFAULT_HOST, port=DEFAULT_PORT):
+        self.scheduler = source_scheduler
+        self.server = ThreadingHTTPServer((host, port), make_handler(source_scheduler))
+        self.server.daemon_threads = True
+
+    @property
+    def address(self):
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def serve(self, max_sleep=3600):
+        """Run until stop() or Ctrl+C"""
+        server_thread = threading.Thread(target=self.server.serve_forever, name='secnews-control', daemon=True)
+        server_thread.start()
+        logger.info(f"Control endpoint listening on {self.address} (/metrics, /status, /search, POST /run)")
+        try:
+            self.scheduler.run(max_sleep=max_sleep)
+        finally:
+            self.server.shutdown()
+            self.server.server_close()
+
+    def stop(self):
+        self.scheduler.stop()
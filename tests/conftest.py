@@ -0,0 +1,7 @@
+import os
+import sys
+
+# The modules in src/ import each other by plain name, as when run as scripts
+SRC_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src')
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+sys.path.insert(0, SRC_DIR)
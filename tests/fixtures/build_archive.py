@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Build the replay archive fixtures/http_fixtures.zip from the pages in this directory:
+the listing page (and detail pages) of every registry source, modeled on the live markup.
+
+    python tests/fixtures/build_archive.py [output.zip]
+"""
+
+import json
+import os
+import sys
+
+FIXTURES_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.dirname(os.path.dirname(FIXTURES_DIR))
+sys.path.insert(0, os.path.join(PROJECT_ROOT, 'src'))
+
+import replay  # noqa: E402
+
+HTML = 'text/html; charset=utf-8'
+
+# URL -> page in this directory
+PAGES = {
+    'https://sec.today/': 'sectoday_home.html',
+    'https://sec.today/pulses/': 'sectoday_pulses.html',
+    'https://sectoday.tencent.com/': 'tencent_home.html',
+    'https://xz.aliyun.com/news': 'xz_news.html',
+    'https://projectzero.google/': 'projectzero_home.html',
+    'https://paper.seebug.org/': 'seebug_home.html',
+    'https://www.kanxue.com/': 'kanxue_home.html',
+    'https://www.anquanke.com/': 'anquanke_home.html',
+    'https://www.freebuf.com/': 'freebuf_home.html',
+    'https://www.secrss.com/': 'secrss_home.html',
+    'https://thehackernews.com/': 'thn_home.html',
+    'https://thehackernews.com/2026/01/n8n-expression-injection-flaw.html': 'thn_article_n8n.html',
+    'https://thehackernews.com/2026/01/ransomware-gang-targets-esxi.html': 'thn_article_esxi.html',
+    'https://www.securityweek.com/': 'securityweek_home.html',
+    'https://www.securityweek.com/fortinet-patches-critical-fortiweb-vulnerability/': 'securityweek_article_fortiweb.html',
+    'https://www.securityweek.com/chrome-update-fixes-zero-day/': 'securityweek_article_chrome.html',
+}
+
+# XZ's AJAX endpoint wraps the card fragment in JSON
+XZ_AJAX_URL = 'https://xz.aliyun.com/news?isAjax=true&type=recommend'
+XZ_FRAGMENT = 'xz_news_fragment.html'
+
+
+def _read(name):
+    with open(os.path.join(FIXTURES_DIR, name), 'rb') as f:
+        return f.read()
+
+
+def build(path):
+    archive = replay.FixtureArchive(path)
+    for url, name in PAGES.items():
+        archive.add('GET', url, 200, 'OK', {'Content-Type': HTML}, _read(name))
+    body = json.dumps({'code': 0, 'data': _read(XZ_FRAGMENT).decode('utf-8')}, ensure_ascii=False).encode('utf-8')
+    archive.add('GET', XZ_AJAX_URL, 200, 'OK', {'Content-Type': 'application/json'}, body)
+    archive.save()
+    return archive
+
+
+if __name__ == '__main__':
+    build(sys.argv[1] if len(sys.argv) > 1 else os.path.join(PROJECT_ROOT, 'fixtures', 'http_fixtures.zip'))
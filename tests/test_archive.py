@@ -0,0 +1,36 @@
+import json
+import os
+from datetime import datetime
+
+import archive
+import records
+
+
+def _article(date):
+    return records.Article('Title', 'https://example.com/a', 'The Hacker News', date=date)
+
+
+def test_article_moving_month_leaves_its_old_partition(tmp_path):
+    directory = str(tmp_path / 'data')
+    # Filed under the scrape day first, then enrich finds the real publication date
+    assert archive.Archive(directory).update({'news': [_article('2026-10-01')]}) == ['2026-10']
+    store = archive.Archive(directory)
+    assert sorted(store.update({'news': [_article('2026-09-28')]})) == ['2026-09', '2026-10']
+
+    store = archive.Archive(directory)
+    assert store.months() == ['2026-09']
+    assert [article.date_text for article in store.load('2026-09')] == ['2026-09-28']
+    assert store.counts() == {'2026-09': 1}
+
+
+def test_only_the_window_months_are_searched_for_moves(tmp_path):
+    directory = str(tmp_path / 'data')
+    archive.Archive(directory).update({'news': [_article('2024-03-05')]})
+
+    # Two years on, the old partition is outside the window and is never read again
+    store = archive.Archive(directory)
+    assert store.window_months(datetime(2026, 10, 19)) == []
+    assert store.update({'news': [records.Article('Other', 'https://example.com/b', 'XZ', date='2024-04-02')]}) == ['2024-04']
+    assert store.counts() == {'2024-03': 1, '2024-04': 1}
+    with open(os.path.join(directory, archive.INDEX_FILE), encoding='utf-8') as f:
+        assert json.load(f) == {'2024-04': 1, '2024-03': 1}
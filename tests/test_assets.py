@@ -0,0 +1,47 @@
+import json
+import os
+from datetime import datetime, timedelta
+
+import assets
+import scrape_news
+
+
+def test_superseded_assets_are_pruned_by_manifest_age(tmp_path):
+    asset_dir = tmp_path / 'assets'
+    asset_dir.mkdir()
+    # A fresh checkout: the old version has a brand-new mtime
+    for name in ('style.0123456789.css', 'style.0123456789.css.gz'):
+        (asset_dir / name).write_text('old')
+
+    paths = assets.write_assets(str(tmp_path))
+    assert os.path.exists(tmp_path / paths['css'])
+    with open(asset_dir / assets.MANIFEST_NAME, encoding='utf-8') as f:
+        manifest = json.load(f)
+    assert set(manifest['superseded']) == {'style.0123456789.css'}
+
+    # Still within the retention period
+    assets.write_assets(str(tmp_path))
+    assert (asset_dir / 'style.0123456789.css').exists()
+
+    manifest['superseded']['style.0123456789.css'] = (
+        datetime.now() - timedelta(days=assets.RETENTION_DAYS + 1)).isoformat(timespec='seconds')
+    with open(asset_dir / assets.MANIFEST_NAME, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f)
+    assets.write_assets(str(tmp_path))
+    assert not (asset_dir / 'style.0123456789.css').exists()
+    assert not (asset_dir / 'style.0123456789.css.gz').exists()
+    with open(asset_dir / assets.MANIFEST_NAME, encoding='utf-8') as f:
+        assert json.load(f)['superseded'] == {}
+    assert os.path.exists(tmp_path / paths['css'])
+    assert os.path.exists(tmp_path / paths['js'])
+
+
+def test_every_filter_control_applies_all_filters(tmp_path):
+    scrape_news.generate_html({'tech': [], 'news': []}, str(tmp_path / 'index.html'), feed_items=0)
+    with open(tmp_path / 'index.html', encoding='utf-8') as f:
+        page = f.read()
+    # No control resets the others: each one re-applies search, source, tag and date together
+    for control in ('date-filter', 'source-filter', 'tag-filter', 'search-input'):
+        assert f'id="{control}"' in page
+    assert page.count('="applyFilters()"') == 4
+    assert 'filterBy' not in assets.PAGE_JS
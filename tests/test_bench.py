@@ -0,0 +1,20 @@
+import bench
+import replay
+import scrape_news
+
+
+def test_sources_without_fixtures_are_skipped(tmp_path):
+    fixtures = replay.FixtureArchive(scrape_news.DEFAULT_FIXTURES_PATH).load()
+    fixtures.path = str(tmp_path / 'fixtures.zip')
+    fixtures.entries = {key: entry for key, entry in fixtures.entries.items() if 'xz.aliyun.com' not in entry['url']}
+    fixtures.save()
+
+    results = bench.bench_sources(fixtures.path, repeat=1)
+    assert results['xz'] == {'skipped': 'missing fixtures', 'missing': ['GET https://xz.aliyun.com/news']}
+    assert results['thehackernews']['items'] == 2
+
+
+def test_render_times_generation_apart_from_compression():
+    results = bench.bench_render([20], repeat=1)['20']
+    assert set(results) == {'generate', 'precompress', 'output_bytes'}
+    assert results['generate']['runs'] == results['precompress']['runs'] == 1
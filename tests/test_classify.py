@@ -0,0 +1,32 @@
+import classify
+import records
+
+
+def _classify(title, description='', source='KanXue', category='tech'):
+    return classify.classify(records.Article(title, 'https://example.com/a', source, description=description, category=category))
+
+
+def test_injection_outside_web_is_not_tagged_web():
+    # Titles from articles.json that a bare '注入' used to tag as Web
+    assert _classify('基于ptrace与/proc/mem的Linux无文件进程注入：攻击实现与内存取证检测', source='XZ Aliyun') == ('tech', ('binary',))
+    assert _classify('从0到1构建一个Hook工具之注入器篇（一）') == ('tech', ())
+    assert _classify('AppDomainManager 注入：从GAC 利用到无文件加载的多种实现',
+                     '过去的注入技术（如跨进程注入）依赖底层的 Windows API（如 VirtualAlloc、CreateRemoteThread）') == ('tech', ('binary',))
+    assert _classify('隐秘战争：利用网络武器破坏精密计算，欲锁死对手国家科技上限',
+                     '能在高精度数学计算中注入难以察觉的错误', source='Secrss', category='news') == ('news', ())
+
+
+def test_web_injections_are_still_tagged_web():
+    assert _classify('LiteLLM SQL注入漏洞(CVE-2026-42208)安全风险通告', source='Secrss', category='news') == ('news', ('web',))
+    assert _classify('单个Git Push就能攻陷GitHub？CVE-2026-3854高危漏洞曝光',
+                     '一个编号为CVE-2026-3854的严重命令注入漏洞')[1] == ('web',)
+
+
+def test_generic_words_are_not_cues():
+    # 'AI 驱动' is not a driver
+    assert _classify('Project Glasswing 与 Claude Mythos：网络安全面临的十大即时与长期后果',
+                     '为行业应对 AI 驱动的安全危机提供了至关重要的战略', source='Daily Security')[1] == ('ai',)
+    assert _classify('Windows 内核驱动程序提权漏洞')[1] == ('binary',)
+    # A technical write-up that mentions a report or a release stays technical
+    assert _classify('【AI赋能】六阶段AI流水线赋能APP安全分析实战', '验证设计与报告交付流程', source='XZ Aliyun') == ('tech', ('ai',))
+    assert _classify('国家数据局发布《数字中国发展报告（2025年）》', source='Secrss', category='news')[0] == 'news'
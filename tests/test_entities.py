@@ -0,0 +1,28 @@
+import pytest
+
+import entities
+
+
+@pytest.mark.parametrize('text, expected', [
+    ('Ransomware gang makes progress', set()),
+    ('Cisco IOS flaw', {'vendor:Cisco'}),
+    ('Windows of opportunity', set()),
+    ('Check Point of no return', set()),
+])
+def test_common_words_are_not_dictionary_names(text, expected):
+    assert entities.extract(text)[0] == expected
+
+
+def test_dictionary_names_match_case_sensitively():
+    found, cvss = entities.extract('Apple patches iOS and Windows flaw CVE-2026-1470, CVSS score 9.8')
+    assert found == {'vendor:Apple', 'product:iOS', 'product:Windows', 'vendor:Microsoft',
+                     'cve:CVE-2026-1470', 'cvss:critical'}
+    assert cvss == 9.8
+    assert entities.extract('Progress Software fixes MOVEit bug')[0] == {'vendor:Progress Software', 'product:MOVEit'}
+    assert entities.extract('cisco IOS XE')[0] == {'product:IOS XE', 'vendor:Cisco'}
+
+
+def test_canonical_keys_stay_case_insensitive():
+    assert entities.canonical('product:ios') == 'product:iOS'
+    assert entities.canonical('vendor:progress software') == 'vendor:Progress Software'
+    assert entities.canonical('cve:cve-2026-1470') == 'cve:CVE-2026-1470'
@@ -0,0 +1,71 @@
+import os
+
+import pytest
+
+import extract
+from conftest import FIXTURES_DIR
+
+
+def read_fixture(name):
+    with open(os.path.join(FIXTURES_DIR, name), encoding='utf-8') as f:
+        return f.read()
+
+
+def test_xz_cards():
+    cards = extract.xz_cards(read_fixture('xz_news_fragment.html'))
+    assert [(card['title'], card['url'], card['date']) for card in cards] == [
+        ('面向大模型隐私推理的安全协议-MPC与ZK的角色分工', 'https://xz.aliyun.com/news/92061', '2026-04-29'),
+        ('Agentic / Context', 'https://xz.aliyun.com/news/92060', '2026-04-29'),
+        ('CVE-2026-1470 n8n 表达式注入漏洞分析', 'https://xz.aliyun.com/news/91873', '2026-04-21'),
+        ('漏洞复现专题某 CMS 文件上传绕过', 'https://xz.aliyun.com/news/91870', extract._today()),
+    ]
+    assert [card['description'] for card in cards] == [
+        '面向大模型隐私推理的安全协议-MPC与ZK的角色分工面向大模型隐私推理的安全协议-MPC与ZK的角色分工'
+        'AI专栏阿里云先知先知沙龙 · 90浏览 · 2026-04-29 09:49',
+        'Agentic / ContextAgentic / ContextAI专栏阿里云先知先知沙龙 · 104浏览 · 2026-04-29 09:49',
+        '作者发表于 2026-04-21原创 · 6550浏览',
+        # The label outside the link equals the one inside it, so it is not taken as the description
+        '从一次文件上传绕过说起，分析黑名单校验与解析差异导致的问题',
+    ]
+    assert all(card['source'] == 'XZ Aliyun' and card['category'] == 'tech' for card in cards)
+
+
+@pytest.mark.parametrize('text, expected', [
+    ('2026-01-29T18:41:00+05:30', '2026-01-29'),
+    ('2026/1/5', '2026-01-05'),
+    ('Jan 29, 2026', '2026-01-29'),
+    ('Sept. 5 2026', '2026-09-05'),
+    ('29 January 2026', '2026-01-29'),
+    ('Published 3 Feb, 2026 by Ravie', '2026-02-03'),
+    # The date that appears first wins
+    ('Updated Feb 1, 2026 (first published 2026-01-29)', '2026-02-01'),
+    # An impossible first date falls through to the next one
+    ('2026-02-30 / Mar 2, 2026', '2026-03-02'),
+    ('Feb 30, 2026', None),
+    ('Version 2 2026', None),
+    ('2小时前', None),
+    ('', None),
+    (None, None),
+])
+def test_parse_date_string(text, expected):
+    assert extract.parse_date_string(text) == expected
+
+
+def test_thn_details():
+    description, date = extract.thn_details(read_fixture('thn_article_n8n.html'))
+    assert description.startswith('A critical flaw in n8n (CVE-2026-1470, CVSS score: 9.9)')
+    # No dated element on the page, so the published_time meta tag is used
+    assert date == '2026-01-29'
+
+    description, date = extract.thn_details(read_fixture('thn_article_esxi.html'))
+    assert description.endswith('spreads through exposed management interfaces.')
+    assert date == '2026-01-28'
+
+
+def test_thn_details_without_metadata():
+    page = ('<html><body><div class="postmeta">By Ravie Lakshmanan</div>'
+            '<article><p>Threat actors are exploiting a newly disclosed flaw in a popular VPN appliance to gain '
+            'initial access.</p></article></body></html>')
+    description, date = extract.thn_details(page)
+    assert description.startswith('Threat actors are exploiting a newly disclosed flaw')
+    assert date is None
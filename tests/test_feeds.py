@@ -0,0 +1,39 @@
+import json
+import xml.dom.minidom
+
+import feeds
+import records
+
+
+def sample_articles():
+    return {'tech': [records.Article('Bypass <script> & "quotes"', 'https://example.com/a?x=1&y=2', 'XZ Aliyun',
+                                     'Control\x0bcharacters are dropped', '2026-01-29', 'tech')],
+            'news': [records.Article('Undated', 'https://example.com/b', 'The Hacker News', '', '', 'news')]}
+
+
+def test_feeds_use_absolute_links(tmp_path, monkeypatch):
+    monkeypatch.setenv('GITHUB_REPOSITORY', 'Someone/secnews-fork')
+    feeds.write_feeds(sample_articles(), str(tmp_path / 'feeds'))
+
+    rss = xml.dom.minidom.parse(str(tmp_path / 'feeds' / 'all' / 'rss.xml'))
+    channel_link = rss.getElementsByTagName('link')[0].firstChild.data
+    assert channel_link == 'https://someone.github.io/secnews-fork/index.html'
+    self_link = rss.getElementsByTagName('atom:link')[0].getAttribute('href')
+    assert self_link == 'https://someone.github.io/secnews-fork/feeds/all/rss.xml'
+    titles = [node.firstChild.data for node in rss.getElementsByTagName('title')]
+    assert 'Bypass <script> & "quotes"' in titles
+
+    atom = xml.dom.minidom.parse(str(tmp_path / 'feeds' / 'source' / 'xz' / 'atom.xml'))
+    assert atom.getElementsByTagName('id')[0].firstChild.data == 'https://someone.github.io/secnews-fork/feeds/source/xz/atom.xml'
+    assert atom.getElementsByTagName('link')[2].getAttribute('href') == 'https://example.com/a?x=1&y=2'
+    assert atom.getElementsByTagName('summary')[0].firstChild.data == 'Controlcharacters are dropped'
+
+    with open(tmp_path / 'feeds' / 'category' / 'news' / 'feed.json', encoding='utf-8') as f:
+        feed = json.load(f)
+    assert feed['feed_url'] == 'https://someone.github.io/secnews-fork/feeds/category/news/feed.json'
+
+
+def test_site_url_overrides_the_default(tmp_path):
+    feeds.write_feeds(sample_articles(), str(tmp_path / 'feeds'), site_url='https://news.example.com/', groups=False)
+    rss = xml.dom.minidom.parse(str(tmp_path / 'feeds' / 'all' / 'rss.xml'))
+    assert rss.getElementsByTagName('link')[0].firstChild.data == 'https://news.example.com/index.html'
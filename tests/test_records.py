@@ -0,0 +1,36 @@
+import io
+import json
+import os
+
+import records
+from conftest import SRC_DIR
+
+
+def test_store_round_trip():
+    with open(os.path.join(SRC_DIR, 'articles.json'), encoding='utf-8') as f:
+        original = f.read()
+    written = io.StringIO()
+    records.dump(records.load(io.StringIO(original)), written)
+    assert written.getvalue() == original
+
+
+def test_unparsed_dates_keep_their_text():
+    stored = {'tech': [], 'news': [
+        {'title': 'a', 'url': 'https://example.com/a', 'source': 'S', 'description': '', 'date': '2小时前', 'category': 'news'},
+        {'title': 'b', 'url': 'https://example.com/b', 'source': 'S', 'description': '', 'date': '2026-1-5', 'category': 'news'},
+        {'title': 'c', 'url': 'https://example.com/c', 'source': 'S', 'description': '', 'date': '', 'category': 'news'},
+    ]}
+    articles = records.from_json_dict(stored)
+    assert [article.date for article in articles['news']] == [records.UNKNOWN_DATE, 20260105, records.UNKNOWN_DATE]
+    assert [article['date'] for article in articles['news']] == ['2小时前', '2026-1-5', '']
+
+    written = io.StringIO()
+    records.dump(articles, written)
+    assert json.loads(written.getvalue()) == stored
+
+
+def test_setting_a_date_replaces_the_stored_text():
+    article = records.Article('a', 'https://example.com/a', 'S', date='2小时前')
+    article['date'] = '2026-01-29'
+    assert (article.date, article.date_text) == (20260129, '2026-01-29')
+    assert article.to_dict()['date'] == '2026-01-29'
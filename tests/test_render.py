@@ -0,0 +1,61 @@
+import os
+import re
+
+import records
+import scrape_news
+
+
+def _articles():
+    return {'tech': [], 'news': [records.Article('Title', 'https://example.com/a', 'The Hacker News', date='2026-09-28')]}
+
+
+def test_unchanged_page_is_not_rewritten_or_recompressed(tmp_path):
+    output = str(tmp_path / 'index.html')
+    scrape_news.generate_html(_articles(), output, site_url='https://example.com/')
+    written = {name: os.stat(tmp_path / name).st_mtime_ns for name in ('index.html', 'index.html.gz')}
+    with open(output, encoding='utf-8') as f:
+        page = f.read()
+    # No clock time in the page, only the newest article date
+    assert '更新日期: 2026-09-28' in page
+    assert not re.search(r'\d{2}:\d{2}:\d{2}', page)
+
+    scrape_news.generate_html(_articles(), output, site_url='https://example.com/')
+    assert {name: os.stat(tmp_path / name).st_mtime_ns for name in written} == written
+
+
+def _render(tmp_path, *extra):
+    scrape_news.main(['render', *extra, '--store', str(tmp_path / 'articles.json'), '--output', str(tmp_path / 'index.html'),
+                      '--render-cache', str(tmp_path / 'render_cache.json'), '--archive-dir', str(tmp_path / 'data'),
+                      '--search-index', str(tmp_path / 'search.sqlite')])
+
+
+def test_render_rebuilds_only_changed_archive_and_cve_pages(tmp_path, monkeypatch):
+    aggregator = scrape_news.SecurityNewsAggregator()
+    aggregator.articles = {'tech': [], 'news': [
+        records.Article('Patch for CVE-2026-1111', 'https://example.com/a', 'The Hacker News', date='2026-09-28'),
+        records.Article('Patch for CVE-2026-2222', 'https://example.com/b', 'The Hacker News', date='2026-08-03'),
+    ]}
+    aggregator.save_articles_json(str(tmp_path / 'articles.json'))
+    calls = []
+    monkeypatch.setattr(scrape_news, 'render_site', lambda *args, **kwargs: calls.append(kwargs))
+
+    _render(tmp_path)
+    assert sorted(calls[-1]['archive_months']) == ['2026-08', '2026-09']
+    assert {'cve:CVE-2026-1111', 'cve:CVE-2026-2222'} <= set(calls[-1]['changed_entities'])
+
+    # Nothing changed since: no archive month or CVE page is rebuilt
+    _render(tmp_path)
+    assert list(calls[-1]['archive_months']) == []
+    assert set(calls[-1]['changed_entities']) == set()
+
+    _render(tmp_path, '--full')
+    assert sorted(calls[-1]['archive_months']) == ['2026-08', '2026-09']
+    assert set(calls[-1]['changed_entities']) == {'cve:CVE-2026-1111', 'cve:CVE-2026-2222'}
+
+    # A refilled index only reports the entities of the current articles as changed
+    os.remove(tmp_path / 'search.sqlite')
+    aggregator.articles['news'] = aggregator.articles['news'][:1]
+    aggregator.save_articles_json(str(tmp_path / 'articles.json'))
+    _render(tmp_path)
+    assert 'cve:CVE-2026-1111' in calls[-1]['changed_entities']
+    assert 'cve:CVE-2026-2222' not in calls[-1]['changed_entities']
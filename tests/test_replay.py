@@ -0,0 +1,180 @@
+import json
+import os
+import sys
+
+import pytest
+
+import registry
+import replay
+import scrape_news
+from conftest import FIXTURES_DIR
+
+
+@pytest.fixture
+def paths(tmp_path):
+    """Command-line paths that keep a run's outputs out of the tree"""
+    def args(*extra):
+        return [*extra, '--store', str(tmp_path / 'articles.json'), '--output', str(tmp_path / 'index.html'),
+                '--report', str(tmp_path / 'run_report.json'), '--render-cache', str(tmp_path / 'render_cache.json'),
+                '--archive-dir', '', '--search-index', '', '--state', str(tmp_path / 'source_state.json')]
+    yield args
+    scrape_news.configure_http(None)
+
+
+def test_replay_scrape(paths, tmp_path):
+    assert os.path.exists(scrape_news.DEFAULT_FIXTURES_PATH)
+    scrape_news.main(paths('scrape', '--sources', 'xz,thehackernews', '--http-mode', 'replay', '--days', '100000'))
+
+    with open(tmp_path / 'articles.json', encoding='utf-8') as f:
+        stored = json.load(f)
+    assert [article['url'] for article in stored['tech']] == [
+        'https://xz.aliyun.com/news/92061',
+        'https://xz.aliyun.com/news/92060',
+        'https://xz.aliyun.com/news/91873',
+        'https://xz.aliyun.com/news/91870',
+    ]
+    # Descriptions and dates come from the recorded detail pages
+    assert [(article['title'], article['date']) for article in stored['news']] == [
+        ('Critical n8n Expression Injection Flaw Lets Attackers Run Code on Workflow Servers', '2026-01-29'),
+        ('Ransomware Gang Targets VMware ESXi Hosts With New Linux Locker', '2026-01-28'),
+    ]
+    assert stored['news'][0]['description'].startswith('A critical flaw in n8n (CVE-2026-1470, CVSS score: 9.9)')
+    assert stored['news'][1]['description'].endswith('spreads through exposed management interfaces.')
+    assert os.path.exists(tmp_path / 'index.html')
+
+    with open(tmp_path / 'run_report.json', encoding='utf-8') as f:
+        sources = json.load(f)['sources']
+    assert sources['xz']['items_found'] == 4
+    assert sources['thehackernews']['items_found'] == 2
+
+
+def test_recording_is_saved_when_the_scrape_fails(paths, tmp_path, monkeypatch):
+    def fail(*args, **kwargs):
+        raise RuntimeError('scraper crashed')
+
+    monkeypatch.setattr(scrape_news.SecurityNewsAggregator, 'scrape_all_sources', fail)
+    fixtures = tmp_path / 'recorded.zip'
+    with pytest.raises(RuntimeError):
+        scrape_news.main(paths('scrape', '--http-mode', 'record', '--fixtures', str(fixtures)))
+    assert fixtures.exists()
+
+
+def test_selected_sources_keep_the_other_stored_articles(paths, tmp_path):
+    stored = {
+        'tech': [{'title': 'Old XZ article', 'url': 'https://xz.aliyun.com/news/1', 'source': 'XZ Aliyun',
+                  'description': '', 'date': '2026-04-01', 'category': 'tech'}],
+        'news': [{'title': 'Stored THN article', 'url': 'https://thehackernews.com/2026/01/stored.html',
+                  'source': 'The Hacker News', 'description': 'Kept while only XZ is scraped',
+                  'date': '2026-01-20', 'category': 'news'}],
+    }
+    with open(tmp_path / 'articles.json', 'w', encoding='utf-8') as f:
+        json.dump(stored, f)
+
+    scrape_news.main(paths('scrape', '--sources', 'xz', '--http-mode', 'replay', '--days', '100000'))
+
+    with open(tmp_path / 'articles.json', encoding='utf-8') as f:
+        saved = json.load(f)
+    # The re-scraped source is replaced, every other source keeps its articles
+    assert 'https://xz.aliyun.com/news/1' not in [article['url'] for article in saved['tech']]
+    assert len(saved['tech']) == 4
+    assert [article['url'] for article in saved['news']] == ['https://thehackernews.com/2026/01/stored.html']
+
+
+def test_empty_source_keeps_its_stored_articles(paths, tmp_path):
+    stored = {'tech': [], 'news': [
+        {'title': 'Stored FreeBuf article', 'url': 'https://www.freebuf.com/news/1.html', 'source': 'FreeBuf',
+         'description': '', 'date': '2026-04-01', 'category': 'news'},
+    ]}
+    with open(tmp_path / 'articles.json', 'w', encoding='utf-8') as f:
+        json.dump(stored, f)
+    # FreeBuf answers with its WAF challenge, so it comes back empty
+    fixtures = replay.FixtureArchive(scrape_news.DEFAULT_FIXTURES_PATH).load()
+    with open(os.path.join(FIXTURES_DIR, 'freebuf_captcha.html'), 'rb') as f:
+        fixtures.add('GET', 'https://www.freebuf.com/', 200, 'OK', {'Content-Type': 'text/html; charset=utf-8'}, f.read())
+    fixtures.path = str(tmp_path / 'fixtures.zip')
+    fixtures.save()
+
+    scrape_news.main(paths('scrape', '--sources', 'xz,freebuf', '--http-mode', 'replay', '--fixtures', fixtures.path,
+                           '--days', '100000'))
+
+    with open(tmp_path / 'articles.json', encoding='utf-8') as f:
+        saved = json.load(f)
+    assert [article['url'] for article in saved['news']] == ['https://www.freebuf.com/news/1.html']
+    assert len(saved['tech']) == 4
+
+
+def test_every_source_has_fixtures(paths, tmp_path, caplog):
+    scrape_news.main(paths('scrape', '--http-mode', 'replay', '--days', '100000', '--no-render'))
+
+    assert 'no recorded fixture' not in caplog.text
+    with open(tmp_path / 'run_report.json', encoding='utf-8') as f:
+        sources = json.load(f)['sources']
+    assert set(sources) == set(registry.keys())
+    assert {key: source['errors'] for key, source in sources.items() if source['items_found'] < 2 or source['errors']} == {}
+    with open(tmp_path / 'articles.json', encoding='utf-8') as f:
+        saved = json.load(f)
+    # SecurityWeek descriptions come from the recorded article pages
+    assert [article['description'][:40] for article in saved['news'] if article['source'] == 'SecurityWeek'] == [
+        'Fortinet has released patches for a crit',
+        'Google has released a Chrome security up',
+    ]
+
+
+def test_missing_fixture_fails_fast(paths, tmp_path, caplog):
+    empty = replay.FixtureArchive(str(tmp_path / 'empty.zip'))
+    empty.save()
+
+    scrape_news.main(paths('scrape', '--sources', 'securityweek', '--http-mode', 'replay', '--fixtures', empty.path,
+                           '--days', '100000', '--no-render'))
+
+    # One request, no retries and no backup articles
+    with open(tmp_path / 'run_report.json', encoding='utf-8') as f:
+        assert json.load(f)['sources']['securityweek']['requests'] == 1
+    with open(tmp_path / 'articles.json', encoding='utf-8') as f:
+        assert json.load(f)['news'] == []
+    assert '1 requests have no recorded fixture: GET https://www.securityweek.com/' in caplog.text
+
+
+def test_default_archive_is_built_from_the_fixture_pages(tmp_path):
+    sys.path.insert(0, FIXTURES_DIR)
+    try:
+        import build_archive
+    finally:
+        sys.path.remove(FIXTURES_DIR)
+    built = build_archive.build(str(tmp_path / 'built.zip'))
+    shipped = replay.FixtureArchive(scrape_news.DEFAULT_FIXTURES_PATH).load()
+    assert shipped.entries == built.entries
+    assert all(shipped.get('GET', entry['url']) == built.get('GET', entry['url']) for entry in built.entries.values())
+
+
+def test_articles_older_than_the_window_are_archived(paths, tmp_path):
+    stored = {'tech': [], 'news': [
+        {'title': 'Stored THN article', 'url': 'https://thehackernews.com/2025/11/stored.html',
+         'source': 'The Hacker News', 'description': '', 'date': '2025-11-20', 'category': 'news'},
+    ]}
+    with open(tmp_path / 'articles.json', 'w', encoding='utf-8') as f:
+        json.dump(stored, f)
+
+    args = paths('scrape', '--sources', 'xz', '--http-mode', 'replay', '--days', '30', '--no-render')
+    args[args.index('--archive-dir') + 1] = str(tmp_path / 'data')
+    scrape_news.main(args)
+
+    with open(tmp_path / 'articles.json', encoding='utf-8') as f:
+        saved = json.load(f)
+    # Cut from the store, but filed in its month first, like the scraped XZ articles from April
+    assert saved['news'] == []
+    with open(tmp_path / 'data' / '2025-11.jsonl', encoding='utf-8') as f:
+        assert [json.loads(line)['url'] for line in f] == ['https://thehackernews.com/2025/11/stored.html']
+    assert {'2025-11.jsonl', '2026-04.jsonl'} <= set(os.listdir(tmp_path / 'data'))
+
+
+def test_profiled_scrape_runs_the_sources_one_at_a_time(paths, tmp_path, caplog):
+    profile_dir = tmp_path / 'profiles'
+    scrape_news.main(paths('scrape', '--sources', 'xz,thehackernews', '--http-mode', 'replay', '--days', '100000',
+                           '--concurrency', '4', '--profile', '--profile-dir', str(profile_dir), '--no-render'))
+
+    assert 'ignoring --concurrency' in caplog.text
+    with open(profile_dir / 'summary.json', encoding='utf-8') as f:
+        summary = json.load(f)
+    assert {'source-xz', 'source-thehackernews', 'dedup'} <= set(summary['profiles'])
+    assert len(list(profile_dir.glob('*.prof'))) == len(summary['profiles'])
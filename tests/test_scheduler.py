@@ -0,0 +1,19 @@
+import json
+
+import scheduler
+import scrape_news
+
+
+def test_cycle_runs_with_the_given_runtime(tmp_path):
+    scrape_news.configure_http('replay', scrape_news.DEFAULT_FIXTURES_PATH)
+    try:
+        source_scheduler = scheduler.Scheduler(
+            str(tmp_path / 'articles.json'), str(tmp_path / 'index.html'), str(tmp_path / 'run_report.json'),
+            str(tmp_path / 'schedule_state.json'), days=100000, render=False, runtime=scrape_news)
+        _, new_items = source_scheduler.run_cycle(['xz', 'thehackernews'])
+    finally:
+        scrape_news.configure_http(None)
+
+    assert new_items == {'xz': 4, 'thehackernews': 2}
+    with open(tmp_path / 'schedule_state.json', encoding='utf-8') as f:
+        assert set(json.load(f)['sources']) >= {'xz', 'thehackernews'}
@@ -0,0 +1,33 @@
+import records
+import search
+
+
+def _article(number, title='Ivanti patch', date='2026-10-01'):
+    return records.Article(f"{title} {number}", f"https://example.com/{number}", 'The Hacker News', date=date)
+
+
+def test_unparsed_date_text_comes_back_unchanged(tmp_path):
+    with search.SearchIndex(str(tmp_path / 'index.sqlite')) as index:
+        index.add([_article(1, date='2小时前'), _article(2, date='2026-10-01')])
+        found = {article.url: article.date_text for _, article in index.search('ivanti')}
+        assert found == {'https://example.com/1': '2小时前', 'https://example.com/2': '2026-10-01'}
+
+
+def test_updates_rewrite_only_the_last_postings_chunk(tmp_path, monkeypatch):
+    monkeypatch.setattr(search, 'CHUNK_PAIRS', 2)
+    with search.SearchIndex(str(tmp_path / 'index.sqlite')) as index:
+        index.add([_article(number) for number in range(1, 4)])
+
+        def chunks():
+            return dict(index.db.execute("SELECT chunk, postings FROM terms WHERE term = 'ivanti'"))
+
+        full = chunks()
+        assert len(full) == 2
+        index.add([_article(4)])
+        assert chunks()[0] == full[0]
+
+        # A changed article leaves its old chunk and is appended to the last one
+        index.add([_article(1, title='Fortinet fix')])
+        assert sorted(article.url for _, article in index.search('ivanti')) == [
+            'https://example.com/2', 'https://example.com/3', 'https://example.com/4']
+        assert [article.url for _, article in index.search('fortinet')] == ['https://example.com/1']